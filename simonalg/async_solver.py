@@ -0,0 +1,183 @@
+"""
+Contains the AsyncSimonSolver class, an asyncio variant of the SimonSolver which overlaps
+circuit preparation on the CPU with the execution of quantum jobs.
+"""
+
+import asyncio
+import inspect
+
+from simonalg.solver import SimonSolver, ValidationException
+from simonalg.utils.logging import log
+from simonalg.utils.circuit import add_measurements_to_circuit, get_counts_of_job
+from simonalg.utils.circuit import get_execution_backend, remove_barriers_and_transpile_for_backend
+from simonalg.utils.circuit import split_counts_into_registers, submit_transpiled_circuits
+
+
+class AsyncSimonSolver(SimonSolver):
+    """
+    Solves an instance of the extended version of Simon's problem like the SimonSolver, but 
+    never blocks on a quantum job. While a job is in flight, the circuit for the next working 
+    index is built and transpiled in a worker thread. If the job yields a fresh element, the
+    speculatively prepared circuit is discarded.
+    """
+    def __init__(self,
+                 simon_circuit,
+                 sampler=None,
+                 backend=None,
+                 validate_new_elements=True,
+                 poll_interval=0.1,
+                 transpiler=None,
+                 **solver_options
+                 ):
+        """
+        Parameters:
+            - simon_circuit, sampler, backend, validate_new_elements and transpiler are as in 
+              SimonSolver.
+            - poll_interval is the number of seconds to wait between two status checks of a 
+              running quantum job.
+            - solver_options exists only to reject the remaining options of SimonSolver, e.g. 
+              retry_policy or checkpoint_path, with a ValueError. The asyncio loop does not 
+              implement them, so use the SimonSolver if you need them.
+        """
+        simon_solver_options = inspect.signature(SimonSolver.__init__).parameters
+        unknown_options = sorted(set(solver_options).difference(simon_solver_options))
+        if unknown_options:
+            raise TypeError(f'Unexpected keyword arguments {", ".join(unknown_options)}.')
+        if solver_options:
+            raise ValueError(
+                f'The AsyncSimonSolver does not support {", ".join(sorted(solver_options))}. '
+                'Use the SimonSolver instead.'
+            )
+        super().__init__(
+            simon_circuit,
+            sampler=sampler,
+            backend=backend,
+            validate_new_elements=validate_new_elements,
+            transpiler=transpiler
+        )
+        self._poll_interval = poll_interval
+
+
+    def _prepare_circuit(self, y, i, blocked_indices):
+        """
+        Builds the circuit for working index i, adds measurements and transpiles it. Returns the
+        transpiled circuit and the register boundaries of the measurement.
+        """
+        input_register = self._simon_circuit.circuit_wrapper.get_registers()[0]
+        circuit = self._generate_circuit_for_working_index(y, i, blocked_indices)
+        circuit_with_measurements, register_boundaries = add_measurements_to_circuit(
+            circuit, [input_register]
+        )
+        execution_backend = get_execution_backend(sampler=self._sampler, backend=self._backend)
+        transpiled_circuit = remove_barriers_and_transpile_for_backend(
+            circuit_with_measurements, execution_backend, transpiler=self._transpiler
+        )
+        return transpiled_circuit, register_boundaries
+
+
+    async def _run_prepared_circuit(self, transpiled_circuit, register_boundaries):
+        """
+        Submits the prepared circuit and polls the job without blocking the event loop until it
+        is done. Returns the counts dict of the input register.
+        """
+        # Submitting may block on the network, e.g. for IBM Runtime, so it runs in a thread
+        job = await asyncio.to_thread(
+            submit_transpiled_circuits,
+            [transpiled_circuit],
+            sampler=self._sampler,
+            backend=self._backend
+        )
+        while not job.done():
+            await asyncio.sleep(self._poll_interval)
+        counts = get_counts_of_job(
+            job, 1, ['measure'], sampler=self._sampler, backend=self._backend
+        )[0][0]
+        return split_counts_into_registers(counts, register_boundaries)
+
+
+    async def get_new_orthogonal_subgroup_element(self, y=None, blocked_indices=None):
+        """
+        Parameters:
+            - y, blocked_indices are as in SimonSolver.get_new_orthogonal_subgroup_element.
+        Asynchronous version of SimonSolver.get_new_orthogonal_subgroup_element. The circuit for 
+        the next working index is prepared while the job for the current working index runs.
+        """
+        if y is None:
+            y = []
+        if blocked_indices is None:
+            blocked_indices = set()
+
+        working_indices = list(set(range(self._n)).difference(blocked_indices))
+        if len(working_indices) == 0:
+            log.info('Quantum algorithm returned the zerovector for all working indices')
+            return self._zerovec
+
+        # blocked_indices is copied, since it gets updated while the preparation runs
+        preparation = asyncio.create_task(asyncio.to_thread(
+            self._prepare_circuit, y, working_indices[0], set(blocked_indices)
+        ))
+        try:
+            for position, i in enumerate(working_indices):
+                transpiled_circuit, register_boundaries = await preparation
+                running_job = asyncio.create_task(
+                    self._run_prepared_circuit(transpiled_circuit, register_boundaries)
+                )
+
+                is_last_working_index = position == len(working_indices) - 1
+                if not is_last_working_index:
+                    preparation = asyncio.create_task(asyncio.to_thread(
+                        self._prepare_circuit,
+                        y,
+                        working_indices[position + 1],
+                        set(blocked_indices)
+                    ))
+
+                quantum_result = await running_job
+                result = self._evaluate_quantum_result(quantum_result, i, blocked_indices)
+                if result is not None:
+                    if not is_last_working_index:
+                        log.info('Discarding the speculatively prepared circuit')
+                    return result
+        finally:
+            # The preparation is still pending if a result was found or evaluation raised, e.g.
+            # with a ValidationException. The worker thread cannot be interrupted, so we wait
+            # for it instead of leaving an unawaited task behind.
+            if not preparation.done():
+                preparation.cancel()
+            await asyncio.gather(preparation, return_exceptions=True)
+
+        log.info('Quantum algorithm returned the zerovector for all working indices')
+        return self._zerovec
+
+
+    async def generate_basis_of_orthogonal_subgroup(self):
+        """
+        Asynchronous version of SimonSolver.generate_basis_of_orthogonal_subgroup.
+        """
+        y = []
+        blocked_indices = set()
+
+        done = False
+        while not done:
+            orthogonal_subgroup_element = await self.get_new_orthogonal_subgroup_element(
+                y=y, blocked_indices=blocked_indices
+            )
+            if orthogonal_subgroup_element != self._zerovec:
+                y.append(orthogonal_subgroup_element)
+            else:
+                done = True
+        return [y[0] for y in y]
+
+
+    async def solve(self):
+        """
+        Asynchronous version of SimonSolver.solve.
+        """
+        log.info('[STARTED] Extended version of Simon\'s algorithm (asyncio)')
+        try:
+            basis_of_orthogonal_subgroup = await self.generate_basis_of_orthogonal_subgroup()
+        except ValidationException:
+            log.error('[ABORTED]')
+            return None
+
+        return self._reconstruct_hidden_subgroup(basis_of_orthogonal_subgroup)
@@ -3,23 +3,69 @@ Contains the SimonCircuit class, which capsules functionality for generating the
 for the implementation of Simon's algorithm.
 """
 
+import math
 from functools import reduce
 
 from qiskit_aer.library import save_statevector
 
 from .utils.circuit import CircuitWrapper, conditional_phase_shift_by_zero_vec_entire_register
+from .utils.circuit import insert_ancilla_reset_marker, conditional_phase_shift_by_any_index
+
+
+# Key of the circuit metadata describing which instance and which step of the algorithm a circuit
+# implements, see SimonCircuit.get_circuit_metadata.
+SIMON_METADATA_KEY = 'simon_circuit'
+
+STANDARD_CIRCUIT_KIND = 'standard'
+REMOVE_ZERO_CIRCUIT_KIND = 'remove_zero'
+
+def exact_amplification_angle(good_state_probability):
+    """
+    Parameters:
+        - good_state_probability is the probability a of measuring a good state after the 
+          forward circuit. We need a >= 1/4.
+    Returns the phase angle phi such that a single amplitude amplification step with the phase 
+    shifts S_chi(phi) and S_0(phi) yields a good state with certainty, see 
+    https://ieeexplore.ieee.org/abstract/document/595153, Lemma 8 and Theorem 4. The angle solves
+    cos(phi) = 1 - 1/(2a). For a = 1/2, this is pi/2, i.e. the phase shift by i.
+    """
+    if good_state_probability < 0.25:
+        raise ValueError(
+            'Exact amplitude amplification with a single step needs a good state '
+            f'probability of at least 1/4, got {good_state_probability}.'
+        )
+    return math.acos(1 - 1 / (2 * good_state_probability))
 
 
 class SimonCircuit():
     """
     Capsules functionality for generating the circuits for the implementation of Simon's algorithm.
     """
-    def __init__(self, oracle, custom_output_register_size=None, custom_ancilla_register_size=None):
+    def __init__(self,
+                 oracle,
+                 custom_output_register_size=None,
+                 custom_ancilla_register_size=None,
+                 ancilla_pool_size=None
+                 ):
+        """
+        Parameters:
+            - oracle is an oracle object as described in the README.
+            - custom_output_register_size, custom_ancilla_register_size are passed on to the
+              CircuitWrapper.
+            - ancilla_pool_size is optional. If present, the CircuitWrapper allocates a small 
+              fixed pool of this many ancilla qubits instead of the full ancilla register. The 
+              width shrinks because all multi-controlled gates reuse the pool qubits, which they 
+              return to |0>. The pool additionally gets reset after every stage that used it 
+              (oracle and phase shifts), which only matters on noisy hardware and requires a 
+              backend supporting mid-circuit resets (e.g. the AerSimulator). Custom oracles must 
+              get along with the pool, e.g. by using optimized_mcx.
+        """
         self._oracle = oracle
         self.circuit_wrapper = CircuitWrapper(
             self._oracle._hidden_subgroup,
             custom_output_register_size=custom_output_register_size,
-            custom_ancilla_register_size=custom_ancilla_register_size
+            custom_ancilla_register_size=custom_ancilla_register_size,
+            ancilla_pool_size=ancilla_pool_size
         )
 
 
@@ -35,12 +81,35 @@ class SimonCircuit():
 
         hadamard_circuit_1.barrier(label='start_of_oracle')
         oracle_circuit = self._oracle.generate_circuit(self.circuit_wrapper)
+        self._mark_ancilla_pool_for_reset(oracle_circuit)
         oracle_circuit.barrier(label='end_of_oracle')
 
         hadamard_circuit_2 = self.circuit_wrapper.generate_new_circuit()
         hadamard_circuit_2.h(input_register)
 
-        return self._compose_circuits([hadamard_circuit_1, oracle_circuit, hadamard_circuit_2])
+        circuit = self._compose_circuits([hadamard_circuit_1, oracle_circuit, hadamard_circuit_2])
+        circuit.metadata = self.get_circuit_metadata(STANDARD_CIRCUIT_KIND)
+        return circuit
+
+
+    def get_circuit_metadata(self, kind, blockingclauses=None, indices=None, angle=None):
+        """
+        Parameters:
+            - kind is STANDARD_CIRCUIT_KIND or REMOVE_ZERO_CIRCUIT_KIND.
+            - blockingclauses are as in generate_remove_zero_circuit.
+            - indices are the good state indices of a remove-zero circuit.
+            - angle is the phase angle of the amplitude amplification step.
+        Returns the metadata attached to the circuits generated by this class. It holds the 
+        hidden subgroup and the parameters of the circuit under SIMON_METADATA_KEY, so that e.g. 
+        an AnalyticSampler can compute the output distribution without simulating the circuit.
+        """
+        return {SIMON_METADATA_KEY: {
+            'kind': kind,
+            'hidden_subgroup': self._oracle._hidden_subgroup,
+            'blocking_clauses': [[bitstring, j] for bitstring, j in blockingclauses or []],
+            'good_state_indices': sorted(indices) if indices is not None else [],
+            'angle': angle
+        }}
 
 
     def add_blocking_clauses(self, blockingclauses):
@@ -111,6 +180,64 @@ class SimonCircuit():
         Implements the quantum algorithm Q_i from 
         https://ieeexplore.ieee.org/abstract/document/595153, Theorem 4.
         """
+        circuit = self._generate_amplitude_amplification_circuit(
+            blockingclauses,
+            self.generate_phaseshift_by_index_circuit(index),
+            self.generate_phaseshift_by_zero_vec_circuit(),
+            for_aer_simulator
+        )
+        circuit.metadata = self.get_circuit_metadata(
+            REMOVE_ZERO_CIRCUIT_KIND, blockingclauses, [index], math.pi / 2
+        )
+        return circuit
+
+
+    def generate_multi_index_remove_zero_circuit(
+            self, blockingclauses, indices, good_state_probability=0.5, for_aer_simulator=False
+        ):
+        """
+        Parameters:
+            - blockingclauses are as in generate_remove_zero_circuit.
+            - indices specifies which states to mark for amplitude amplification. All states with
+              a 1 at any index in indices are 'good' states and the rest are the 'bad' states.
+            - good_state_probability is the assumed probability of measuring a good state after 
+              the forward circuit, used to pick the exact amplification angle. For a subgroup K 
+              of the orthogonal subgroup, this is 1 - 2^(-d) where d is the dimension of the 
+              projection of K onto indices. The default of 1/2 is exact for d = 1. For larger d, 
+              the probability to measure a bad state is at most 2/27.
+            - for_aer_simulator is as in generate_remove_zero_circuit.
+        Generalizes the quantum algorithm Q_i from 
+        https://ieeexplore.ieee.org/abstract/document/595153, Theorem 4, to a set of indices.
+        """
+        angle = exact_amplification_angle(good_state_probability)
+        circuit = self._generate_amplitude_amplification_circuit(
+            blockingclauses,
+            self.generate_phaseshift_by_any_index_circuit(indices, angle),
+            self.generate_phaseshift_by_zero_vec_circuit(angle=angle),
+            for_aer_simulator
+        )
+        circuit.metadata = self.get_circuit_metadata(
+            REMOVE_ZERO_CIRCUIT_KIND, blockingclauses, indices, angle
+        )
+        return circuit
+
+
+    def _generate_amplitude_amplification_circuit(
+            self,
+            blockingclauses,
+            phaseshift_by_good_states_circuit,
+            phaseshift_by_all_zero_vec_circuit,
+            for_aer_simulator
+        ):
+        """
+        Parameters:
+            - blockingclauses are as in generate_remove_zero_circuit.
+            - phaseshift_by_good_states_circuit is the circuit implementing S_chi.
+            - phaseshift_by_all_zero_vec_circuit is the circuit implementing S_0.
+            - for_aer_simulator is as in generate_remove_zero_circuit.
+        Composes a single amplitude amplification step around the forward circuit, i.e. the 
+        standard Simon circuit followed by the blocking clauses.
+        """
         def generate_forward_circuit():
             standard_simon_circuit = self.generate_standard_simon_circuit()
             standard_simon_circuit.barrier(label='start_of_blockingclauses')
@@ -119,9 +246,7 @@ class SimonCircuit():
             return self._compose_circuits([standard_simon_circuit, blockingclause_circuit])
 
         first_forward_circuit = generate_forward_circuit()
-        phaseshift_by_index_circuit = self.generate_phaseshift_by_index_circuit(index)
         backward_circuit = generate_forward_circuit().inverse()
-        phaseshift_by_all_zero_vec_circuit = self.generate_phaseshift_by_zero_vec_circuit()
         second_forward_circuit = generate_forward_circuit()
 
         labels = [
@@ -133,7 +258,7 @@ class SimonCircuit():
         ]
         circuits = [
             first_forward_circuit,
-            phaseshift_by_index_circuit,
+            phaseshift_by_good_states_circuit,
             backward_circuit,
             phaseshift_by_all_zero_vec_circuit,
             second_forward_circuit
@@ -160,8 +285,27 @@ class SimonCircuit():
         return circuit
 
 
-    def generate_phaseshift_by_zero_vec_circuit(self):
+    def generate_phaseshift_by_any_index_circuit(self, indices, angle=math.pi / 2):
         """
+        Parameters:
+            - indices is a collection of integers in [0, input_register size)
+            - angle is the phase shift, defaults to a shift by i.
+        Generates a circuit that shifts the global phase by e^(i*angle) if the input register 
+        holds a |1> at any index in indices.
+        """
+        circuit = self.circuit_wrapper.generate_new_circuit()
+        input_register, _, _, ancilla_register = self.circuit_wrapper.get_registers()
+        qubits = [input_register[index] for index in sorted(indices)]
+        conditional_phase_shift_by_any_index(circuit, qubits, ancilla_register, angle)
+        self._mark_ancilla_pool_for_reset(circuit)
+
+        return circuit
+
+
+    def generate_phaseshift_by_zero_vec_circuit(self, angle=None):
+        """
+        Parameters:
+            - angle is optional. If present, the phase is shifted by e^(i*angle) instead of i.
         Generates a circuit that shifts the global phase by i if the input register holds
         the all-zero bitstring.
         """
@@ -171,12 +315,25 @@ class SimonCircuit():
 
         working_registers = [input_register, output_register, blockingclause_register]
         conditional_phase_shift_by_zero_vec_entire_register(
-            circuit, working_registers, ancilla_register
+            circuit, working_registers, ancilla_register, angle=angle
         )
+        self._mark_ancilla_pool_for_reset(circuit)
 
         return circuit
 
 
+    def _mark_ancilla_pool_for_reset(self, circuit):
+        """
+        Parameters:
+            - circuit is a circuit after which all ancilla qubits are back in state |0>.
+        If the CircuitWrapper uses an ancilla pool, marks the pool for a mid-circuit reset at the 
+        end of circuit.
+        """
+        if self.circuit_wrapper.ancilla_pool_size is None:
+            return
+        insert_ancilla_reset_marker(circuit, self.circuit_wrapper.ancilla_register)
+
+
     def _compose_circuits(self, circuits):
         """
         Parameters:
@@ -6,19 +6,101 @@ the algorithm from the proof of Theorem 5 in https://ieeexplore.ieee.org/abstrac
 from simonalg.postprocessing import convert_to_basis_of_hidden_subgroup
 from simonalg.utils.logging import log
 from simonalg.utils.circuit import run_circuit_and_measure_registers
+from simonalg.utils.circuit import run_circuits_and_measure_registers
+from simonalg.utils.circuit import run_circuits_with_exact_probabilities
+from simonalg.utils.circuit import get_execution_backend, is_ideal_simulator
+from simonalg.utils.circuit import get_counts_of_retrieved_job, build_circuits
+from simonalg.utils.checkpoint import SolverState, save_solver_state, load_solver_state
+from simonalg.utils.simulation import configure_simulation_method, apply_simulator_options
+from simonalg.utils.counts import IntegerCounts
+from simonalg.utils.grouptheory import xor
+from simonalg.utils.transpilation import circuit_fingerprint
+from simonalg.simon_circuit import SIMON_METADATA_KEY
+from simonalg.utils.result_cache import get_execution_settings
+from simonalg.utils.sampler_pool import DEFAULT_BACKEND_NAME, get_default_sampler_pool
+
+
+# Upper bound for the probability of measuring a bad state after the multi-index amplitude
+# amplification step, see SimonCircuit.generate_multi_index_remove_zero_circuit.
+MULTI_INDEX_MAX_BAD_STATE_PROBABILITY = 2 / 27
+
+# If none of this many shots of the multi-index circuit yielded a good state, the probability that
+# a good state exists is below MULTI_INDEX_MAX_BAD_STATE_PROBABILITY ** 10 < 1e-11.
+MULTI_INDEX_MIN_SHOTS_FOR_EXHAUSTION = 10
+
+# If a good state exists, the good states of the multi-index circuit have probability at least
+# 1 - MULTI_INDEX_MAX_BAD_STATE_PROBABILITY. If none exists, they only show up due to noise. A
+# result with a smaller fraction of good states is ambiguous and settled by one circuit per
+# working index.
+MULTI_INDEX_MIN_GOOD_STATE_FRACTION = 1 / 2
+
+
+# Qiskit's default number of shots, used if neither sampler nor backend sets one.
+DEFAULT_SHOTS = 1024
 
 
 class ValidationException(Exception):
     pass
 
 
+class RetryPolicy:
+    """
+    Decides how often the circuit of a working index is re-run if none of its samples is
+    consistent with the elements sampled so far, and with how many shots.
+    """
+    def __init__(self, max_attempts=3, shot_growth_factor=2):
+        """
+        Parameters:
+            - max_attempts is the maximum number of runs of a circuit, including the first one.
+            - shot_growth_factor is the factor by which the number of shots grows with each
+              attempt. Set this to 1 to re-run with the default number of shots.
+        """
+        self.max_attempts = max_attempts
+        self.shot_growth_factor = shot_growth_factor
+
+
+    def get_shots(self, attempt, default_shots):
+        """
+        Returns the number of shots of the given attempt, where the first run is attempt 0, or
+        None if the default number of shots should be used.
+        """
+        if self.shot_growth_factor == 1:
+            return None
+        return default_shots * self.shot_growth_factor ** attempt
+
+
 class SimonSolver:
     """
     Encapsules functionality to solve an instance of the extended version of Simon's problem.
     Contains implementations for Theorem 4 and Theorem 5 of 
     https://ieeexplore.ieee.org/abstract/document/595153.
     """
-    def __init__(self, simon_circuit, sampler=None, backend=None, validate_new_elements=True):
+    def __init__(self,
+                 simon_circuit,
+                 sampler=None,
+                 backend=None,
+                 validate_new_elements=True,
+                 multi_index_good_states=False,
+                 batch_working_indices=False,
+                 transpiler=None,
+                 executor=None,
+                 result_cache=None,
+                 exact_ideal_simulation=False,
+                 select_simulation_method=False,
+                 simulator_options=None,
+                 integer_counts=False,
+                 shot_policy=None,
+                 retry_policy=None,
+                 readout_mitigator=None,
+                 fan_out_executor=None,
+                 job_batching_coordinator=None,
+                 offline_pipeline=None,
+                 checkpoint_path=None,
+                 job_retriever=None,
+                 standard_simon_shots=None,
+                 standard_simon_noise_threshold=0.5,
+                 index_ordering_policy=None
+                 ):
         """
         Parameters:
             - simon_circuit an instance of the SimonCircuit class.
@@ -34,7 +116,103 @@ class SimonSolver:
               each quantum circuit run. Intended to be used when testing on noisy NISQ hardware.
               If sampled vectors are not linearly independent, an exception is thrown and the
               solver aborts.
-        The solver expects either sampler of backend to be present, but not both.
+            - multi_index_good_states set this to True if each iteration should first run a 
+              single circuit whose good states are all states with a 1 at any working index (see 
+              SimonCircuit.generate_multi_index_remove_zero_circuit). Only if that circuit does 
+              not settle the iteration, the solver falls back to one circuit per working index.
+              This usually reduces the number of quantum jobs per iteration from up to n to one.
+            - batch_working_indices set this to True if the circuits for all working indices of an
+              iteration should be built up front and submitted as a single job (one multi-PUB job
+              via the sampler or one list via backend.run). The circuits only depend on the 
+              elements sampled in previous iterations, so the results get evaluated exactly as 
+              in sequential mode. Circuits that are not needed are run speculatively, but the 
+              per-job overhead and queue latency are paid once per iteration.
+            - transpiler is optional. If present, it is an object with a 
+              transpile(circuit, backend) method used instead of qiskit's transpile, e.g. a 
+              TranspileCache from simonalg.utils.transpilation shared across solves.
+            - executor is optional. If present, it is a ProcessPoolExecutor on which the circuits
+              of a batch (see batch_working_indices) get built and transpiled in parallel. Use a 
+              PreparationExecutor from simonalg.utils.circuit to send the backend and 
+              transpiler to the worker processes only once.
+            - result_cache is optional. If present, it is a ResultCache from 
+              simonalg.utils.result_cache. Counts of circuits run on deterministic simulators 
+              (noiseless and with a fixed seed) are then reused across solves.
+            - exact_ideal_simulation set this to True if circuits run on an ideal simulator (an 
+              AerSimulator without noise model) should neither be transpiled nor sampled. The 
+              solver then reads the exact probabilities of the input register off the 
+              statevector and picks the most probable element deterministically. On other 
+              backends, this option is ignored.
+            - select_simulation_method set this to True if the simulation method of an Aer 
+              simulator should be chosen for the circuits of each job (see 
+              simonalg.utils.simulation.select_simulation_method). Circuits whose statevector 
+              does not fit into memory are then simulated as matrix product states if their 
+              structure bounds their entanglement and rejected with a ValueError otherwise. The 
+              circuits run on a copy of the Aer simulator with this method, so that the 
+              simulator of the sampler or backend, which may be shared, stays unchanged.
+            - simulator_options is optional. If present, it is a dict of Aer simulator options 
+              (see simonalg.utils.simulation.get_simulator_options) or the name of a preset, 
+              i.e. 'many_small_circuits' or 'one_big_circuit'. The options get set once on a 
+              copy of the Aer simulator, e.g. to tune max_parallel_threads, fusion_threshold 
+              or shots. The given sampler and backend stay unchanged.
+            - integer_counts set this to True if measurement results should be decoded into 
+              IntegerCounts (see simonalg.utils.counts) instead of counts dicts. This avoids 
+              creating a string per shot, which pays off for many shots on wide registers.
+            - shot_policy is optional. If present, it is an AdaptiveShotPolicy from 
+              simonalg.utils.shots. Circuits then run with few shots first and only get more 
+              shots while their most frequent outcome is ambiguous. On ideal simulators, each 
+              circuit runs with a single shot by default.
+            - retry_policy is optional. If present, it is a RetryPolicy. Samples that are not 
+              consistent with the elements sampled so far, i.e. that have a 1 at a blocked 
+              index, are then discarded before picking the most frequent one. If no sample of 
+              a working index is consistent, only the circuit of this index is re-run, up to 
+              retry_policy.max_attempts times, instead of aborting the solve.
+            - readout_mitigator is optional. If present, it is a ReadoutMitigator from 
+              simonalg.utils.mitigation. The counts are then corrected for readout errors 
+              before the most frequent element is picked. Share one instance across solves to 
+              calibrate once per session.
+            - fan_out_executor is optional. If present, it is a FanOutExecutor from 
+              simonalg.utils.fanout, which runs every circuit on several backends at once and 
+              takes the first valid result. sampler and backend are then not needed and the 
+              execution options above, except for retry_policy, are ignored.
+            - job_batching_coordinator is optional. If present, it is a 
+              JobBatchingCoordinator from simonalg.utils.batching shared with other solvers 
+              running concurrently. Circuits are then submitted together with the circuits of 
+              the other solvers. As with fan_out_executor, the execution options above, except 
+              for retry_policy, are ignored.
+            - offline_pipeline is optional. If present, it is an OfflinePipeline from 
+              simonalg.utils.offline. Circuits are then written to batch files instead of being 
+              run, and solve raises a PendingBatchException until an executor process has 
+              written the counts of the pending batch. Calling solve again replays the executed 
+              batches and continues. As with fan_out_executor, the execution options above, 
+              except for retry_policy, are ignored.
+            - checkpoint_path is optional. If present, the state of the solve (see 
+              simonalg.utils.checkpoint.SolverState) is written atomically to this path after 
+              every evaluated result and every submitted job. A solve interrupted by a crash or 
+              preemption can then be continued with resume.
+            - job_retriever is optional. If present, it is a function that takes a job ID and 
+              returns the job, e.g. QiskitRuntimeService().job. On resume, the result of a job 
+              that was pending when the checkpoint was written is then fetched instead of 
+              running its circuits again, provided the fingerprints and working indices of 
+              the circuits recorded in the checkpoint match the circuits to run.
+            - standard_simon_shots is optional. If present, the solve runs in hybrid mode: it 
+              first runs the standard Simon circuit, which is much cheaper than a remove-zero 
+              circuit, with this many shots as a single job. The distinct samples are reduced 
+              into a basis incrementally and become the initial blocking clauses, so that 
+              remove-zero circuits only have to find the dimensions still missing. With exact 
+              probabilities, the samples span the whole orthogonal subgroup and no remove-zero 
+              circuit is run at all.
+            - standard_simon_noise_threshold is the fraction of the count of the most frequent 
+              sample of the standard Simon circuit that a sample needs to enter the basis in 
+              hybrid mode. The outcomes are uniformly distributed on the orthogonal subgroup, 
+              so all of its elements are expected equally often, whereas a sample caused by 
+              e.g. a readout error on one of n qubits with probability p is expected at most 
+              n * p times as often. Rare samples are left to the remove-zero circuits.
+            - index_ordering_policy is optional. If present, it is an IndexOrderingPolicy from 
+              simonalg.utils.index_ordering, which decides in which order the working indices 
+              of an iteration are tried and which of them are blocked without running their 
+              circuit. Defaults to trying the working indices in set iteration order.
+        The solver expects either sampler of backend to be present, but not both, unless 
+        fan_out_executor or offline_pipeline is present.
         """
         self._simon_circuit = simon_circuit
         self._sampler = sampler
@@ -42,16 +220,235 @@ class SimonSolver:
         self._n = len(simon_circuit.circuit_wrapper.input_register)
         self._zerovec = '0' * self._n
         self._validate_new_elements = validate_new_elements
+        self._multi_index_good_states = multi_index_good_states
+        self._batch_working_indices = batch_working_indices
+        self._transpiler = transpiler
+        self._executor = executor
+        self._result_cache = result_cache
+        # With fan_out_executor or offline_pipeline, there may be neither sampler nor backend
+        self._exact_probabilities = (
+            exact_ideal_simulation
+            and (sampler is not None or backend is not None)
+            and is_ideal_simulator(get_execution_backend(sampler=sampler, backend=backend))
+        )
+        if exact_ideal_simulation and not self._exact_probabilities:
+            log.warning('Backend is not an ideal simulator, falling back to sampling shots')
+        self._select_simulation_method = select_simulation_method
+        if simulator_options is not None:
+            self._sampler, self._backend = apply_simulator_options(
+                simulator_options, sampler=sampler, backend=backend
+            )
+        self._integer_counts = integer_counts
+        self._shot_policy = shot_policy
+        self._retry_policy = retry_policy
+        self._readout_mitigator = readout_mitigator
+        self._fan_out_executor = fan_out_executor
+        self._job_batching_coordinator = job_batching_coordinator
+        self._offline_pipeline = offline_pipeline
+        self._checkpoint_path = checkpoint_path
+        self._job_retriever = job_retriever
+        self._standard_simon_shots = standard_simon_shots
+        self._standard_simon_noise_threshold = standard_simon_noise_threshold
+        self._index_ordering_policy = index_ordering_policy
+        if index_ordering_policy is not None:
+            index_ordering_policy.reset(self._n)
+        self._state = None
+        self._resumed_state = None
+        self._resumed_pending_job_ids = []
+        self._resumed_pending_circuits = []
+
+
+    @classmethod
+    def from_sampler_pool(
+        cls,
+        simon_circuit,
+        backend_name=DEFAULT_BACKEND_NAME,
+        simulator_options=None,
+        sampler_pool=None,
+        **solver_options
+    ):
+        """
+        Parameters:
+            - simon_circuit is as in the constructor.
+            - backend_name, simulator_options are as in SamplerPool.get_sampler.
+            - sampler_pool is optional. Defaults to the pool of get_default_sampler_pool.
+            - solver_options are passed on to the constructor.
+        Returns a solver running its circuits on the pooled sampler for the given configuration
+        instead of a freshly constructed one.
+        """
+        if sampler_pool is None:
+            sampler_pool = get_default_sampler_pool()
+        sampler = sampler_pool.get_sampler(backend_name, simulator_options=simulator_options)
+        return cls(simon_circuit, sampler=sampler, **solver_options)
+
+
+    def _checkpoint(self):
+        if self._checkpoint_path is not None and self._state is not None:
+            save_solver_state(self._state, self._checkpoint_path)
+
+
+    def _record_evaluated_result(self):
+        if self._state is not None:
+            self._state.pending_job_ids = []
+            self._state.pending_circuits = []
+            self._checkpoint()
+
+
+    def _on_job_submitted(self, job):
+        if self._checkpoint_path is not None and self._state is not None:
+            self._state.pending_job_ids.append(job.job_id())
+            self._checkpoint()
+
+
+    def _describe_circuits(self, circuits):
+        """
+        Returns the description of circuits stored in SolverState.pending_circuits.
+        """
+        return [{
+            'fingerprint': circuit_fingerprint(c),
+            'working_indices': (c.metadata or {}).get(SIMON_METADATA_KEY, {}).get(
+                'good_state_indices', []
+            )
+        } for c in circuits]
+
+
+    def _record_pending_circuits(self, circuits):
+        if self._checkpoint_path is not None and self._state is not None:
+            self._state.pending_circuits = self._describe_circuits(circuits)
 
 
-    def _run_circuit(self, circuit, input_register):
+    def _retrieve_resumed_pending_job(self, circuits, input_register):
+        """
+        Returns the counts of the job that was pending when the resumed checkpoint was written 
+        or None if the circuits have to be run. The job is only reused if it ran the same 
+        circuits for the same working indices, which are recorded in the checkpoint.
+        """
+        pending_job_ids = self._resumed_pending_job_ids
+        pending_circuits = self._resumed_pending_circuits
+        self._resumed_pending_job_ids = []
+        self._resumed_pending_circuits = []
+        if self._job_retriever is None or len(pending_job_ids) == 0:
+            return None
+        if len(pending_job_ids) > 1 or self._shot_policy is not None:
+            log.info('Not reusing pending jobs %s, running circuits again', pending_job_ids)
+            return None
+        if self._describe_circuits(circuits) != pending_circuits:
+            log.info('Pending job %s ran other circuits, running circuits again',
+                     pending_job_ids[0])
+            return None
+
+        try:
+            counts = get_counts_of_retrieved_job(
+                self._job_retriever(pending_job_ids[0]),
+                circuits,
+                [input_register],
+                sampler=self._sampler,
+                backend=self._backend,
+                as_integer_counts=self._integer_counts
+            )
+        except Exception as exception: # pylint: disable=broad-exception-caught
+            log.warning('Could not retrieve pending job %s: %s', pending_job_ids[0], exception)
+            return None
+        if len(counts) != len(circuits):
+            log.warning('Pending job %s ran other circuits, running circuits again',
+                        pending_job_ids[0])
+            return None
+        if self._readout_mitigator is not None:
+            log.warning('Counts of pending job %s are not corrected for readout errors',
+                        pending_job_ids[0])
+        log.info('Reusing the result of pending job %s', pending_job_ids[0])
+        return counts
+
+
+    def _get_execution_target(self, circuits):
+        """
+        Returns the keyword arguments sampler and backend to run circuits with. With
+        select_simulation_method, they hold a copy of the Aer simulator using the selected
+        simulation method, so that solvers sharing the simulator do not race.
+        """
+        sampler, backend = self._sampler, self._backend
+        if self._select_simulation_method:
+            sampler, backend = configure_simulation_method(
+                circuits, sampler=sampler, backend=backend
+            )
+        return {'sampler': sampler, 'backend': backend}
+
+
+    def _run_circuit(self, circuit, input_register, shots=None):
+        if self._fan_out_executor is not None:
+            return self._fan_out_executor.run_circuits_and_measure_registers(
+                [circuit], [input_register], shots=shots
+            )[0]
+        if self._offline_pipeline is not None:
+            return self._offline_pipeline.run_circuits_and_measure_registers(
+                [circuit], [input_register], shots=shots
+            )[0]
+        if self._job_batching_coordinator is not None:
+            return self._job_batching_coordinator.run_circuits_and_measure_registers(
+                [circuit], [input_register], sampler=self._sampler, backend=self._backend,
+                shots=shots
+            )[0]
+        retrieved_counts = self._retrieve_resumed_pending_job([circuit], input_register)
+        if retrieved_counts is not None:
+            return retrieved_counts[0]
+        self._record_pending_circuits([circuit])
+        if self._exact_probabilities:
+            return self._run_circuits([circuit], input_register)[0]
         return run_circuit_and_measure_registers(
-            circuit, [input_register], sampler=self._sampler, backend=self._backend
+            circuit,
+            [input_register],
+            **self._get_execution_target([circuit]),
+            transpiler=self._transpiler,
+            result_cache=self._result_cache,
+            as_integer_counts=self._integer_counts,
+            shot_policy=self._shot_policy,
+            shots=shots,
+            readout_mitigator=self._readout_mitigator,
+            job_callback=self._on_job_submitted
+        )
+
+
+    def _run_circuits(self, circuits, input_register):
+        if self._fan_out_executor is not None:
+            return self._fan_out_executor.run_circuits_and_measure_registers(
+                circuits, [input_register]
+            )
+        if self._offline_pipeline is not None:
+            return self._offline_pipeline.run_circuits_and_measure_registers(
+                circuits, [input_register]
+            )
+        if self._job_batching_coordinator is not None:
+            return self._job_batching_coordinator.run_circuits_and_measure_registers(
+                circuits, [input_register], sampler=self._sampler, backend=self._backend
+            )
+        retrieved_counts = self._retrieve_resumed_pending_job(circuits, input_register)
+        if retrieved_counts is not None:
+            return retrieved_counts
+        self._record_pending_circuits(circuits)
+        execution_target = self._get_execution_target(circuits)
+        if self._exact_probabilities:
+            return run_circuits_with_exact_probabilities(
+                circuits, [input_register], **execution_target
+            )
+        return run_circuits_and_measure_registers(
+            circuits,
+            [input_register],
+            **execution_target,
+            transpiler=self._transpiler,
+            executor=self._executor,
+            result_cache=self._result_cache,
+            as_integer_counts=self._integer_counts,
+            shot_policy=self._shot_policy,
+            readout_mitigator=self._readout_mitigator,
+            job_callback=self._on_job_submitted
         )
 
 
     def _get_most_probable_result(self, quantum_result):
+        if isinstance(quantum_result, IntegerCounts):
+            return quantum_result.most_frequent_bitstring()
         measured_elements = list(quantum_result.keys())
+        # Ties are broken by the order of quantum_result, since sort is stable
         measured_elements.sort(key=lambda e: quantum_result[e], reverse=True)
         return measured_elements[0]
 
@@ -85,6 +482,199 @@ class SimonSolver:
         )
 
 
+    def _select_good_results(self, quantum_result, working_indices):
+        if isinstance(quantum_result, IntegerCounts):
+            return quantum_result.with_any_bit_set(working_indices)
+        return dict(
+            (element, count) for element, count in quantum_result.items()
+            if any(element[self._n - 1 - i] == '1' for i in working_indices)
+        )
+
+
+    def _select_consistent_results(self, quantum_result, blocked_indices):
+        if isinstance(quantum_result, IntegerCounts):
+            return quantum_result.without_any_bit_set(blocked_indices)
+        return dict(
+            (element, count) for element, count in quantum_result.items()
+            if all(element[self._n - 1 - bi] == '0' for bi in blocked_indices)
+        )
+
+
+    def _retry_until_consistent(self, quantum_result, y, i, blocked_indices):
+        """
+        Parameters:
+            - quantum_result is the counts dict of the circuit for working index i.
+            - y, blocked_indices are as in get_new_orthogonal_subgroup_element.
+        Returns quantum_result without the samples that are inconsistent with blocked_indices.
+        If no sample is consistent, the circuit for working index i is re-run as decided by 
+        the retry policy. Raises a ValidationException if all attempts fail.
+        """
+        input_register = self._simon_circuit.circuit_wrapper.get_registers()[0]
+        default_shots = None
+        if self._fan_out_executor is None and self._offline_pipeline is None:
+            _, default_shots, _ = get_execution_settings(
+                sampler=self._sampler, backend=self._backend
+            )
+        for attempt in range(1, self._retry_policy.max_attempts + 1):
+            consistent_result = self._select_consistent_results(quantum_result, blocked_indices)
+            if len(consistent_result) > 0:
+                if len(consistent_result) < len(quantum_result):
+                    log.warning(
+                        'Discarded %d inconsistent element(s) for working index %d',
+                        len(quantum_result) - len(consistent_result), i
+                    )
+                return consistent_result
+            if attempt == self._retry_policy.max_attempts:
+                break
+
+            shots = self._retry_policy.get_shots(attempt, default_shots or DEFAULT_SHOTS)
+            log.warning(
+                'No element for working index %d is consistent with blocked indices %s, '
+                're-running its circuit (attempt %d of %d)',
+                i, blocked_indices, attempt + 1, self._retry_policy.max_attempts
+            )
+            quantum_result = self._run_circuit(
+                self._generate_circuit_for_working_index(y, i, blocked_indices),
+                input_register,
+                shots=shots
+            )
+
+        log.error('No consistent element for working index %d after all attempts', i)
+        raise ValidationException(
+            f'No consistent element was measured for working index {i} despite '
+            f'{self._retry_policy.max_attempts} attempts.'
+        )
+
+
+    def _try_all_working_indices_at_once(self, y, working_indices, blocked_indices):
+        """
+        Parameters:
+            - y, blocked_indices are as in get_new_orthogonal_subgroup_element.
+            - working_indices are the indices that are not blocked yet.
+        Runs a single circuit whose good states have a 1 at any working index. Returns a tuple 
+        (new_element, blocking_index) if the majority of shots yielded good states, the zero 
+        vector if enough shots were taken to conclude that no good state exists and None if the 
+        solver has to fall back to one circuit per working index. With exact probabilities, a 
+        vanishing probability of all good states is conclusive.
+        """
+        simon_circuit = self._simon_circuit
+        input_register = simon_circuit.circuit_wrapper.get_registers()[0]
+        log.info(
+            'Generating multi-index quantum circuit with the following parameters:'
+            ' Y=%s, good_state_indices=%s, blocked_indices=%s',
+            y, working_indices, blocked_indices
+        )
+        circuit = simon_circuit.generate_multi_index_remove_zero_circuit(y, working_indices)
+        log.debug('\n%s', circuit.draw(fold=-1))
+        quantum_result = self._run_circuit(circuit, input_register)
+        log.info('Raw quantum result is: %s', quantum_result)
+        self._observe_samples(quantum_result)
+
+        good_result = self._select_good_results(quantum_result, working_indices)
+        good_state_count = sum(good_result.values())
+        shots = sum(quantum_result.values())
+        if 0 < good_state_count < MULTI_INDEX_MIN_GOOD_STATE_FRACTION * shots:
+            log.info(
+                'Only %s of %s shots yielded a good state, falling back to single indices',
+                good_state_count, shots
+            )
+            return None
+        if self._retry_policy is not None and len(good_result) > 0:
+            good_result = self._select_consistent_results(good_result, blocked_indices)
+            if len(good_result) == 0:
+                log.warning('No good state is consistent, falling back to single indices')
+                return None
+        if len(good_result) == 0:
+            if self._exact_probabilities:
+                blocked_indices.update(working_indices)
+                log.info('Good states have probability 0, all working indices are exhausted')
+                return self._zerovec
+            if shots < MULTI_INDEX_MIN_SHOTS_FOR_EXHAUSTION:
+                log.info('No good state among %d shots, falling back to single indices', shots)
+                return None
+            blocked_indices.update(working_indices)
+            log.info('No good state among %d shots, all working indices are exhausted', shots)
+            return self._zerovec
+
+        new_element = self._get_most_probable_result(good_result)
+        log.info('Picked the good quantum result with highest count: %s', new_element)
+        if self._validate_new_elements:
+            self._validate_new_element(new_element, blocked_indices)
+
+        blocking_index = self._get_good_state_index(new_element, blocked_indices)
+        blocked_indices.add(blocking_index)
+        log.info('Added index %d to blocked indices', blocking_index)
+        return (new_element, blocking_index)
+
+
+    def _generate_circuit_for_working_index(self, y, i, blocked_indices):
+        log.info(
+            'Generating quantum circuit with the following parameters:'
+            ' Y=%s, good_state_index=%d, blocked_indices=%s',
+            y, i, blocked_indices
+        )
+        circuit = self._simon_circuit.generate_remove_zero_circuit(y, i)
+        log.debug('\n%s', circuit.draw(fold=-1))
+        return circuit
+
+
+    def _evaluate_quantum_result(self, quantum_result, i, blocked_indices):
+        """
+        Parameters:
+            - quantum_result is the counts dict of the circuit for working index i.
+            - i is the working index.
+            - blocked_indices is as in get_new_orthogonal_subgroup_element and gets updated.
+        Returns a tuple (new_element, blocking_index) if the quantum result yields a fresh 
+        element and None if the quantum routine yielded the zero vector for working index i.
+        """
+        log.info('Raw quantum result is: %s', quantum_result)
+
+        new_element = self._get_most_probable_result(quantum_result)
+        log.info('Picked the quantum result with highest count: %s', new_element)
+        if self._validate_new_elements:
+            self._validate_new_element(new_element, blocked_indices)
+
+        blocked_indices.add(i)
+        log.info('Added index %d to blocked indices', i)
+
+        if new_element[self._n - 1 - i] == '1':
+            log.info('The quantum routine yielded a bitstring with 1 at index %s', i)
+            return (new_element, i)
+        if new_element != self._zerovec:
+            blocking_index = self._get_good_state_index(new_element, blocked_indices)
+            blocked_indices.add(blocking_index)
+            log.info(
+                'The quantum routine did not yield a bitstring with 1 at index %d, '
+                'but it yielded a different bitstring with 1 at index %d', 
+                i, blocking_index
+            )
+            log.info('Added index %d to blocked indices', blocking_index)
+            return (new_element, blocking_index)
+        log.info('The quantum routine yielded the zerovector for working index %d', i)
+        return None
+
+
+    def _order_working_indices(self, working_indices, blocked_indices):
+        """
+        Returns the list of working indices to try as decided by the index ordering policy. 
+        Indices the policy leaves out are added to blocked_indices.
+        """
+        if self._index_ordering_policy is None:
+            return list(working_indices)
+        ordered_indices = self._index_ordering_policy.order(working_indices)
+        skipped_indices = working_indices.difference(ordered_indices)
+        if len(skipped_indices) > 0:
+            blocked_indices.update(skipped_indices)
+            log.info('Skipped working indices %s as decided by the index ordering policy',
+                     skipped_indices)
+        return ordered_indices
+
+
+    def _observe_samples(self, quantum_result):
+        if self._index_ordering_policy is not None:
+            self._index_ordering_policy.observe_samples(quantum_result)
+
+
     def get_new_orthogonal_subgroup_element(self, y=None, blocked_indices=None):
         """
         Parameters:
@@ -94,62 +684,166 @@ class SimonSolver:
               orthogonal subgroup.
         Implements the algorithm from the proof of Theorem 4 in 
         https://ieeexplore.ieee.org/abstract/document/595153. For multi-shot quantum computer calls, 
-        we always take the bitstring that has been measured most often.
+        we always take the bitstring that has been measured most often. In batch mode, the circuits
+        for all working indices are submitted as a single job up front and the results are
+        evaluated in the same order as without batch mode.
         """
         if y is None:
             y = []
         if blocked_indices is None:
             blocked_indices = set()
 
-        simon_circuit = self._simon_circuit
-        input_register = simon_circuit.circuit_wrapper.get_registers()[0]
-        working_indices = set(range(self._n)).difference(blocked_indices)
+        input_register = self._simon_circuit.circuit_wrapper.get_registers()[0]
+        working_indices = self._order_working_indices(
+            set(range(self._n)).difference(blocked_indices), blocked_indices
+        )
+
+        if self._multi_index_good_states and len(working_indices) > 1:
+            result = self._try_all_working_indices_at_once(
+                y, set(working_indices), blocked_indices
+            )
+            if result is not None:
+                return result
 
-        for i in working_indices:
+        if self._batch_working_indices and self._executor is not None:
             log.info(
-                'Generating quantum circuit with the following parameters:'
-                ' Y=%s, good_state_index=%d, blocked_indices=%s',
-                y, i, blocked_indices
-            )
-            circuit = simon_circuit.generate_remove_zero_circuit(y, i)
-            log.debug('\n%s', circuit.draw(fold=-1))
-            quantum_result = self._run_circuit(circuit, input_register)
-            log.info('Raw quantum result is: %s', quantum_result)
-
-            new_element = self._get_most_probable_result(quantum_result)
-            log.info('Picked the quantum result with highest count: %s', new_element)
-            if self._validate_new_elements:
-                self._validate_new_element(new_element, blocked_indices)
-
-            blocked_indices.add(i)
-            log.info('Added index %d to blocked indices', i)
-
-            if new_element[self._n - 1 - i] == '1':
-                log.info('The quantum routine yielded a bitstring with 1 at index %s', i)
-                return (new_element, i)
-            if new_element != self._zerovec:
-                blocking_index = self._get_good_state_index(new_element, blocked_indices)
-                blocked_indices.add(blocking_index)
-                log.info(
-                    'The quantum routine did not yield a bitstring with 1 at index %d, '
-                    'but it yielded a different bitstring with 1 at index %d', 
-                    i, blocking_index
+                'Building quantum circuits in parallel with the following parameters:'
+                ' Y=%s, good_state_indices=%s, blocked_indices=%s',
+                y, working_indices, blocked_indices
+            )
+            circuits = build_circuits(
+                [(self._simon_circuit.generate_remove_zero_circuit, (y, i))
+                 for i in working_indices],
+                executor=self._executor
+            )
+            quantum_results = self._run_circuits(circuits, input_register)
+        elif self._batch_working_indices:
+            circuits = [self._generate_circuit_for_working_index(y, i, blocked_indices)
+                        for i in working_indices]
+            quantum_results = self._run_circuits(circuits, input_register)
+        else:
+            quantum_results = (
+                self._run_circuit(
+                    self._generate_circuit_for_working_index(y, i, blocked_indices), input_register
+                ) for i in working_indices
+            )
+
+        for i, quantum_result in zip(working_indices, quantum_results):
+            self._observe_samples(quantum_result)
+            if self._retry_policy is not None:
+                quantum_result = self._retry_until_consistent(
+                    quantum_result, y, i, blocked_indices
                 )
-                log.info('Added index %d to blocked indices', blocking_index)
-                return (new_element, blocking_index)
-            log.info('The quantum routine yielded the zerovector for working index %d', i)
+            result = self._evaluate_quantum_result(quantum_result, i, blocked_indices)
+            if result is not None:
+                return result
+            self._record_evaluated_result()
 
         log.info('Quantum algorithm returned the zerovector for all working indices')
         return self._zerovec
 
 
+    def _add_to_basis(self, element, y, blocked_indices):
+        """
+        Reduces element by the elements of y at their blocking indices. If the reduced element 
+        is not the zero vector, it gets appended to y together with a fresh blocking index, 
+        which is added to blocked_indices. Returns whether element was linearly independent.
+        """
+        for basis_element, blocking_index in y:
+            if element[self._n - 1 - blocking_index] == '1':
+                element = xor(element, basis_element)
+        if element == self._zerovec:
+            return False
+        blocking_index = self._get_good_state_index(element, blocked_indices)
+        y.append((element, blocking_index))
+        blocked_indices.add(blocking_index)
+        return True
+
+
+    def _run_standard_simon_circuit(self, shots):
+        input_register = self._simon_circuit.circuit_wrapper.get_registers()[0]
+        log.info('Sampling the standard Simon circuit with %d shots', shots)
+        circuit = self._simon_circuit.generate_standard_simon_circuit()
+        quantum_result = self._run_circuit(circuit, input_register, shots=shots)
+        if isinstance(quantum_result, IntegerCounts):
+            quantum_result = quantum_result.to_counts_dict()
+        return quantum_result
+
+
+    def sample_with_standard_circuit(self, y, blocked_indices):
+        """
+        Parameters:
+            - y, blocked_indices are as in get_new_orthogonal_subgroup_element and get updated.
+        Runs the standard Simon circuit with standard_simon_shots shots and adds the distinct 
+        samples to y in the order of their counts, skipping those that are linearly dependent 
+        on y. Samples whose count is below standard_simon_noise_threshold times their expected 
+        count, estimated by the count of the most frequent sample, are taken for noise and 
+        discarded. Every added element gets a blocking index as 
+        if it was sampled by a remove-zero circuit. Returns the counts dict of the standard 
+        Simon circuit.
+        """
+        quantum_result = self._run_standard_simon_circuit(self._standard_simon_shots)
+        samples = sorted(quantum_result, key=quantum_result.get, reverse=True)
+        threshold = self._standard_simon_noise_threshold * quantum_result[samples[0]]
+        discarded_sample_count = 0
+        for k, sample in enumerate(samples):
+            if len(blocked_indices) == self._n or quantum_result[sample] < threshold:
+                discarded_sample_count = len(samples) - k
+                break
+            self._add_to_basis(sample, y, blocked_indices)
+        log.info(
+            'The standard Simon circuit yielded %d distinct sample(s) spanning Y=%s, '
+            '%d sample(s) were not considered',
+            len(samples), y, discarded_sample_count
+        )
+
+        if self._exact_probabilities:
+            # The samples are the support of the output distribution, i.e. all of H^perp
+            blocked_indices.update(range(self._n))
+        return quantum_result
+
+
+    def _prepare_index_ordering_policy(self, standard_simon_result):
+        """
+        Resets the index ordering policy, reports the elements sampled so far to it and, if it 
+        asks for them, the samples of the standard Simon circuit. standard_simon_result is the 
+        counts dict of the standard Simon circuit if it already ran in hybrid mode.
+        """
+        policy = self._index_ordering_policy
+        policy.reset(self._n)
+        if len(self._state.y) > 0:
+            policy.observe_samples(dict((element, 1) for element, _ in self._state.y))
+        if policy.standard_simon_shots is None:
+            return
+        if standard_simon_result is None:
+            standard_simon_result = self._run_standard_simon_circuit(policy.standard_simon_shots)
+        has_execution_backend = self._sampler is not None or self._backend is not None
+        policy.observe_standard_simon_samples(
+            standard_simon_result,
+            exact=self._exact_probabilities,
+            ideal=has_execution_backend and is_ideal_simulator(
+                get_execution_backend(sampler=self._sampler, backend=self._backend)
+            )
+        )
+        self._record_evaluated_result()
+
+
     def generate_basis_of_orthogonal_subgroup(self):
         """
         Implements the first stage of the algorithm from the proof of Theorem 5 
-        in https://ieeexplore.ieee.org/abstract/document/595153.
+        in https://ieeexplore.ieee.org/abstract/document/595153. If the solve was resumed, it
+        continues from the resumed state.
         """
-        y = []
-        blocked_indices = set()
+        self._state = self._resumed_state or SolverState(self._n)
+        self._resumed_state = None
+        y = self._state.y
+        blocked_indices = self._state.blocked_indices
+        standard_simon_result = None
+        if self._standard_simon_shots is not None and self._state.iteration == 0 and len(y) == 0:
+            standard_simon_result = self.sample_with_standard_circuit(y, blocked_indices)
+            self._record_evaluated_result()
+        if self._index_ordering_policy is not None:
+            self._prepare_index_ordering_policy(standard_simon_result)
 
         done = False
         while not done:
@@ -160,6 +854,8 @@ class SimonSolver:
                 y.append(orthogonal_subgroup_element)
             else:
                 done = True
+            self._state.iteration += 1
+            self._record_evaluated_result()
         return [y[0] for y in y]
 
 
@@ -169,12 +865,45 @@ class SimonSolver:
         https://ieeexplore.ieee.org/abstract/document/595153.
         """
         log.info('[STARTED] Extended version of Simon\'s algorithm')
+        if self._offline_pipeline is not None:
+            self._offline_pipeline.reset()
         try:
             basis_of_orthogonal_subgroup = self.generate_basis_of_orthogonal_subgroup()
         except ValidationException:
             log.error('[ABORTED]')
             return None
 
+        return self._reconstruct_hidden_subgroup(basis_of_orthogonal_subgroup)
+
+
+    def resume(self, path=None):
+        """
+        Parameters:
+            - path is the path of a checkpoint written by a solver with checkpoint_path. 
+              Defaults to checkpoint_path. If the solver has no checkpoint_path, further 
+              checkpoints are written to path.
+        Continues the solve from the checkpointed state instead of starting over. Returns the 
+        same as solve.
+        """
+        path = path if path is not None else self._checkpoint_path
+        state = load_solver_state(path)
+        if state.n != self._n:
+            raise ValueError(f'Checkpoint {path} belongs to an instance with n={state.n}.')
+        if self._checkpoint_path is None:
+            self._checkpoint_path = path
+        log.info(
+            'Resuming from checkpoint %s after %d iteration(s) with Y=%s, blocked_indices=%s',
+            path, state.iteration, state.y, state.blocked_indices
+        )
+        self._resumed_pending_job_ids = state.pending_job_ids
+        self._resumed_pending_circuits = state.pending_circuits
+        state.pending_job_ids = []
+        state.pending_circuits = []
+        self._resumed_state = state
+        return self.solve()
+
+
+    def _reconstruct_hidden_subgroup(self, basis_of_orthogonal_subgroup):
         log.info('Basis of orthogonal subgroup is %s', basis_of_orthogonal_subgroup)
         basis_of_hidden_subgroup = convert_to_basis_of_hidden_subgroup(
             basis_of_orthogonal_subgroup, self._n
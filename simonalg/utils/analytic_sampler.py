@@ -0,0 +1,412 @@
+"""
+Contains the AnalyticSampler class, a local drop-in for SamplerV2 that does not simulate circuits.
+It recognizes the circuits generated by SimonCircuit by their metadata and samples the measured
+input register from the theoretical output distribution, which only takes polynomial time in n.
+"""
+
+import math
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.providers import JobStatus
+from qiskit.primitives.containers import BitArray, DataBin, PrimitiveResult, SamplerPubResult
+from qiskit.primitives.containers.sampler_pub import SamplerPub
+from qiskit.providers import BackendV2, Options
+from qiskit.transpiler import Target
+
+from simonalg.simon_circuit import SimonCircuit, SIMON_METADATA_KEY, STANDARD_CIRCUIT_KIND
+from simonalg.simon_circuit import REMOVE_ZERO_CIRCUIT_KIND, exact_amplification_angle
+from simonalg.utils.circuit import EXACT_PROBABILITY_TOLERANCE
+
+
+ANALYTIC_BACKEND_NAME = 'analytic_simon_sampler'
+
+ANALYTIC_BACKEND_BASIS_GATES = ['u', 'cx', 'measure', 'reset']
+
+
+def bitstrings_to_matrix(bitstrings, n):
+    matrix = np.zeros((len(bitstrings), n), dtype=np.uint8)
+    for row, bitstring in enumerate(bitstrings):
+        matrix[row] = [bit == '1' for bit in bitstring]
+    return matrix
+
+
+def row_reduce_mod_2(matrix, column_count):
+    """
+    Parameters:
+        - matrix is a NumPy array of 0s and 1s with column_count columns.
+    Returns a tuple (reduced, pivot_columns), where the rows of reduced are the nonzero rows of
+    the reduced row echelon form of matrix mod 2 and pivot_columns are their pivot columns.
+    """
+    reduced = matrix.copy() % 2
+    pivot_columns = []
+    row = 0
+    for column in range(column_count):
+        candidates = np.flatnonzero(reduced[row:, column]) if row < len(reduced) else []
+        if len(candidates) == 0:
+            continue
+        pivot_row = row + candidates[0]
+        reduced[[row, pivot_row]] = reduced[[pivot_row, row]]
+        other_rows = np.flatnonzero(reduced[:, column])
+        other_rows = other_rows[other_rows != row]
+        reduced[other_rows] ^= reduced[row]
+        pivot_columns.append(column)
+        row += 1
+    return reduced[:row], pivot_columns
+
+
+def get_nullspace_mod_2(matrix, column_count):
+    """
+    Parameters:
+        - matrix is a NumPy array of 0s and 1s with column_count columns.
+    Returns a NumPy array whose rows form a basis of {x : matrix x = 0 mod 2}. Unlike
+    get_basis_of_nullspace_mod_2 from simonalg.postprocessing, this works on NumPy arrays and is
+    meant for repeated calls on small matrices.
+    """
+    reduced, pivot_columns = row_reduce_mod_2(matrix, column_count)
+    free_columns = [c for c in range(column_count) if c not in pivot_columns]
+    nullspace = np.zeros((len(free_columns), column_count), dtype=np.uint8)
+    for basis_index, free_column in enumerate(free_columns):
+        nullspace[basis_index, free_column] = 1
+        for pivot_row, pivot_column in enumerate(pivot_columns):
+            nullspace[basis_index, pivot_column] = reduced[pivot_row, free_column]
+    return nullspace
+
+
+def _get_subspace_with_zero_columns(basis, columns):
+    """
+    Returns a basis of the elements spanned by the rows of basis that have a 0 at all columns.
+    """
+    if len(columns) == 0 or len(basis) == 0:
+        return basis
+    coefficients = get_nullspace_mod_2(basis[:, columns].T, len(basis))
+    return (coefficients.astype(np.int64) @ basis % 2).astype(np.uint8)
+
+
+def get_amplified_good_state_probability(good_state_probability, angle):
+    """
+    Parameters:
+        - good_state_probability is the probability a of measuring a good state after the
+          forward circuit.
+        - angle is the phase angle phi of S_chi(phi) and S_0(phi).
+    Returns the probability of measuring a good state after a single amplitude amplification
+    step, i.e. a |e^(i phi) - (1 - e^(i phi)) (a e^(i phi) + 1 - a)|^2, see
+    https://ieeexplore.ieee.org/abstract/document/595153, Lemma 8.
+    """
+    phase = complex(math.cos(angle), math.sin(angle))
+    inner_product = good_state_probability * phase + 1 - good_state_probability
+    return min(1.0, good_state_probability * abs(phase - (1 - phase) * inner_product) ** 2)
+
+
+class SimonOutputDistribution:
+    """
+    The theoretical distribution of the input register measured at the end of a circuit
+    generated by SimonCircuit. Its support is the subgroup K of the orthogonal subgroup that
+    consists of the elements with a 0 at all blocking indices. For the standard circuit, the
+    outcomes are uniformly distributed on K. For a remove-zero circuit, the good states of K
+    are uniformly distributed with total probability good_state_probability and so are the bad
+    states of K with the remaining probability.
+    """
+    def __init__(self, orthogonal_subgroup_basis, metadata):
+        """
+        Parameters:
+            - orthogonal_subgroup_basis is a NumPy array whose rows are a basis of the
+              orthogonal subgroup, where column k holds the k-th character of the bitstrings.
+            - metadata is the dict stored under SIMON_METADATA_KEY in the circuit metadata.
+        """
+        self.n = orthogonal_subgroup_basis.shape[1]
+        blocked_columns = [self.n - 1 - j for _, j in metadata['blocking_clauses']]
+        self.support_basis = _get_subspace_with_zero_columns(
+            orthogonal_subgroup_basis, blocked_columns
+        )
+        self.good_state_columns = [self.n - 1 - i for i in metadata['good_state_indices']]
+        self.bad_state_basis = _get_subspace_with_zero_columns(
+            self.support_basis, self.good_state_columns
+        )
+
+        if metadata['kind'] == STANDARD_CIRCUIT_KIND:
+            self.good_state_probability = 0.0
+            self.bad_state_basis = self.support_basis
+        elif metadata['kind'] == REMOVE_ZERO_CIRCUIT_KIND:
+            forward_good_state_probability = 1 - 2.0 ** (
+                len(self.bad_state_basis) - len(self.support_basis)
+            )
+            self.good_state_probability = get_amplified_good_state_probability(
+                forward_good_state_probability, metadata['angle']
+            )
+        else:
+            raise ValueError(f'Unknown kind of Simon circuit {metadata["kind"]}.')
+
+
+    def _sample_span(self, basis, count, rng):
+        # Floating point products are exact for n < 2 ** 24 and use BLAS, unlike integer ones
+        coefficients = rng.integers(0, 2, size=(count, len(basis)), dtype=np.uint8)
+        products = coefficients.astype(np.float32) @ basis.astype(np.float32)
+        return (products.astype(np.int64) & 1).astype(np.uint8)
+
+
+    def sample(self, shots, rng):
+        """
+        Returns a NumPy array of shape (shots, n) holding one sampled bitstring per row.
+        """
+        good_state_count = rng.binomial(shots, self.good_state_probability)
+        samples = [self._sample_span(self.bad_state_basis, shots - good_state_count, rng)]
+        # At least half of the support are good states, so rejection sampling is cheap
+        while good_state_count > 0:
+            candidates = self._sample_span(self.support_basis, 2 * good_state_count, rng)
+            good_states = candidates[candidates[:, self.good_state_columns].any(axis=1)]
+            samples.append(good_states[:good_state_count])
+            good_state_count -= len(samples[-1])
+        sampled_bitstrings = np.concatenate(samples)
+        rng.shuffle(sampled_bitstrings)
+        return sampled_bitstrings
+
+
+    def probabilities(self):
+        """
+        Returns a dict mapping each bitstring with nonzero probability to its probability. Only
+        meant for small n.
+        """
+        def span(basis):
+            return [''.join(str(b) for b in element)
+                    for element in self._sample_span_exhaustively(basis)]
+
+        bad_states = span(self.bad_state_basis)
+        good_states = sorted(set(span(self.support_basis)).difference(bad_states))
+        probabilities = dict(
+            (s, (1 - self.good_state_probability) / len(bad_states)) for s in bad_states
+        )
+        for good_state in good_states:
+            probabilities[good_state] = self.good_state_probability / len(good_states)
+        return dict(
+            (s, p) for s, p in probabilities.items() if p > EXACT_PROBABILITY_TOLERANCE
+        )
+
+
+    def _sample_span_exhaustively(self, basis):
+        coefficients = np.array(
+            [[(k >> b) & 1 for b in range(len(basis))] for k in range(2 ** len(basis))],
+            dtype=np.int64
+        ).reshape(2 ** len(basis), len(basis))
+        return (coefficients @ basis.astype(np.int64) % 2).astype(np.uint8)
+
+
+def get_simon_metadata(circuit):
+    """
+    Returns the metadata SimonCircuit attached to circuit. Raises a ValueError if there is none.
+    """
+    metadata = (circuit.metadata or {}).get(SIMON_METADATA_KEY)
+    if metadata is None:
+        raise ValueError(f'Circuit {circuit.name} was not generated by a SimonCircuit.')
+    return metadata
+
+
+class AnalyticBackend(BackendV2):
+    """
+    An ideal backend without coupling map whose only purpose is to transpile circuits for the
+    AnalyticSampler. Running circuits on it directly is not supported.
+    """
+    def __init__(self, num_qubits=4096):
+        super().__init__(name=ANALYTIC_BACKEND_NAME)
+        self._target = Target.from_configuration(
+            basis_gates=ANALYTIC_BACKEND_BASIS_GATES, num_qubits=num_qubits
+        )
+
+
+    @property
+    def target(self):
+        return self._target
+
+
+    @property
+    def max_circuits(self):
+        return None
+
+
+    @classmethod
+    def _default_options(cls):
+        return Options()
+
+
+    def run(self, run_input, **options):
+        raise NotImplementedError('Run circuits via the AnalyticSampler.')
+
+
+class AnalyticJob:
+    """
+    A job of the AnalyticSampler. Sampling is cheap, so the result is computed on submission.
+    """
+    def __init__(self, result):
+        self._job_id = str(uuid.uuid4())
+        self._result = result
+
+
+    def job_id(self):
+        return self._job_id
+
+
+    def result(self):
+        return self._result
+
+
+    def status(self):
+        return JobStatus.DONE
+
+
+    def done(self):
+        return True
+
+
+    def cancel(self):
+        return False
+
+
+class AnalyticSampler:
+    """
+    Samples the outcomes of circuits generated by SimonCircuit from their theoretical
+    distribution (see SimonOutputDistribution) with NumPy instead of simulating them. Circuits
+    are recognized by the metadata stored under SIMON_METADATA_KEY, which survives adding
+    measurements and transpiling. Only measurements of the input register are supported. Use it
+    like a SamplerV2, e.g. as sampler in the SimonSolver constructor, to test the control flow of
+    the solver at scales no simulator can handle. Together with AnalyticSimonCircuit and a
+    PassThroughTranspiler, no circuit is built or transpiled at all.
+    """
+    def __init__(self, default_shots=1024, seed=None, backend=None):
+        """
+        Parameters:
+            - default_shots is the number of shots of PUBs without shots.
+            - seed is optional. If present, it seeds the random number generator.
+            - backend is optional. Defaults to an AnalyticBackend.
+        """
+        self._backend = backend if backend is not None else AnalyticBackend()
+        self._rng = np.random.default_rng(seed)
+        self._orthogonal_subgroup_bases = {}
+        self.options = SimpleNamespace(
+            default_shots=default_shots, simulator=SimpleNamespace(seed_simulator=seed)
+        )
+
+
+    def backend(self):
+        return self._backend
+
+
+    def _get_orthogonal_subgroup_basis(self, hidden_subgroup):
+        key = tuple(hidden_subgroup)
+        if key not in self._orthogonal_subgroup_bases:
+            n = len(hidden_subgroup[0])
+            self._orthogonal_subgroup_bases[key] = get_nullspace_mod_2(
+                bitstrings_to_matrix(hidden_subgroup, n), n
+            )
+        return self._orthogonal_subgroup_bases[key]
+
+
+    def get_distribution(self, circuit):
+        """
+        Returns the SimonOutputDistribution of circuit. Raises a ValueError if circuit was not
+        generated by SimonCircuit.
+        """
+        metadata = get_simon_metadata(circuit)
+        return SimonOutputDistribution(
+            self._get_orthogonal_subgroup_basis(metadata['hidden_subgroup']), metadata
+        )
+
+
+    def _get_virtual_qubit_indices(self, circuit):
+        if circuit.layout is None:
+            return None
+        physical_to_virtual = {}
+        for virtual, physical in enumerate(circuit.layout.final_index_layout()):
+            physical_to_virtual[physical] = virtual
+        return physical_to_virtual
+
+
+    def _run_pub(self, pub):
+        circuit = pub.circuit
+        distribution = self.get_distribution(circuit)
+        sampled_bitstrings = distribution.sample(pub.shots, self._rng)
+        physical_to_virtual = self._get_virtual_qubit_indices(circuit)
+
+        bits_per_register = dict(
+            (r.name, np.zeros((pub.shots, r.size), dtype=bool)) for r in circuit.cregs
+        )
+        for instruction in circuit.data:
+            if instruction.operation.name != 'measure':
+                continue
+            qubit_index = circuit.find_bit(instruction.qubits[0]).index
+            if physical_to_virtual is not None:
+                qubit_index = physical_to_virtual[qubit_index]
+            if qubit_index >= distribution.n:
+                raise ValueError('The AnalyticSampler only supports measuring the input register.')
+            for register, bit_index in circuit.find_bit(instruction.clbits[0]).registers:
+                bits_per_register[register.name][:, bit_index] = (
+                    sampled_bitstrings[:, distribution.n - 1 - qubit_index]
+                )
+
+        data = DataBin(**dict(
+            (name, BitArray.from_bool_array(bits, order='little'))
+            for name, bits in bits_per_register.items()
+        ), shape=())
+        return SamplerPubResult(data, metadata={'shots': pub.shots})
+
+
+    def _run(self, pubs):
+        return PrimitiveResult([self._run_pub(pub) for pub in pubs], metadata={'version': 2})
+
+
+    def run(self, pubs, *, shots=None):
+        """
+        Parameters:
+            - pubs are circuits or PUBs as accepted by SamplerV2.run.
+            - shots is optional. If present, it overrides default_shots.
+        Returns a job holding the sampled results in the format of SamplerV2.
+        """
+        shots = shots if shots is not None else self.options.default_shots
+        return AnalyticJob(self._run([SamplerPub.coerce(pub, shots) for pub in pubs]))
+
+
+class AnalyticSimonCircuit(SimonCircuit):
+    """
+    A SimonCircuit whose circuits only hold the input register and the metadata of the real
+    circuits, but no gates. Building them takes no time, even if the oracle circuit would take
+    exponential time. The circuits are only meaningful to an AnalyticSampler.
+    """
+    def _generate_empty_circuit(self):
+        return QuantumCircuit(self.circuit_wrapper.input_register)
+
+
+    def generate_standard_simon_circuit(self):
+        circuit = self._generate_empty_circuit()
+        circuit.metadata = self.get_circuit_metadata(STANDARD_CIRCUIT_KIND)
+        return circuit
+
+
+    def generate_remove_zero_circuit(self, blockingclauses, index, for_aer_simulator=False):
+        circuit = self._generate_empty_circuit()
+        circuit.metadata = self.get_circuit_metadata(
+            REMOVE_ZERO_CIRCUIT_KIND, blockingclauses, [index], math.pi / 2
+        )
+        return circuit
+
+
+    def generate_multi_index_remove_zero_circuit(
+            self, blockingclauses, indices, good_state_probability=0.5, for_aer_simulator=False
+        ):
+        circuit = self._generate_empty_circuit()
+        circuit.metadata = self.get_circuit_metadata(
+            REMOVE_ZERO_CIRCUIT_KIND,
+            blockingclauses,
+            indices,
+            exact_amplification_angle(good_state_probability)
+        )
+        return circuit
+
+
+class PassThroughTranspiler:
+    """
+    A transpiler as accepted by SimonSolver that returns circuits unchanged. The AnalyticSampler
+    does not need transpiled circuits.
+    """
+    def transpile(self, circuit, backend):
+        return circuit
@@ -0,0 +1,185 @@
+"""
+Contains the JobBatchingCoordinator class, which collects the circuits of concurrently running
+solvers and submits them together. Many independent solves then share a few large jobs instead
+of each submitting many small ones.
+"""
+
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from simonalg.utils.logging import log
+from simonalg.utils.circuit import add_measurements_to_circuit, get_counts_of_job
+from simonalg.utils.circuit import get_execution_backend, transpile_circuits
+from simonalg.utils.circuit import split_counts_into_registers, submit_transpiled_circuits
+from simonalg.utils.transpilation import backend_fingerprint
+
+
+def _describe_options(options):
+    if hasattr(options, 'items'):
+        return repr(sorted((name, _describe_option(value)) for name, value in options.items()))
+    return repr(options)
+
+
+def _describe_option(value):
+    # Noise models only show their basis gates in their repr
+    if hasattr(value, 'to_dict'):
+        return repr(value.to_dict())
+    return repr(value)
+
+
+def get_execution_key(sampler=None, backend=None, shots=None):
+    """
+    Parameters:
+        - sampler, backend are as in run_circuits_and_measure_registers.
+        - shots is as in JobBatchingCoordinator.run_circuits_and_measure_registers.
+    Returns a key that is equal for two requests iff their circuits can be submitted as one job,
+    i.e. if they use the same API, the execution backends have the same fingerprint (see
+    backend_fingerprint) and the options of the backend and sampler as well as shots agree.
+    Unlike the object identities, the key is the same for separate sampler instances on the
+    same backend.
+    """
+    use_primitives_v2_api = sampler and (not backend)
+    execution_backend = get_execution_backend(sampler=sampler, backend=backend)
+    options = [_describe_options(execution_backend.options)]
+    if use_primitives_v2_api:
+        options.append(_describe_options(getattr(sampler, 'options', None)))
+    options_fingerprint = hashlib.sha256('\n'.join(options).encode()).hexdigest()
+    return (
+        bool(use_primitives_v2_api), backend_fingerprint(execution_backend),
+        options_fingerprint, shots
+    )
+
+
+class _PendingBatch:
+    def __init__(self, sampler, backend, shots):
+        self.sampler = sampler
+        self.backend = backend
+        self.shots = shots
+        self.requests = []
+        self.timer = None
+
+
+    def circuit_count(self):
+        return sum(len(circuits_and_boundaries) for circuits_and_boundaries, _ in self.requests)
+
+
+class JobBatchingCoordinator:
+    """
+    Collects the circuits requested within a time window and submits those with the same
+    execution key (see get_execution_key) as a single job via the sampler or backend of the
+    first request, i.e. as one multi-PUB job via the Primitives V2 API or as one list via the
+    backend.run API. Every caller blocks until the job is done and gets back the counts of its
+    own circuits. Share one instance as
+    job_batching_coordinator among solvers running in different threads, e.g. via
+    solve_concurrently.
+    """
+    def __init__(self, window=0.05, max_batch_size=None, transpiler=None):
+        """
+        Parameters:
+            - window is the number of seconds circuits are collected after the first circuit of
+              a batch was requested.
+            - max_batch_size is optional. If present, a batch is submitted right away once it
+              holds this many circuits.
+            - transpiler is as in SimonSolver.
+        """
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._transpiler = transpiler
+        self._batches = {}
+        self._lock = threading.Lock()
+        self.job_count = 0
+        self.circuit_count = 0
+
+
+    def run_circuits_and_measure_registers(
+        self, circuits, registers, sampler=None, backend=None, shots=None
+    ):
+        """
+        Parameters:
+            - circuits, registers, sampler, backend are as in
+              run_circuits_and_measure_registers.
+            - shots is optional. If present, it overrides the default shots of sampler or
+              backend.
+        Adds circuits to the pending batch for the execution key of sampler or backend and 
+        waits until the batch has been run. Returns a list of counts dicts in the order of circuits.
+        """
+        if len(circuits) == 0:
+            return []
+
+        circuits_and_boundaries = [add_measurements_to_circuit(c, registers) for c in circuits]
+        future = Future()
+        key = get_execution_key(sampler=sampler, backend=backend, shots=shots)
+        full_batch = None
+        with self._lock:
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = _PendingBatch(sampler, backend, shots)
+                batch.timer = threading.Timer(self._window, self._flush, args=(key, batch))
+                batch.timer.daemon = True
+                batch.timer.start()
+                self._batches[key] = batch
+            batch.requests.append((circuits_and_boundaries, future))
+            if self._max_batch_size is not None and batch.circuit_count() >= self._max_batch_size:
+                batch.timer.cancel()
+                full_batch = self._batches.pop(key)
+
+        if full_batch is not None:
+            self._submit_batch(full_batch)
+        return future.result()
+
+
+    def _flush(self, key, batch):
+        with self._lock:
+            if self._batches.get(key) is not batch:
+                return
+            del self._batches[key]
+        self._submit_batch(batch)
+
+
+    def _submit_batch(self, batch):
+        circuits = [c for circuits_and_boundaries, _ in batch.requests
+                    for c, _ in circuits_and_boundaries]
+        log.info(
+            'Submitting %d circuit(s) of %d request(s) as a single job',
+            len(circuits), len(batch.requests)
+        )
+        try:
+            execution_backend = get_execution_backend(sampler=batch.sampler, backend=batch.backend)
+            transpiled_circuits = transpile_circuits(
+                circuits, execution_backend, transpiler=self._transpiler
+            )
+            job = submit_transpiled_circuits(
+                transpiled_circuits, sampler=batch.sampler, backend=batch.backend, shots=batch.shots
+            )
+            counts = get_counts_of_job(
+                job, len(circuits), ['measure'], sampler=batch.sampler, backend=batch.backend
+            )
+        except Exception as exception: # pylint: disable=broad-exception-caught
+            # The exception is raised in the threads of all callers of the batch instead
+            for _, future in batch.requests:
+                future.set_exception(exception)
+            return
+
+        with self._lock:
+            self.job_count += 1
+            self.circuit_count += len(circuits)
+        offset = 0
+        for circuits_and_boundaries, future in batch.requests:
+            future.set_result([
+                split_counts_into_registers(counts[offset + k][0], boundaries)
+                for k, (_, boundaries) in enumerate(circuits_and_boundaries)
+            ])
+            offset += len(circuits_and_boundaries)
+
+
+def solve_concurrently(solvers, max_workers=None):
+    """
+    Parameters:
+        - solvers is a list of SimonSolver instances, typically sharing a
+          JobBatchingCoordinator.
+        - max_workers is the number of threads. Defaults to one thread per solver.
+    Runs the solve method of all solvers in parallel threads. Returns the list of their results.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or max(1, len(solvers))) as executor:
+        return list(executor.map(lambda solver: solver.solve(), solvers))
@@ -0,0 +1,91 @@
+"""
+Contains the SolverState class, which holds the progress of a SimonSolver in a serializable form,
+and functions to checkpoint it atomically to disk.
+"""
+
+import json
+import os
+import tempfile
+
+
+SOLVER_STATE_VERSION = 1
+
+
+class SolverState:
+    """
+    Holds everything needed to continue a solve: the accepted orthogonal subgroup elements
+    together with their blocking indices, the blocked indices, the number of completed
+    iterations and the IDs of the jobs that were submitted but whose results were not evaluated
+    yet, together with a description of the circuits they ran.
+    """
+    def __init__(
+        self, n, y=None, blocked_indices=None, iteration=0, pending_job_ids=None,
+        pending_circuits=None
+    ):
+        """
+        Parameters:
+            - n is the length of the input register of the solved instance.
+            - y is the list of tuples (element, blocking_index) sampled so far.
+            - blocked_indices is the set of blocked indices.
+            - iteration is the number of completed iterations.
+            - pending_job_ids is the list of IDs of submitted jobs not evaluated yet.
+            - pending_circuits is the list of dicts describing the circuits of the pending jobs, 
+              each holding the circuit fingerprint and the working indices of the circuit.
+        """
+        self.n = n
+        self.y = y if y is not None else []
+        self.blocked_indices = blocked_indices if blocked_indices is not None else set()
+        self.iteration = iteration
+        self.pending_job_ids = pending_job_ids if pending_job_ids is not None else []
+        self.pending_circuits = pending_circuits if pending_circuits is not None else []
+
+
+    def to_dict(self):
+        return {
+            'version': SOLVER_STATE_VERSION,
+            'n': self.n,
+            'y': [[element, blocking_index] for element, blocking_index in self.y],
+            'blocked_indices': sorted(self.blocked_indices),
+            'iteration': self.iteration,
+            'pending_job_ids': list(self.pending_job_ids),
+            'pending_circuits': list(self.pending_circuits)
+        }
+
+
+    @classmethod
+    def from_dict(cls, state):
+        if state.get('version') != SOLVER_STATE_VERSION:
+            raise ValueError(f'Unsupported solver state version {state.get("version")}.')
+        return cls(
+            state['n'],
+            y=[(element, blocking_index) for element, blocking_index in state['y']],
+            blocked_indices=set(state['blocked_indices']),
+            iteration=state['iteration'],
+            pending_job_ids=state['pending_job_ids'],
+            # Checkpoints written before circuits were recorded never match pending circuits
+            pending_circuits=state.get('pending_circuits', [])
+        )
+
+
+def save_solver_state(state, path):
+    """
+    Writes state as JSON to path. The file is written to a temporary file first and then moved
+    into place, so that path holds either the previous or the new state, even if the process
+    dies while writing.
+    """
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp'
+    )
+    with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file:
+        json.dump(state.to_dict(), file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+def load_solver_state(path):
+    """
+    Returns the SolverState stored at path by save_solver_state.
+    """
+    with open(path, encoding='utf-8') as file:
+        return SolverState.from_dict(json.load(file))
@@ -4,13 +4,44 @@ Furthermore, there are utility methods for constructing circuits for many quantu
 needed in the extended version of Simon's algorithm.
 """
 
+import io
 import math
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from functools import reduce
 
-from qiskit import QuantumRegister, ClassicalRegister, QuantumCircuit, transpile
+from qiskit import QuantumRegister, ClassicalRegister, QuantumCircuit, transpile, qpy
+from qiskit.circuit import Barrier
 from qiskit.transpiler.passes import RemoveBarriers
+from qiskit_aer.library import save_probabilities
 
+from simonalg.utils.counts import IntegerCounts, merge_counts
 from simonalg.utils.logging import log
+from simonalg.utils.simulation import ANCILLA_REGISTER_NAME, is_aer_simulator
+
+
+# One pool qubit holds the conjunction of all controls, the other one is scratch space for the
+# recursive MCX decomposition.
+MIN_ANCILLA_POOL_SIZE = 2
+
+ANCILLA_RESET_LABEL = 'ancilla_reset'
+
+
+class AncillaResetMarker(Barrier):
+    """
+    A barrier marking a point in the circuit where all qubits it spans are guaranteed to be in
+    state |0>. Unlike a plain barrier, the marker survives circuit inversion, so it can be placed
+    in circuits that later get inverted. Before execution, replace_ancilla_reset_markers turns
+    each marker into reset operations. The multi-controlled gates already uncompute the ancillas
+    to |0>, so on ideal hardware the resets change nothing. They only clear residual
+    excitations left by noise, before the next stage reuses the pool.
+    """
+    def __init__(self, num_qubits):
+        super().__init__(num_qubits, label=ANCILLA_RESET_LABEL)
+
+
+    def inverse(self, annotated=False):
+        return AncillaResetMarker(self.num_qubits)
 
 
 class CircuitWrapper():
@@ -21,7 +52,8 @@ class CircuitWrapper():
     def __init__(self,
                  hidden_subgroup,
                  custom_output_register_size=None,
-                 custom_ancilla_register_size=None
+                 custom_ancilla_register_size=None,
+                 ancilla_pool_size=None
                  ):
         """
         Parameters:
@@ -34,6 +66,12 @@ class CircuitWrapper():
             - custom_ancilla_register_size should be used for custom oracle implementations that 
               need more ancilla qubits than the strict lower bound (total_number_of_qubits - 1) 
               needed for the multi-controlled CNOT gates.
+            - ancilla_pool_size is optional. If present, the ancilla register only holds this many 
+              qubits (at least MIN_ANCILLA_POOL_SIZE) and multi-controlled gates that do not fit 
+              the ancilla chain fall back to a decomposition that needs a single scratch qubit. 
+              The width shrinks, since every gate reuses the same pool qubits. It has to hold at 
+              least custom_ancilla_register_size qubits, if both are given. The pool may be 
+              marked for a reset between uses, see insert_ancilla_reset_marker.
         Returns an empty circuit with the exact number of qubits needed for running an instance of 
         Simon's problem.
         """
@@ -54,8 +92,22 @@ class CircuitWrapper():
         default_ancilla_register_size = sum([
             input_register_size, output_register_size, blockingclause_register_size, -1
         ])
-        ancilla_register_size = custom_ancilla_register_size or default_ancilla_register_size
-        self.ancilla_register = QuantumRegister(ancilla_register_size, 'anc')
+        if ancilla_pool_size is not None and ancilla_pool_size < MIN_ANCILLA_POOL_SIZE:
+            raise ValueError(
+                f'An ancilla pool needs at least {MIN_ANCILLA_POOL_SIZE} qubits, '
+                f'got {ancilla_pool_size}.'
+            )
+        if (ancilla_pool_size is not None and custom_ancilla_register_size is not None
+                and ancilla_pool_size < custom_ancilla_register_size):
+            raise ValueError(
+                f'An ancilla pool of {ancilla_pool_size} qubits cannot hold the '
+                f'{custom_ancilla_register_size} ancillas of the custom oracle.'
+            )
+        self.ancilla_pool_size = ancilla_pool_size
+        ancilla_register_size = (
+            ancilla_pool_size or custom_ancilla_register_size or default_ancilla_register_size
+        )
+        self.ancilla_register = QuantumRegister(ancilla_register_size, ANCILLA_REGISTER_NAME)
 
 
     def get_registers(self):
@@ -142,6 +194,43 @@ def reverse_mcx_halfchain(circuit, input_register, ancilla_register):
     circuit.ccx(input_register[0], input_register[1], ancilla_register[0])
 
 
+def fits_mcx_halfchain(control_count, ancilla_count):
+    """
+    Parameters:
+        - control_count is the number of control qubits of a multi-controlled gate.
+        - ancilla_count is the number of available ancilla qubits.
+    Returns True iff the ancilla chain from mcx_halfchain fits into ancilla_count qubits.
+    """
+    return control_count <= 2 or ancilla_count >= control_count - 2
+
+
+def pooled_mcx(circuit, control_qubits, ancilla_register, target_qubits):
+    """
+    Parameters:
+        - circuit is the quantum circuit currently being worked on.
+        - control_qubits are the control qubits for MCX.
+        - ancilla_register holds at least MIN_ANCILLA_POOL_SIZE ancilla qubits in state |0>.
+        - target_qubits are the the target qubits for MCX.
+    Executes MCX for each target_qubit using the recursive MCX decomposition, which needs a 
+    single scratch qubit regardless of the number of controls. For more than one target, the 
+    conjunction of the controls is computed into the first ancilla qubit once and uncomputed 
+    afterwards. All ancilla qubits are returned to |0>.
+    """
+    control_qubits = list(control_qubits)
+    ancilla_qubits = list(ancilla_register)
+    target_qubits = list(target_qubits)
+
+    if len(target_qubits) == 1:
+        circuit.mcx(control_qubits, target_qubits[0], ancilla_qubits, mode='recursion')
+        return
+
+    conjunction_qubit, scratch_qubits = ancilla_qubits[0], ancilla_qubits[1:]
+    circuit.mcx(control_qubits, conjunction_qubit, scratch_qubits, mode='recursion')
+    for target_qubit in target_qubits:
+        circuit.cx(conjunction_qubit, target_qubit)
+    circuit.mcx(control_qubits, conjunction_qubit, scratch_qubits, mode='recursion')
+
+
 def optimized_mcx(circuit, input_register, ancilla_register, target_qubits):
     """
     Parameters:
@@ -152,7 +241,12 @@ def optimized_mcx(circuit, input_register, ancilla_register, target_qubits):
           qubits.
         - target_qubits are the the target qubits for MCX.
     Executes MCX for each target_qubit where the control qubits are all qubits in input_register. 
+    If ancilla_register is too small for the ancilla chain, falls back to pooled_mcx.
     """
+    if not fits_mcx_halfchain(len(input_register), len(ancilla_register)):
+        pooled_mcx(circuit, input_register, ancilla_register, target_qubits)
+        return
+
     mcx_halfchain(circuit, input_register, ancilla_register)
 
     in_register_size = input_register.size
@@ -190,7 +284,7 @@ def conditional_phase_shift_by_index(circuit, input_register, ancilla_register,
     circuit.cx(control_qubit, target_qubit)
 
 
-def conditional_phase_shift_by_zero_vec(circuit, input_register, ancilla_register):
+def conditional_phase_shift_by_zero_vec(circuit, input_register, ancilla_register, angle=None):
     """
     Parameters:
         - circuit is the quantum circuit currently being worked on.
@@ -198,32 +292,47 @@ def conditional_phase_shift_by_zero_vec(circuit, input_register, ancilla_registe
         - ancilla_register holds ancilla qubits for both MCX and the conditional phase shift.
           We must have at least as many ancilla qubits as input qubits (n-1 for MCX and one
           for the phase shift).
+        - angle is optional. If present, the phase is shifted by e^(i*angle) instead of i.
     Implements the operator S_{0} from https://ieeexplore.ieee.org/abstract/document/595153, 
     Lemma 8. It shifts the phase of the quantum state by i precisely if the input register is 
-    the all-zero vector.
+    the all-zero vector. If ancilla_register is too small for the ancilla chain, the 
+    multi-controlled part is implemented via pooled_mcx.
     """
+    def phase_shift(qubit):
+        if angle is None:
+            circuit.s(qubit)
+        else:
+            circuit.p(angle, qubit)
+
     ancilla_target = ancilla_register[len(ancilla_register) - 1]
     in_register_size = len(input_register)
 
     circuit.x(input_register)
 
-    if in_register_size == 1:
-        circuit.s(input_register[0])
+    uses_ancilla_pool = not fits_mcx_halfchain(in_register_size + 1, len(ancilla_register))
+    if in_register_size > 2 and uses_ancilla_pool:
+        pooled_ancillas = list(ancilla_register)
+        conjunction_qubit, scratch_qubits = pooled_ancillas[0], pooled_ancillas[1:]
+        circuit.mcx(list(input_register), conjunction_qubit, scratch_qubits, mode='recursion')
+        phase_shift(conjunction_qubit)
+        circuit.mcx(list(input_register), conjunction_qubit, scratch_qubits, mode='recursion')
+    elif in_register_size == 1:
+        phase_shift(input_register[0])
     elif in_register_size == 2:
         circuit.ccx(input_register[0], input_register[1], ancilla_target)
-        circuit.s(ancilla_target)
+        phase_shift(ancilla_target)
         circuit.ccx(input_register[0], input_register[1], ancilla_target)
     else:
         mcx_halfchain(circuit, input_register, ancilla_register)
         circuit.ccx(
             input_register[in_register_size - 1],
-            ancilla_register[ancilla_register.size - 2],
+            ancilla_register[in_register_size - 3],
             ancilla_target
         )
-        circuit.s(ancilla_target)
+        phase_shift(ancilla_target)
         circuit.ccx(
             input_register[in_register_size - 1],
-            ancilla_register[ancilla_register.size - 2],
+            ancilla_register[in_register_size - 3],
             ancilla_target
         )
         reverse_mcx_halfchain(circuit, input_register, ancilla_register)
@@ -231,7 +340,25 @@ def conditional_phase_shift_by_zero_vec(circuit, input_register, ancilla_registe
     circuit.x(input_register)
 
 
-def conditional_phase_shift_by_zero_vec_entire_register(circuit, registers, ancilla_register):
+def conditional_phase_shift_by_any_index(circuit, qubits, ancilla_register, angle):
+    """
+    Parameters:
+        - circuit is the quantum circuit currently being worked on.
+        - qubits is a list of qubits, e.g. the free indices of the input register.
+        - ancilla_register holds ancilla qubits as required by conditional_phase_shift_by_zero_vec
+          for len(qubits) inputs.
+        - angle is the phase shift.
+    Shifts the phase of the quantum state by e^(i*angle) precisely if at least one qubit in 
+    qubits is |1>. This is done by shifting the global phase by e^(i*angle) and undoing the shift
+    for the case that all qubits are |0>.
+    """
+    circuit.global_phase += angle
+    conditional_phase_shift_by_zero_vec(circuit, qubits, ancilla_register, angle=-angle)
+
+
+def conditional_phase_shift_by_zero_vec_entire_register(
+    circuit, registers, ancilla_register, angle=None
+):
     """
     Parameters:
         - circuit is the quantum circuit to which to append the phase shift gates.
@@ -239,6 +366,7 @@ def conditional_phase_shift_by_zero_vec_entire_register(circuit, registers, anci
           shift. 
         - ancilla_register holds ancilla qubits used for the simulation of multi-controlled
           gates.
+        - angle is passed on to conditional_phase_shift_by_zero_vec.
     Generates a quantum circuit that shifts the phase iff all qubits in registers hold 
     the value |0>.
     """
@@ -248,31 +376,220 @@ def conditional_phase_shift_by_zero_vec_entire_register(circuit, registers, anci
         return accumulator_list
     virtual_input_register = list(reduce(lambda a,b: append_qubits(b, a), registers, []))
 
-    conditional_phase_shift_by_zero_vec(circuit, virtual_input_register, ancilla_register)
+    conditional_phase_shift_by_zero_vec(
+        circuit, virtual_input_register, ancilla_register, angle=angle
+    )
 
 
-def remove_barriers_and_transpile_for_backend(circuit, backend):
+def insert_ancilla_reset_marker(circuit, ancilla_register):
+    """
+    Parameters:
+        - circuit is the quantum circuit currently being worked on.
+        - ancilla_register is the register whose qubits are all in state |0> at this point.
+    Appends an AncillaResetMarker on ancilla_register to circuit.
+    """
+    circuit.append(AncillaResetMarker(len(ancilla_register)), list(ancilla_register))
+
+
+def replace_ancilla_reset_markers(circuit):
+    """
+    Parameters:
+        - circuit is a quantum circuit which might contain AncillaResetMarker instructions.
+    Returns a new quantum circuit where every AncillaResetMarker is replaced by mid-circuit 
+    resets of the qubits it spans. Circuits without markers are returned unchanged.
+    """
+    def is_marker(instruction):
+        operation = instruction.operation
+        return operation.name == 'barrier' and operation.label == ANCILLA_RESET_LABEL
+
+    if not any(is_marker(instruction) for instruction in circuit.data):
+        return circuit
+
+    circuit_with_resets = circuit.copy_empty_like()
+    for instruction in circuit.data:
+        if is_marker(instruction):
+            for qubit in instruction.qubits:
+                circuit_with_resets.reset(qubit)
+        else:
+            circuit_with_resets.append(instruction)
+    return circuit_with_resets
+
+
+def remove_barriers_and_transpile_for_backend(circuit, backend, transpiler=None):
     """
     Parameters:
         - circuit the quantum circuit we want to remove all barriers on.
         - backend the quantum computer backend we want to transpile the circuit for.
-    Returns a new quantum circuit transpiled for backend.
+        - transpiler is optional. If present, it is an object with a transpile(circuit, backend)
+          method used instead of qiskit's transpile, e.g. a TranspileCache.
+    Returns a new quantum circuit transpiled for backend. Ancilla reset markers are turned into
+    mid-circuit resets before all remaining barriers are removed.
     """
-    circuit_without_barriers = RemoveBarriers()(circuit)
+    circuit_without_barriers = RemoveBarriers()(replace_ancilla_reset_markers(circuit))
+    if transpiler is not None:
+        return transpiler.transpile(circuit_without_barriers, backend)
     return transpile(circuit_without_barriers, backend)
 
 
-def add_measurements_to_circuit(circuit, registers):
+# Batches with fewer circuits are prepared serially, since shipping circuits and the backend to
+# worker processes does not pay off for them.
+SERIAL_BATCH_THRESHOLD = 2
+
+
+def circuit_to_qpy(circuit):
+    """
+    Serializes circuit into QPY bytes.
+    """
+    buffer = io.BytesIO()
+    qpy.dump(circuit, buffer)
+    return buffer.getvalue()
+
+
+def circuit_from_qpy(qpy_bytes):
+    """
+    Deserializes a circuit from QPY bytes.
+    """
+    return qpy.load(io.BytesIO(qpy_bytes))[0]
+
+
+# The backend and transpiler a PreparationExecutor worker process was initialized with
+_worker_state = {}
+
+
+def _initialize_preparation_worker(backend, transpiler):
+    _worker_state['backend'] = backend
+    _worker_state['transpiler'] = transpiler
+
+
+class PreparationExecutor(ProcessPoolExecutor):
+    """
+    A ProcessPoolExecutor whose worker processes receive backend and transpiler once on start 
+    instead of with every task. Each worker keeps its own transpiler across tasks, so e.g. a 
+    TranspileCache or SimonTranspiler gets warm per worker. Batches for other backends or 
+    transpilers still run on it, but then ship them with every task.
+    """
+    def __init__(self, backend, transpiler=None, max_workers=None):
+        """
+        Parameters:
+            - backend is the backend circuits get transpiled for.
+            - transpiler is as in remove_barriers_and_transpile_for_backend.
+            - max_workers is the number of worker processes. Defaults to the number of cores.
+        """
+        super().__init__(
+            max_workers=max_workers,
+            initializer=_initialize_preparation_worker,
+            initargs=(backend, transpiler)
+        )
+        self.backend = backend
+        self.transpiler = transpiler
+
+
+def _build_in_worker(build_fn, build_args):
+    return circuit_to_qpy(build_fn(*build_args))
+
+
+def _build_and_transpile_in_worker(build_fn, build_args, backend, transpiler):
+    circuit = build_fn(*build_args)
+    transpiled_circuit = remove_barriers_and_transpile_for_backend(
+        circuit, backend, transpiler=transpiler
+    )
+    return circuit_to_qpy(transpiled_circuit)
+
+
+def _build_and_transpile_in_initialized_worker(build_fn, build_args):
+    return _build_and_transpile_in_worker(
+        build_fn, build_args, _worker_state['backend'], _worker_state['transpiler']
+    )
+
+
+def build_circuits(build_tasks, executor=None, serial_threshold=SERIAL_BATCH_THRESHOLD):
+    """
+    Parameters:
+        - build_tasks, executor, serial_threshold are as in build_and_transpile_circuits.
+    Builds all circuits of the batch without transpiling them, on executor if the batch is 
+    large enough. Returns the circuits in the order of build_tasks.
+    """
+    if executor is None or len(build_tasks) < serial_threshold:
+        return [build_fn(*build_args) for build_fn, build_args in build_tasks]
+    futures = [executor.submit(_build_in_worker, build_fn, build_args)
+               for build_fn, build_args in build_tasks]
+    return [circuit_from_qpy(future.result()) for future in futures]
+
+
+def build_and_transpile_circuits(
+    build_tasks, backend, executor=None, transpiler=None, serial_threshold=SERIAL_BATCH_THRESHOLD
+):
+    """
+    Parameters:
+        - build_tasks is a list of tuples (build_fn, build_args) where build_fn(*build_args) 
+          returns a circuit, e.g. (simon_circuit.generate_remove_zero_circuit, (y, index)). 
+          build_fn and build_args must be picklable.
+        - backend is the backend we want to transpile the circuits for.
+        - executor is optional. If present, it is a concurrent.futures.ProcessPoolExecutor (or 
+          any executor with a submit method) on which the circuits get built and transpiled. A 
+          PreparationExecutor for backend and transpiler avoids pickling both for every task.
+        - transpiler is passed on to remove_barriers_and_transpile_for_backend. Worker processes
+          transpile with a pickled copy of it, whose state (e.g. the in-memory circuits and 
+          hit counts of a TranspileCache) does not flow back to this process. A TranspileCache 
+          with a directory shares its disk cache with the workers.
+        - serial_threshold is the minimum batch size for which executor is used.
+    Builds and transpiles all circuits of the batch. Transpiled circuits are passed back from 
+    the worker processes as QPY. Returns the transpiled circuits in the order of build_tasks.
+    """
+    if executor is None or len(build_tasks) < serial_threshold:
+        return [
+            remove_barriers_and_transpile_for_backend(
+                build_fn(*build_args), backend, transpiler=transpiler
+            ) for build_fn, build_args in build_tasks
+        ]
+
+    if (isinstance(executor, PreparationExecutor) and executor.backend is backend
+            and executor.transpiler is transpiler):
+        futures = [
+            executor.submit(_build_and_transpile_in_initialized_worker, build_fn, build_args)
+            for build_fn, build_args in build_tasks
+        ]
+    else:
+        futures = [
+            executor.submit(
+                _build_and_transpile_in_worker, build_fn, build_args, backend, transpiler
+            ) for build_fn, build_args in build_tasks
+        ]
+    return [circuit_from_qpy(future.result()) for future in futures]
+
+
+def transpile_circuits(
+    circuits, backend, executor=None, transpiler=None, serial_threshold=SERIAL_BATCH_THRESHOLD
+):
+    """
+    Parameters:
+        - circuits is a list of circuits we want to transpile for backend.
+        - executor, transpiler, serial_threshold are as in build_and_transpile_circuits.
+    Removes barriers and transpiles all circuits, on executor if the batch is large enough. 
+    Circuits are passed to the worker processes as QPY.
+    """
+    if executor is None or len(circuits) < serial_threshold:
+        return [remove_barriers_and_transpile_for_backend(c, backend, transpiler=transpiler)
+                for c in circuits]
+
+    build_tasks = [(circuit_from_qpy, (circuit_to_qpy(c),)) for c in circuits]
+    return build_and_transpile_circuits(
+        build_tasks, backend, executor=executor, transpiler=transpiler, serial_threshold=0
+    )
+
+
+def add_measurements_to_circuit(circuit, registers, classical_register_name='measure'):
     """
     Parameters:
         - circuits is the quantum circuit for which we want to add measurement operations.
         - registers are the circuit registers which we want to measure.
+        - classical_register_name is the name of the classical register holding the results.
     Constructs one large classical register onto which all specified quantum registers are
     measured. Returns the modified circuit as well as the register_boundaries list which
     keeps track of which quantum register is mapped to which part of the classical register.
     """
     total_measured_qubit_count = sum(len(r) for r in registers)
-    classical_register = ClassicalRegister(total_measured_qubit_count, 'measure')
+    classical_register = ClassicalRegister(total_measured_qubit_count, classical_register_name)
     creg_size = len(classical_register)
     circuit.add_register(classical_register)
 
@@ -301,7 +618,310 @@ def split_into_registers(key, boundaries):
     return ' '.join([key[b[0]:b[1]] for b in boundaries])
 
 
-def run_circuit_and_measure_registers(circuit, registers, sampler=None, backend=None):
+def split_counts_into_registers(counts, boundaries):
+    """
+    Parameters:
+        - counts is a counts dict as returned by a backend.
+        - boundaries is a list of intervals as in split_into_registers.
+    Returns counts where every key is split along the interval borders of boundaries.
+    """
+    return dict((split_into_registers(key, boundaries), counts[key]) for key in counts.keys())
+
+
+def _split_counts_by_classical_register(counts, classical_register_count):
+    """
+    Parameters:
+        - counts is a counts dict as returned by backend.run for a circuit with several 
+          classical registers. The keys hold the registers separated by whitespaces, the 
+          register added last comes first.
+        - classical_register_count is the number of classical registers of the circuit.
+    Returns a list of marginal counts dicts, one for each classical register in the order in 
+    which the registers were added to the circuit.
+    """
+    marginal_counts = [defaultdict(int) for _ in range(classical_register_count)]
+    for key, count in counts.items():
+        for register_index, register_value in enumerate(reversed(key.split(' '))):
+            marginal_counts[register_index][register_value] += count
+    return [dict(c) for c in marginal_counts]
+
+
+def get_execution_backend(sampler=None, backend=None):
+    """
+    Parameters:
+        - sampler, backend are as in run_circuit_and_measure_registers.
+    Returns the backend on which circuits get executed, i.e. the backend of sampler if the 
+    Primitives V2 API is used and backend otherwise.
+    """
+    use_primitives_v2_api = sampler and (not backend)
+    return sampler.backend() if use_primitives_v2_api else backend
+
+
+def submit_transpiled_circuits(transpiled_circuits, sampler=None, backend=None, shots=None):
+    """
+    Parameters:
+        - transpiled_circuits is a list of quantum circuits with measurements, transpiled for 
+          the execution backend.
+        - sampler, backend are as in run_circuit_and_measure_registers.
+        - shots is optional. If present, it overrides the default number of shots.
+    Submits all circuits as a single job, i.e. as one multi-PUB job via the Primitives V2 API or 
+    as one list via the backend.run API. Returns the job without waiting for its result.
+    """
+    use_primitives_v2_api = sampler and (not backend)
+    execution_backend = get_execution_backend(sampler=sampler, backend=backend)
+    log.info(
+        'Running %d circuit(s) on backend %s', len(transpiled_circuits), execution_backend.name
+    )
+    if use_primitives_v2_api:
+        return sampler.run(transpiled_circuits, shots=shots)
+    if shots is not None:
+        return backend.run(transpiled_circuits, shots=shots)
+    return backend.run(transpiled_circuits)
+
+
+def _counts_dict_to_integer_counts(counts):
+    num_bits = len(next(iter(counts))) if len(counts) > 0 else 0
+    return IntegerCounts.from_counts_dict(counts, num_bits)
+
+
+def get_counts_of_job(
+    job,
+    circuit_count,
+    classical_register_names,
+    sampler=None,
+    backend=None,
+    as_integer_counts=False
+):
+    """
+    Parameters:
+        - job is a job returned by submit_transpiled_circuits.
+        - circuit_count is the number of circuits in job.
+        - classical_register_names are the names of all classical registers of each circuit in 
+          the order in which they were added to the circuits.
+        - sampler, backend are as in run_circuit_and_measure_registers.
+        - as_integer_counts set this to True to get IntegerCounts instead of counts dicts. Via 
+          the Primitives V2 API, they are decoded from the packed bytes of the BitArrays.
+    Blocks until job is done. Returns a list holding, for each circuit, a list with one counts 
+    dict per classical register.
+    """
+    use_primitives_v2_api = sampler and (not backend)
+    if use_primitives_v2_api:
+        if as_integer_counts:
+            return [[IntegerCounts.from_bit_array(getattr(pub_result.data, name))
+                     for name in classical_register_names] for pub_result in job.result()]
+        return [[getattr(pub_result.data, name).get_counts() for name in classical_register_names]
+                for pub_result in job.result()]
+
+    result = job.result()
+    counts = [_split_counts_by_classical_register(
+                  result.get_counts(index), len(classical_register_names)
+              ) for index in range(circuit_count)]
+    if as_integer_counts:
+        return [[_counts_dict_to_integer_counts(c) for c in counts_of_circuit]
+                for counts_of_circuit in counts]
+    return counts
+
+
+def _run_transpiled_circuits_with_adaptive_shots(
+    transpiled_circuits,
+    classical_register_names,
+    shot_policy,
+    sampler=None,
+    backend=None,
+    as_integer_counts=False,
+    job_callback=None
+):
+    """
+    Parameters:
+        - transpiled_circuits is a list of quantum circuits with measurements, transpiled for 
+          the execution backend.
+        - classical_register_names is as in _run_circuits_and_get_counts.
+        - shot_policy is an AdaptiveShotPolicy from simonalg.utils.shots.
+        - sampler, backend, as_integer_counts, job_callback are as in 
+          run_circuits_and_measure_registers.
+    Runs all circuits with the initial number of shots of shot_policy. Circuits whose counts 
+    are not conclusive yet are run again with additional shots until they are or until the 
+    maximum number of shots is reached. Returns the accumulated counts as 
+    _run_circuits_and_get_counts does.
+    """
+    execution_backend = get_execution_backend(sampler=sampler, backend=backend)
+    counts = [None] * len(transpiled_circuits)
+    pending_indices = list(range(len(transpiled_circuits)))
+    shots = shot_policy.get_initial_shots(execution_backend)
+    total_shots = 0
+    while True:
+        job = submit_transpiled_circuits(
+            [transpiled_circuits[index] for index in pending_indices],
+            sampler=sampler,
+            backend=backend,
+            shots=shots
+        )
+        if job_callback is not None:
+            job_callback(job)
+        fresh_counts = get_counts_of_job(
+            job,
+            len(pending_indices),
+            classical_register_names,
+            sampler=sampler,
+            backend=backend,
+            as_integer_counts=as_integer_counts
+        )
+        for index, counts_of_circuit in zip(pending_indices, fresh_counts):
+            counts[index] = counts_of_circuit if counts[index] is None else [
+                merge_counts(a, b) for a, b in zip(counts[index], counts_of_circuit)
+            ]
+        total_shots += shots
+
+        pending_indices = [
+            index for index in pending_indices
+            if not all(shot_policy.is_conclusive(c, execution_backend) for c in counts[index])
+        ]
+        shots = shot_policy.get_additional_shots(total_shots)
+        if len(pending_indices) == 0:
+            return counts
+        if shots == 0:
+            log.warning(
+                'Results of %d circuit(s) are still ambiguous after %d shots',
+                len(pending_indices), total_shots
+            )
+            return counts
+        log.info(
+            'Results of %d circuit(s) are ambiguous after %d shots, running %d more shots',
+            len(pending_indices), total_shots, shots
+        )
+
+
+def _run_transpiled_circuits_and_get_counts(
+    transpiled_circuits,
+    classical_register_names,
+    sampler=None,
+    backend=None,
+    result_cache=None,
+    as_integer_counts=False,
+    shot_policy=None,
+    shots=None,
+    job_callback=None
+):
+    if shot_policy is not None:
+        return _run_transpiled_circuits_with_adaptive_shots(
+            transpiled_circuits,
+            classical_register_names,
+            shot_policy,
+            sampler=sampler,
+            backend=backend,
+            as_integer_counts=as_integer_counts,
+            job_callback=job_callback
+        )
+
+    use_result_cache = (
+        result_cache is not None
+        and shots is None
+        and result_cache.is_cacheable(sampler=sampler, backend=backend)
+    )
+    if not use_result_cache:
+        job = submit_transpiled_circuits(
+            transpiled_circuits, sampler=sampler, backend=backend, shots=shots
+        )
+        if job_callback is not None:
+            job_callback(job)
+        return get_counts_of_job(
+            job,
+            len(transpiled_circuits),
+            classical_register_names,
+            sampler=sampler,
+            backend=backend,
+            as_integer_counts=as_integer_counts
+        )
+
+    keys = [result_cache.key(c, sampler=sampler, backend=backend) for c in transpiled_circuits]
+    counts = [result_cache.get(key) for key in keys]
+    missing_indices = [index for index, c in enumerate(counts) if c is None]
+    if len(missing_indices) > 0:
+        job = submit_transpiled_circuits(
+            [transpiled_circuits[index] for index in missing_indices],
+            sampler=sampler,
+            backend=backend
+        )
+        if job_callback is not None:
+            job_callback(job)
+        fresh_counts = get_counts_of_job(
+            job, len(missing_indices), classical_register_names, sampler=sampler, backend=backend
+        )
+        for index, counts_of_circuit in zip(missing_indices, fresh_counts):
+            result_cache.put(keys[index], counts_of_circuit)
+            counts[index] = counts_of_circuit
+    if as_integer_counts:
+        return [[_counts_dict_to_integer_counts(c) for c in counts_of_circuit]
+                for counts_of_circuit in counts]
+    return counts
+
+
+def _run_circuits_and_get_counts(
+    circuits,
+    classical_register_names,
+    sampler=None,
+    backend=None,
+    transpiler=None,
+    executor=None,
+    result_cache=None,
+    as_integer_counts=False,
+    shot_policy=None,
+    shots=None,
+    readout_mitigator=None,
+    job_callback=None
+):
+    """
+    Parameters:
+        - circuits is a list of quantum circuits with measurements.
+        - classical_register_names are the names of all classical registers of each circuit in 
+          the order in which they were added to the circuits.
+        - sampler, backend, transpiler, executor, result_cache, as_integer_counts, shot_policy,
+          shots, readout_mitigator, job_callback are as in run_circuits_and_measure_registers.
+    Transpiles and runs all circuits in a single job. Circuits whose counts are in result_cache 
+    are not run again. With shot_policy or shots, the result cache is not used. The cache holds 
+    counts before readout error mitigation. Returns a list holding, for each circuit, a list 
+    with one counts dict per classical register.
+    """
+    if len(circuits) == 0:
+        return []
+
+    execution_backend = get_execution_backend(sampler=sampler, backend=backend)
+    transpiled_circuits = transpile_circuits(
+        circuits, execution_backend, executor=executor, transpiler=transpiler
+    )
+    counts = _run_transpiled_circuits_and_get_counts(
+        transpiled_circuits,
+        classical_register_names,
+        sampler=sampler,
+        backend=backend,
+        result_cache=result_cache,
+        as_integer_counts=as_integer_counts,
+        shot_policy=shot_policy,
+        shots=shots,
+        job_callback=job_callback
+    )
+    if readout_mitigator is None:
+        return counts
+
+    return [
+        [readout_mitigator.mitigate(c, transpiled_circuit, name, sampler=sampler, backend=backend)
+         for c, name in zip(counts_of_circuit, classical_register_names)]
+        for counts_of_circuit, transpiled_circuit in zip(counts, transpiled_circuits)
+    ]
+
+
+def run_circuit_and_measure_registers(
+    circuit,
+    registers,
+    sampler=None,
+    backend=None,
+    transpiler=None,
+    result_cache=None,
+    as_integer_counts=False,
+    shot_policy=None,
+    shots=None,
+    readout_mitigator=None,
+    job_callback=None
+):
     """
     Parameters:
         - circuit is the quantum circuit which we want to run.
@@ -313,28 +933,274 @@ def run_circuit_and_measure_registers(circuit, registers, sampler=None, backend=
           See https://docs.quantum.ibm.com/api/qiskit/providers for details. In principle, the
           backend.run API is deprecated but some non-IBM providers have not migrated yet. Use this
           if you want to execute quantum circuits on e.g. IonQ hardware.
+        - transpiler is passed on to remove_barriers_and_transpile_for_backend.
+        - result_cache is optional. If present, it is a ResultCache from 
+          simonalg.utils.result_cache. Counts of circuits run on deterministic simulators are
+          then looked up in and stored to the cache.
+        - as_integer_counts set this to True to get an IntegerCounts object from 
+          simonalg.utils.counts instead of a counts dict. Its outcomes are integers, so no 
+          string is created per shot. The counts dict is available via to_counts_dict.
+        - shot_policy is optional. If present, it is an AdaptiveShotPolicy from 
+          simonalg.utils.shots, which decides on the number of shots instead of the default
+          shots of sampler or backend.
+        - shots is optional. If present and there is no shot_policy, it overrides the default
+          shots of sampler or backend.
+        - readout_mitigator is optional. If present, it is a ReadoutMitigator from 
+          simonalg.utils.mitigation, which corrects the counts for readout errors.
+        - job_callback is optional. If present, it is called with every job right after it was 
+          submitted, e.g. to record its job ID.
     Runs circuit either via Primitives V2 API or backend.run API. Expects either sampler to be 
     present or backend, but not both. The measurement results are returned as a counts dict where 
     registers are separated via whitespaces. Registers in the result are arranged in the order they 
     are given in in the registers parameter.
     """
-    circuit_with_measurements, register_boundaries = add_measurements_to_circuit(circuit, registers)
+    return run_circuits_and_measure_registers(
+        [circuit],
+        registers,
+        sampler=sampler,
+        backend=backend,
+        transpiler=transpiler,
+        result_cache=result_cache,
+        as_integer_counts=as_integer_counts,
+        shot_policy=shot_policy,
+        shots=shots,
+        readout_mitigator=readout_mitigator,
+        job_callback=job_callback
+    )[0]
 
-    use_primitives_v2_api = sampler and (not backend)
-    if use_primitives_v2_api:
-        backend = sampler.backend()
-        log.info('Running circuit on backend %s', backend.name)
-        transpiled_circuit = remove_barriers_and_transpile_for_backend(
-            circuit_with_measurements, backend
+
+def run_circuits_and_measure_registers(
+    circuits,
+    registers,
+    sampler=None,
+    backend=None,
+    transpiler=None,
+    executor=None,
+    result_cache=None,
+    as_integer_counts=False,
+    shot_policy=None,
+    shots=None,
+    readout_mitigator=None,
+    job_callback=None
+):
+    """
+    Parameters:
+        - circuits is a list of quantum circuits which we want to run.
+        - registers are the quantum registers, which we would like to measure. All circuits are
+          assumed to hold these registers.
+        - sampler, backend, transpiler, result_cache, as_integer_counts, shot_policy, shots, 
+          readout_mitigator, job_callback are as in run_circuit_and_measure_registers.
+        - executor is passed on to transpile_circuits.
+    Like run_circuit_and_measure_registers, but runs all circuits in a single job. Returns a list
+    of counts dicts in the order of circuits.
+    """
+    circuits_and_boundaries = [add_measurements_to_circuit(c, registers) for c in circuits]
+    raw_result_data = _run_circuits_and_get_counts(
+        [c for c, _ in circuits_and_boundaries],
+        ['measure'],
+        sampler=sampler,
+        backend=backend,
+        transpiler=transpiler,
+        executor=executor,
+        result_cache=result_cache,
+        as_integer_counts=as_integer_counts,
+        shot_policy=shot_policy,
+        shots=shots,
+        readout_mitigator=readout_mitigator,
+        job_callback=job_callback
+    )
+    return _split_raw_result_data(raw_result_data, circuits_and_boundaries, as_integer_counts)
+
+
+def _split_raw_result_data(raw_result_data, circuits_and_boundaries, as_integer_counts):
+    if as_integer_counts:
+        return [counts[0].with_boundaries(boundaries)
+                for counts, (_, boundaries) in zip(raw_result_data, circuits_and_boundaries)]
+    return [split_counts_into_registers(counts[0], boundaries)
+            for counts, (_, boundaries) in zip(raw_result_data, circuits_and_boundaries)]
+
+
+def get_counts_of_retrieved_job(
+    job, circuits, registers, sampler=None, backend=None, as_integer_counts=False
+):
+    """
+    Parameters:
+        - job is a job that ran circuits as submitted by run_circuits_and_measure_registers, 
+          e.g. retrieved by its job ID after a restart.
+        - circuits, registers, sampler, backend, as_integer_counts are as in 
+          run_circuits_and_measure_registers.
+    Returns the counts of job in the format of run_circuits_and_measure_registers without 
+    running circuits again.
+    """
+    circuits_and_boundaries = [add_measurements_to_circuit(c, registers) for c in circuits]
+    raw_result_data = get_counts_of_job(
+        job,
+        len(circuits),
+        ['measure'],
+        sampler=sampler,
+        backend=backend,
+        as_integer_counts=as_integer_counts
+    )
+    return _split_raw_result_data(raw_result_data, circuits_and_boundaries, as_integer_counts)
+
+
+# Probabilities below this threshold are numerical noise of the statevector simulation.
+EXACT_PROBABILITY_TOLERANCE = 1e-10
+
+EXACT_PROBABILITIES_LABEL = 'probabilities'
+
+
+def is_ideal_simulator(backend):
+    """
+    Parameters:
+        - backend is a Qiskit backend.
+    Returns True iff backend is an Aer simulator without noise model, i.e. a backend whose
+    output probabilities can be read off exactly.
+    """
+    return is_aer_simulator(backend) and getattr(backend.options, 'noise_model', None) is None
+
+
+def decompose_unsupported_operations(circuit, backend):
+    """
+    Parameters:
+        - circuit is a quantum circuit.
+        - backend is the backend we want to run circuit on.
+    Returns circuit where all operations the target of backend does not support are replaced by
+    their definitions. Unlike transpile, this neither lays out nor routes nor optimizes circuit.
+    """
+    supported_operation_names = set(backend.target.operation_names)
+    while True:
+        operation_counts = circuit.count_ops()
+        unsupported_operation_names = [
+            name for name in operation_counts if name not in supported_operation_names
+        ]
+        if len(unsupported_operation_names) == 0:
+            return circuit
+        circuit = circuit.decompose(gates_to_decompose=unsupported_operation_names)
+        if circuit.count_ops() == operation_counts:
+            raise ValueError(
+                f'Operations {unsupported_operation_names} are not supported by {backend.name}.'
+            )
+
+
+def _exact_probabilities_to_counts_format(probabilities, registers):
+    total_measured_qubit_count = sum(len(r) for r in registers)
+    register_boundaries = []
+    offset = 0
+    for register in registers:
+        register_boundaries.append((offset, offset + len(register)))
+        offset += len(register)
+
+    return dict(
+        (split_into_registers(format(index, f'0{total_measured_qubit_count}b'),
+                              register_boundaries), float(probability))
+        for index, probability in enumerate(probabilities)
+        if probability > EXACT_PROBABILITY_TOLERANCE
+    )
+
+
+def run_circuits_with_exact_probabilities(circuits, registers, sampler=None, backend=None):
+    """
+    Parameters:
+        - circuits is a list of quantum circuits without measurements.
+        - registers are the quantum registers whose marginal probabilities we would like to 
+          know. All circuits are assumed to hold these registers.
+        - sampler, backend are as in run_circuit_and_measure_registers. The execution backend 
+          must be an ideal simulator, see is_ideal_simulator.
+    Runs all circuits on the statevector of the ideal simulator without transpiling them and 
+    without sampling shots. Ancilla reset markers are dropped, since the ancillas they mark are 
+    clean anyway. Returns a list of dicts formatted like the counts dicts of 
+    run_circuits_and_measure_registers, but holding the exact probability of every outcome 
+    instead of its count. Outcomes are ordered by their bitstring.
+    """
+    if len(circuits) == 0:
+        return []
+
+    execution_backend = get_execution_backend(sampler=sampler, backend=backend)
+    if not is_ideal_simulator(execution_backend):
+        raise ValueError(f'Backend {execution_backend.name} is not an ideal simulator.')
+
+    # The first qubit holds the least significant bit of the bitstrings, so the last register
+    # comes first.
+    measured_qubits = [qubit for register in reversed(registers) for qubit in register]
+    prepared_circuits = []
+    for circuit in circuits:
+        prepared_circuit = decompose_unsupported_operations(
+            RemoveBarriers()(circuit), execution_backend
         )
-        job = sampler.run([transpiled_circuit])
-        raw_result_data = job.result()[0].data.measure.get_counts()
-    else:
-        log.info('Running circuit on backend %s', backend.name)
-        transpiled_circuit = remove_barriers_and_transpile_for_backend(
-            circuit_with_measurements, backend
+        save_probabilities(
+            prepared_circuit, qubits=measured_qubits, label=EXACT_PROBABILITIES_LABEL
         )
-        raw_result_data = backend.run([transpiled_circuit]).result().get_counts()
+        prepared_circuits.append(prepared_circuit)
 
-    return dict((split_into_registers(key, register_boundaries),raw_result_data[key])
-        for key in raw_result_data.keys())
+    log.info(
+        'Computing exact probabilities of %d circuit(s) on backend %s',
+        len(prepared_circuits), execution_backend.name
+    )
+    result = execution_backend.run(prepared_circuits).result()
+    return [
+        _exact_probabilities_to_counts_format(
+            result.data(index)[EXACT_PROBABILITIES_LABEL], registers
+        ) for index in range(len(prepared_circuits))
+    ]
+
+
+def combine_circuits_side_by_side(circuits_and_registers):
+    """
+    Parameters:
+        - circuits_and_registers is a list of tuples (circuit, registers) where registers are the
+          quantum registers of circuit which we would like to measure. The circuits are assumed 
+          to have no classical bits yet.
+    Places all circuits on disjoint sets of qubits of one wide circuit. The registers of the k-th 
+    circuit are measured into their own classical register 'measure_k'. Returns the wide circuit,
+    the names of the classical registers and the register_boundaries list for each circuit.
+    """
+    combined_circuit = QuantumCircuit()
+    classical_register_names = []
+    boundaries_per_circuit = []
+    for k, (circuit, registers) in enumerate(circuits_and_registers):
+        classical_register_name = f'measure_{k}'
+        circuit_with_measurements, register_boundaries = add_measurements_to_circuit(
+            circuit.copy(), registers, classical_register_name=classical_register_name
+        )
+        instance_register = QuantumRegister(circuit_with_measurements.num_qubits, f'instance_{k}')
+        classical_register = circuit_with_measurements.cregs[-1]
+        combined_circuit.add_register(instance_register)
+        combined_circuit.add_register(classical_register)
+        combined_circuit.compose(
+            circuit_with_measurements,
+            qubits=instance_register,
+            clbits=classical_register,
+            inplace=True
+        )
+        classical_register_names.append(classical_register_name)
+        boundaries_per_circuit.append(register_boundaries)
+
+    return combined_circuit, classical_register_names, boundaries_per_circuit
+
+
+def run_circuits_side_by_side(
+    circuits_and_registers, sampler=None, backend=None, transpiler=None
+):
+    """
+    Parameters:
+        - circuits_and_registers is a list of tuples (circuit, registers) as in 
+          combine_circuits_side_by_side. The circuits may stem from different SimonCircuit 
+          instances or be built for different working indices of the same instance.
+        - sampler, backend are as in run_circuit_and_measure_registers.
+    Runs all circuits side by side in a single job on one wide circuit. The backend must hold 
+    enough qubits for all circuits together. Returns a list of counts dicts, one for each circuit 
+    and formatted as the result of run_circuit_and_measure_registers.
+    """
+    combined_circuit, classical_register_names, boundaries_per_circuit = (
+        combine_circuits_side_by_side(circuits_and_registers)
+    )
+    counts_per_circuit = _run_circuits_and_get_counts(
+        [combined_circuit],
+        classical_register_names,
+        sampler=sampler,
+        backend=backend,
+        transpiler=transpiler
+    )[0]
+    return [split_counts_into_registers(counts, boundaries)
+            for counts, boundaries in zip(counts_per_circuit, boundaries_per_circuit)]
@@ -0,0 +1,194 @@
+"""
+Contains the IntegerCounts class, a compact alternative to counts dicts with bitstring keys.
+Measurement outcomes are kept as integers, so that decoding the results of many shots on wide
+registers neither creates a string per shot nor slices strings to split registers.
+"""
+
+import numpy as np
+
+
+class IntegerCounts:
+    """
+    Holds the distinct outcomes of a classical register as integers, where bit i of an outcome is
+    classical bit i, together with how often each outcome was measured. The outcomes are sorted
+    in ascending order. If register boundaries are given, they partition the bitstrings of the
+    outcomes into registers as in split_into_registers.
+    """
+    def __init__(self, outcomes, counts, num_bits, boundaries=None):
+        """
+        Parameters:
+            - outcomes is a list of distinct integers in ascending order.
+            - counts is a NumPy array holding how often each outcome was measured.
+            - num_bits is the number of bits of the classical register.
+            - boundaries is a list of intervals as in split_into_registers. Defaults to one
+              register spanning all bits.
+        """
+        self.outcomes = outcomes
+        self.counts = counts
+        self.num_bits = num_bits
+        self.boundaries = boundaries if boundaries is not None else [(0, num_bits)]
+
+
+    @classmethod
+    def from_bit_array(cls, bit_array, boundaries=None):
+        """
+        Parameters:
+            - bit_array is a BitArray as returned by SamplerV2 for a single circuit.
+            - boundaries is as in the constructor.
+        Counts the outcomes on the packed bytes of bit_array. Only one integer is created per
+        distinct outcome.
+        """
+        packed_shots = bit_array.array.reshape(-1, bit_array.array.shape[-1])
+        distinct_rows, counts = np.unique(packed_shots, axis=0, return_counts=True)
+        outcomes = [int.from_bytes(row.tobytes(), 'big') for row in distinct_rows]
+        return cls(outcomes, counts, bit_array.num_bits, boundaries=boundaries)
+
+
+    @classmethod
+    def from_counts_dict(cls, counts, num_bits, boundaries=None):
+        """
+        Parameters:
+            - counts is a counts dict with bitstring keys. Whitespaces in keys are ignored.
+            - num_bits, boundaries are as in the constructor.
+        """
+        integer_counts = sorted(
+            (int(key.replace(' ', ''), 2), count) for key, count in counts.items()
+        )
+        return cls(
+            [outcome for outcome, _ in integer_counts],
+            np.array([count for _, count in integer_counts], dtype=np.int64),
+            num_bits,
+            boundaries=boundaries
+        )
+
+
+    def with_boundaries(self, boundaries):
+        """
+        Returns the same counts partitioned into registers along boundaries.
+        """
+        return IntegerCounts(self.outcomes, self.counts, self.num_bits, boundaries=boundaries)
+
+
+    def __len__(self):
+        return len(self.outcomes)
+
+
+    def __repr__(self):
+        most_frequent = self.most_frequent_bitstring() if len(self) > 0 else None
+        return (
+            f'IntegerCounts(shots={self.shots()}, outcomes={len(self)}, '
+            f'most_frequent={most_frequent})'
+        )
+
+
+    def shots(self):
+        return int(self.counts.sum())
+
+
+    def values(self):
+        return self.counts
+
+
+    def register(self, register_index):
+        """
+        Returns the IntegerCounts of the register_index-th register along the boundaries,
+        computed by shifting and masking the outcomes.
+        """
+        start, stop = self.boundaries[register_index]
+        shift = self.num_bits - stop
+        mask = (1 << (stop - start)) - 1
+        marginal_counts = {}
+        for outcome, count in zip(self.outcomes, self.counts):
+            register_outcome = (outcome >> shift) & mask
+            marginal_counts[register_outcome] = marginal_counts.get(register_outcome, 0) + count
+        register_outcomes = sorted(marginal_counts)
+        return IntegerCounts(
+            register_outcomes,
+            np.array([marginal_counts[o] for o in register_outcomes], dtype=np.int64),
+            stop - start
+        )
+
+
+    def _restricted_to(self, selected):
+        return IntegerCounts(
+            [self.outcomes[index] for index in selected],
+            self.counts[selected],
+            self.num_bits,
+            boundaries=self.boundaries
+        )
+
+
+    def with_any_bit_set(self, bit_indices):
+        """
+        Returns the IntegerCounts restricted to the outcomes with a 1 at any of bit_indices.
+        """
+        mask = sum(1 << i for i in bit_indices)
+        return self._restricted_to(
+            [index for index, outcome in enumerate(self.outcomes) if outcome & mask]
+        )
+
+
+    def without_any_bit_set(self, bit_indices):
+        """
+        Returns the IntegerCounts restricted to the outcomes with a 0 at all of bit_indices.
+        """
+        mask = sum(1 << i for i in bit_indices)
+        return self._restricted_to(
+            [index for index, outcome in enumerate(self.outcomes) if not outcome & mask]
+        )
+
+
+    def most_frequent(self):
+        """
+        Returns the outcome measured most often. Ties are broken in favor of the smallest
+        outcome.
+        """
+        return self.outcomes[int(np.argmax(self.counts))]
+
+
+    def to_bitstring(self, outcome):
+        """
+        Returns outcome formatted like a key of the counts dicts of
+        run_circuits_and_measure_registers.
+        """
+        bitstring = format(outcome, f'0{self.num_bits}b')
+        return ' '.join(bitstring[start:stop] for start, stop in self.boundaries)
+
+
+    def most_frequent_bitstring(self):
+        return self.to_bitstring(self.most_frequent())
+
+
+    def to_counts_dict(self):
+        """
+        Returns the counts dict with bitstring keys, e.g. for logging or for comparing with
+        results of the string based path.
+        """
+        return dict(
+            (self.to_bitstring(outcome), count.item())
+            for outcome, count in zip(self.outcomes, self.counts)
+        )
+
+
+def merge_counts(first, second):
+    """
+    Parameters:
+        - first, second are both counts dicts or both IntegerCounts of the same register.
+    Returns the counts of the shots of first and second together.
+    """
+    if isinstance(first, IntegerCounts):
+        merged_counts = dict(zip(first.outcomes, (int(c) for c in first.counts)))
+        for outcome, count in zip(second.outcomes, second.counts):
+            merged_counts[outcome] = merged_counts.get(outcome, 0) + int(count)
+        outcomes = sorted(merged_counts)
+        return IntegerCounts(
+            outcomes,
+            np.array([merged_counts[o] for o in outcomes], dtype=np.int64),
+            first.num_bits,
+            boundaries=first.boundaries
+        )
+
+    merged_counts = dict(first)
+    for key, count in second.items():
+        merged_counts[key] = merged_counts.get(key, 0) + count
+    return merged_counts
@@ -0,0 +1,178 @@
+"""
+Contains the FanOutExecutor class, which submits the same circuits to several backends at once
+and takes the first valid result or a quorum vote. The latency of a job then depends on the
+fastest backend rather than on the slowest queue.
+"""
+
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from simonalg.utils.logging import log
+from simonalg.utils.circuit import add_measurements_to_circuit, get_counts_of_job
+from simonalg.utils.circuit import get_execution_backend, remove_barriers_and_transpile_for_backend
+from simonalg.utils.circuit import split_counts_into_registers, submit_transpiled_circuits
+
+
+def _most_frequent_elements(counts_per_circuit):
+    return tuple(max(counts, key=counts.get) for counts in counts_per_circuit)
+
+
+class FanOutExecutor:
+    """
+    Holds several execution targets, each given as the keyword arguments sampler or backend of
+    run_circuit_and_measure_registers, e.g. [{'sampler': sampler}, {'backend': backend}]. Every
+    batch of circuits is transpiled for and submitted to fan_out of them concurrently, chosen
+    round-robin. With quorum 1, the first valid result wins. Otherwise the result wins whose
+    most frequent elements quorum targets agree on. The jobs of the other targets are
+    cancelled. Use an instance as fan_out_executor in the SimonSolver constructor and call
+    close once it is no longer needed.
+    """
+    def __init__(self, targets, fan_out=None, quorum=1, validator=None, transpiler=None,
+                 poll_interval=0.1):
+        """
+        Parameters:
+            - targets is a list of dicts holding either a sampler or a backend.
+            - fan_out is the number of targets each batch is submitted to. Defaults to all.
+            - quorum is the number of targets that have to agree on the most frequent elements.
+            - validator is optional. If present, it is a function that takes the list of counts
+              dicts of a batch and returns False if the result is not valid, e.g. because it
+              stems from a broken device. Results of failed jobs are never valid.
+            - transpiler is as in SimonSolver.
+            - poll_interval is the number of seconds to wait between two status checks of a 
+              running job. Jobs are polled instead of waiting for their result, so that the 
+              worker thread of a losing target is released once the batch is decided, even if 
+              its job cannot be cancelled, as is the case for local Aer jobs.
+        """
+        fan_out = fan_out if fan_out is not None else len(targets)
+        if not 1 <= quorum <= fan_out <= len(targets):
+            raise ValueError('Expected 1 <= quorum <= fan_out <= number of targets.')
+        self._targets = targets
+        self._fan_out = fan_out
+        self._quorum = quorum
+        self._validator = validator
+        self._transpiler = transpiler
+        self._poll_interval = poll_interval
+        self._next_target_index = 0
+        self._lock = threading.Lock()
+        self._thread_pool = ThreadPoolExecutor(max_workers=len(targets))
+        self.last_winner = None
+
+
+    def close(self):
+        """
+        Shuts down the worker threads without waiting for cancelled jobs.
+        """
+        self._thread_pool.shutdown(wait=False, cancel_futures=True)
+
+
+    def _select_targets(self):
+        with self._lock:
+            start = self._next_target_index
+            self._next_target_index = (start + 1) % len(self._targets)
+        return [(start + k) % len(self._targets) for k in range(self._fan_out)]
+
+
+    def _run_on_target(self, target_index, circuits, shots, cancelled, jobs):
+        target = self._targets[target_index]
+        execution_backend = get_execution_backend(**target)
+        transpiled_circuits = [
+            remove_barriers_and_transpile_for_backend(
+                c, execution_backend, transpiler=self._transpiler
+            ) for c in circuits
+        ]
+        if cancelled.is_set():
+            return None
+        job = submit_transpiled_circuits(transpiled_circuits, shots=shots, **target)
+        jobs[target_index] = job
+        # Polling releases this thread once the batch is decided, even if the job ignores
+        # cancel. It also covers batches decided while the job was submitted, i.e. after
+        # _cancel looked at the submitted jobs.
+        while not job.done():
+            if cancelled.wait(timeout=self._poll_interval):
+                self._cancel_job(target_index, job)
+                return None
+        return get_counts_of_job(job, len(circuits), ['measure'], **target)
+
+
+    def _is_valid(self, counts_per_circuit):
+        return self._validator is None or self._validator(counts_per_circuit)
+
+
+    def _cancel_job(self, target_index, job):
+        if job.done():
+            return
+        log.info('Cancelling job on target %d', target_index)
+        try:
+            job.cancel()
+        except Exception as exception: # pylint: disable=broad-exception-caught
+            log.debug('Could not cancel job on target %d: %s', target_index, exception)
+
+
+    def _cancel(self, futures, jobs, cancelled):
+        cancelled.set()
+        for future in futures:
+            future.cancel()
+        for target_index, job in list(jobs.items()):
+            self._cancel_job(target_index, job)
+
+
+    def run_circuits_and_measure_registers(self, circuits, registers, shots=None):
+        """
+        Parameters:
+            - circuits, registers are as in run_circuits_and_measure_registers.
+            - shots is optional. If present, it overrides the default shots of the targets.
+        Runs circuits on the selected targets concurrently. Returns a list of counts dicts in
+        the order of circuits, taken from the winning target. Raises a RuntimeError if no
+        target yields a valid result.
+        """
+        circuits_and_boundaries = [add_measurements_to_circuit(c, registers) for c in circuits]
+        circuits_with_measurements = [c for c, _ in circuits_and_boundaries]
+        target_indices = self._select_targets()
+        cancelled = threading.Event()
+        jobs = {}
+        futures = dict(
+            (self._thread_pool.submit(
+                self._run_on_target, index, circuits_with_measurements, shots, cancelled, jobs
+            ), index) for index in target_indices
+        )
+
+        votes = Counter()
+        results_by_vote = {}
+        pending = set(futures)
+        winner = None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                target_index = futures[future]
+                try:
+                    counts_per_circuit = [
+                        split_counts_into_registers(counts[0], boundaries) for counts,
+                        (_, boundaries) in zip(future.result(), circuits_and_boundaries)
+                    ]
+                except Exception as exception: # pylint: disable=broad-exception-caught
+                    log.warning('Job on target %d failed: %s', target_index, exception)
+                    continue
+                if not self._is_valid(counts_per_circuit):
+                    log.warning('Discarded invalid result of target %d', target_index)
+                    continue
+
+                vote = _most_frequent_elements(counts_per_circuit)
+                votes[vote] += 1
+                results_by_vote.setdefault(vote, (target_index, counts_per_circuit))
+                if votes[vote] >= self._quorum:
+                    winner = results_by_vote[vote]
+                    break
+
+        self._cancel(pending, jobs, cancelled)
+        if winner is None and len(votes) > 0:
+            vote, vote_count = votes.most_common(1)[0]
+            log.warning('No quorum reached, taking the result with %d vote(s)', vote_count)
+            winner = results_by_vote[vote]
+        if winner is None:
+            raise RuntimeError('None of the targets yielded a valid result.')
+
+        target_index, counts_per_circuit = winner
+        log.info('Target %d won among targets %s', target_index, target_indices)
+        self.last_winner = target_index
+        return counts_per_circuit
@@ -0,0 +1,153 @@
+"""
+Contains policies that decide in which order SimonSolver tries the working indices of an
+iteration and which of them it can skip. Every working index whose circuit yields the zero
+vector costs a whole job without progress, so the indices most likely to yield a fresh element
+should come first and indices where the orthogonal subgroup is zero should not be tried at all.
+"""
+
+import math
+
+import numpy as np
+
+from simonalg.utils.counts import IntegerCounts
+
+
+def count_ones_per_index(quantum_result, n):
+    """
+    Parameters:
+        - quantum_result is a counts dict or an IntegerCounts object of the input register.
+        - n is the length of the input register.
+    Returns a NumPy array whose entry i is the number of shots with a 1 at register index i.
+    """
+    ones = np.zeros(n)
+    if isinstance(quantum_result, IntegerCounts):
+        for outcome, count in zip(quantum_result.outcomes, quantum_result.counts):
+            for i in range(n):
+                if (outcome >> i) & 1:
+                    ones[i] += count
+        return ones
+    for element, count in quantum_result.items():
+        for i in range(n):
+            if element[n - 1 - i] == '1':
+                ones[i] += count
+    return ones
+
+
+class IndexOrderingPolicy:
+    """
+    Tries the working indices in ascending order and never skips one. Subclasses override order
+    and may use the samples the solver reports via observe_samples and
+    observe_standard_simon_samples. If standard_simon_shots is not None, the solver runs the
+    standard Simon circuit with this many shots at the start of every solve and reports its
+    samples. Use an instance as index_ordering_policy in the SimonSolver constructor.
+    """
+    standard_simon_shots = None
+
+    def reset(self, n):
+        """
+        Forgets the samples of previous solves. n is the length of the input register.
+        """
+        self.n = n
+
+
+    def observe_samples(self, quantum_result):
+        """
+        Called with the measured elements of every remove-zero circuit and with the elements
+        sampled so far if a solve is resumed.
+        """
+
+
+    def observe_standard_simon_samples(self, quantum_result, exact=False, ideal=False):
+        """
+        Called with the samples of the standard Simon circuit. If exact is True, quantum_result
+        holds exact probabilities instead of counts. If ideal is True, the samples stem from an
+        ideal simulator (see simonalg.utils.circuit.is_ideal_simulator), i.e. are noiseless.
+        """
+
+
+    def order(self, working_indices):
+        """
+        Returns the list of working indices to try, in the order they should be tried. Indices
+        that are left out get blocked without running their circuit, so only leave out indices
+        where no element of the orthogonal subgroup has a 1.
+        """
+        return sorted(working_indices)
+
+
+class SampledOnesOrdering(IndexOrderingPolicy):
+    """
+    Tries the working indices first at which most of the samples measured so far in this solve
+    had a 1. The orthogonal subgroup has elements with a 1 at these indices, whereas an index at
+    which no sample had a 1 may be zero on the whole orthogonal subgroup. No index is skipped.
+    """
+    def reset(self, n):
+        super().reset(n)
+        self._ones = np.zeros(n)
+
+
+    def observe_samples(self, quantum_result):
+        self._ones += count_ones_per_index(quantum_result, self.n)
+
+
+    def observe_standard_simon_samples(self, quantum_result, exact=False, ideal=False):
+        self.observe_samples(quantum_result)
+
+
+    def order(self, working_indices):
+        return sorted(working_indices, key=lambda i: (-self._ones[i], i))
+
+
+class StandardSimonHistogramOrdering(SampledOnesOrdering):
+    """
+    Runs the standard Simon circuit with few shots at the start of a solve. On a noiseless
+    backend, its outcomes are uniformly distributed on the orthogonal subgroup, so at every
+    index that is not zero on the whole orthogonal subgroup, a shot has a 1 with probability
+    1/2. Indices without a 1 among all shots are skipped, provided the probability that this
+    happens to any of the n indices by chance, n / 2^shots, is below max_skip_error. A skipped
+    index gets blocked for the rest of the solve, so a wrongly skipped index leaves the basis
+    incomplete without any error. Hence, indices are only skipped on ideal simulators or if
+    readout_error is given. Noise on other backends makes the outcomes non-uniform, so that no
+    such bound holds. The remaining indices are ordered as in SampledOnesOrdering.
+    """
+    def __init__(self, shots=64, max_skip_error=1e-6, readout_error=None):
+        """
+        Parameters:
+            - shots is the number of shots of the standard Simon circuit.
+            - max_skip_error is the maximum probability of skipping an index that is not zero
+              on the whole orthogonal subgroup.
+            - readout_error is optional. If present, indices are skipped on any backend. It is
+              an upper bound on the probability that a 1 is read out as a 0 on a single qubit
+              in a single shot, which raises the probability above to
+              n * ((1 + readout_error) / 2)^shots. Only set it if readout errors are the only
+              noise worth considering, since gate noise is not accounted for.
+        """
+        self.standard_simon_shots = shots
+        self._max_skip_error = max_skip_error
+        self._readout_error = readout_error
+
+
+    def reset(self, n):
+        super().reset(n)
+        self._histogram = None
+
+
+    def observe_standard_simon_samples(self, quantum_result, exact=False, ideal=False):
+        super().observe_standard_simon_samples(quantum_result, exact=exact, ideal=ideal)
+        ones = count_ones_per_index(quantum_result, self.n)
+        if exact:
+            self._histogram = ones
+            return
+        if not ideal and self._readout_error is None:
+            return
+        readout_error = self._readout_error if self._readout_error is not None else 0
+        shots = sum(int(c) for c in quantum_result.values())
+        probability_of_no_one = (1 + readout_error) / 2
+        if self.n * math.pow(probability_of_no_one, shots) <= self._max_skip_error:
+            self._histogram = ones
+
+
+    def order(self, working_indices):
+        ordered_indices = super().order(working_indices)
+        if self._histogram is None:
+            return ordered_indices
+        return [i for i in ordered_indices if self._histogram[i] > 0]
@@ -0,0 +1,199 @@
+"""
+Contains the ReadoutMitigator class, which corrects measurement results for readout errors. The
+readout errors of the measured physical qubits are calibrated once per backend and layout and
+cached for a configurable time, so that calibration is not paid for again with every solve.
+"""
+
+import threading
+import time
+
+import numpy as np
+from qiskit import QuantumCircuit, ClassicalRegister, transpile
+
+from simonalg.utils.circuit import get_execution_backend, submit_transpiled_circuits
+from simonalg.utils.circuit import get_counts_of_job
+from simonalg.utils.counts import IntegerCounts
+from simonalg.utils.logging import log
+
+
+CALIBRATION_REGISTER_NAME = 'calibration'
+
+
+def get_measured_physical_qubits(transpiled_circuit, classical_register_name):
+    """
+    Parameters:
+        - transpiled_circuit is a circuit with measurements, transpiled for a backend.
+        - classical_register_name is the name of a classical register of transpiled_circuit.
+    Returns a list holding, for each bit of the classical register, the physical qubit that is
+    measured into it.
+    """
+    classical_register = next(
+        r for r in transpiled_circuit.cregs if r.name == classical_register_name
+    )
+    physical_qubits = [None] * len(classical_register)
+    for instruction in transpiled_circuit.data:
+        if instruction.operation.name != 'measure':
+            continue
+        clbit = instruction.clbits[0]
+        if clbit in classical_register:
+            physical_qubits[classical_register.index(clbit)] = (
+                transpiled_circuit.find_bit(instruction.qubits[0]).index
+            )
+    return physical_qubits
+
+
+def _get_error_probabilities(counts, bit_count):
+    shots = sum(counts.values())
+    probabilities_of_1 = np.zeros(bit_count)
+    for key, count in counts.items():
+        for bit in range(bit_count):
+            if key[bit_count - 1 - bit] == '1':
+                probabilities_of_1[bit] += count
+    return probabilities_of_1 / shots
+
+
+def apply_inverse_assignment_matrices(probabilities, assignment_matrices):
+    """
+    Parameters:
+        - probabilities is a NumPy array of length 2 ** m, where index k holds the measured
+          probability of outcome k and bit i of k is classical bit i.
+        - assignment_matrices is a list of m 2x2 matrices, where entry (j, k) of the i-th matrix
+          is the probability of reading j from classical bit i if its qubit was in state k.
+    Returns the corrected quasi-probabilities. The inverse matrices are applied qubit by qubit,
+    which takes O(m 2 ** m) operations instead of inverting a 2 ** m x 2 ** m matrix.
+    """
+    bit_count = len(assignment_matrices)
+    tensor = probabilities.reshape((2,) * bit_count)
+    for bit, assignment_matrix in enumerate(assignment_matrices):
+        # The first axis belongs to the most significant bit.
+        axis = bit_count - 1 - bit
+        tensor = np.moveaxis(
+            np.tensordot(np.linalg.inv(assignment_matrix), tensor, axes=([1], [axis])), 0, axis
+        )
+    return tensor.reshape(-1)
+
+
+def _to_nearest_counts(quasi_probabilities, shots):
+    probabilities = np.clip(quasi_probabilities, 0, None)
+    return probabilities * (shots / probabilities.sum())
+
+
+class ReadoutMitigator:
+    """
+    Corrects counts for readout errors with tensored assignment matrices, i.e. under the
+    assumption that readout errors of different qubits are independent. Calibrating a set of
+    physical qubits takes two circuits, one preparing all of them in 0 and one in 1. Assignment
+    matrices are cached per backend and set of physical qubits for ttl seconds. Use an instance
+    wherever a readout_mitigator is accepted, e.g. in the SimonSolver constructor.
+    """
+    def __init__(self, ttl=3600, calibration_shots=4096):
+        """
+        Parameters:
+            - ttl is the number of seconds after which calibrations get repeated.
+            - calibration_shots is the number of shots of each calibration circuit.
+        """
+        self._ttl = ttl
+        self._calibration_shots = calibration_shots
+        self._calibrations = {}
+        self._lock = threading.Lock()
+        self.calibration_count = 0
+
+
+    def _calibrate(self, physical_qubits, sampler=None, backend=None):
+        execution_backend = get_execution_backend(sampler=sampler, backend=backend)
+        calibration_circuits = []
+        for prepared_state in [0, 1]:
+            circuit = QuantumCircuit(len(physical_qubits))
+            circuit.add_register(ClassicalRegister(len(physical_qubits), CALIBRATION_REGISTER_NAME))
+            if prepared_state == 1:
+                circuit.x(range(len(physical_qubits)))
+            circuit.measure(range(len(physical_qubits)), range(len(physical_qubits)))
+            calibration_circuits.append(circuit)
+
+        is_laid_out = execution_backend.target.build_coupling_map() is not None
+        transpiled_circuits = transpile(
+            calibration_circuits,
+            execution_backend,
+            initial_layout=physical_qubits if is_laid_out else None,
+            optimization_level=0
+        )
+        log.info('Calibrating readout errors of qubits %s', physical_qubits)
+        job = submit_transpiled_circuits(
+            transpiled_circuits, sampler=sampler, backend=backend, shots=self._calibration_shots
+        )
+        counts_of_zeros, counts_of_ones = [
+            counts[0] for counts in get_counts_of_job(
+                job, 2, [CALIBRATION_REGISTER_NAME], sampler=sampler, backend=backend
+            )
+        ]
+        probabilities_of_1_given_0 = _get_error_probabilities(counts_of_zeros, len(physical_qubits))
+        probabilities_of_1_given_1 = _get_error_probabilities(counts_of_ones, len(physical_qubits))
+        return [
+            np.array([[1 - p10, 1 - p11], [p10, p11]])
+            for p10, p11 in zip(probabilities_of_1_given_0, probabilities_of_1_given_1)
+        ]
+
+
+    def get_assignment_matrices(self, physical_qubits, sampler=None, backend=None):
+        """
+        Parameters:
+            - physical_qubits is a list of physical qubits, one for each classical bit.
+            - sampler, backend are as in run_circuit_and_measure_registers.
+        Returns the assignment matrices of physical_qubits as in
+        apply_inverse_assignment_matrices, calibrating them if there is no valid calibration.
+        """
+        execution_backend = get_execution_backend(sampler=sampler, backend=backend)
+        key = (
+            execution_backend.name,
+            getattr(execution_backend, 'backend_version', None),
+            tuple(physical_qubits)
+        )
+        with self._lock:
+            calibration = self._calibrations.get(key)
+            if calibration is not None and time.monotonic() - calibration[0] < self._ttl:
+                return calibration[1]
+
+        assignment_matrices = self._calibrate(physical_qubits, sampler=sampler, backend=backend)
+        with self._lock:
+            self._calibrations[key] = (time.monotonic(), assignment_matrices)
+            self.calibration_count += 1
+        return assignment_matrices
+
+
+    def mitigate(
+        self, counts, transpiled_circuit, classical_register_name, sampler=None, backend=None
+    ):
+        """
+        Parameters:
+            - counts is a counts dict or an IntegerCounts object of the classical register
+              classical_register_name of transpiled_circuit.
+            - transpiled_circuit is the circuit counts stem from.
+            - sampler, backend are as in run_circuit_and_measure_registers.
+        Returns counts corrected for readout errors in the same format. The corrected counts
+        are non-negative reals that sum up to the number of shots.
+        """
+        physical_qubits = get_measured_physical_qubits(transpiled_circuit, classical_register_name)
+        assignment_matrices = self.get_assignment_matrices(
+            physical_qubits, sampler=sampler, backend=backend
+        )
+        bit_count = len(physical_qubits)
+        probabilities = np.zeros(2 ** bit_count)
+        if isinstance(counts, IntegerCounts):
+            probabilities[counts.outcomes] = counts.counts
+        else:
+            for key, count in counts.items():
+                probabilities[int(key, 2)] = count
+        shots = probabilities.sum()
+
+        mitigated_counts = _to_nearest_counts(
+            apply_inverse_assignment_matrices(probabilities / shots, assignment_matrices), shots
+        )
+        outcomes = [int(o) for o in np.flatnonzero(mitigated_counts)]
+        if isinstance(counts, IntegerCounts):
+            return IntegerCounts(
+                outcomes, mitigated_counts[outcomes], counts.num_bits, boundaries=counts.boundaries
+            )
+        return dict(
+            (format(outcome, f'0{bit_count}b'), float(mitigated_counts[outcome]))
+            for outcome in outcomes
+        )
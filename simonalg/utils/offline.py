@@ -0,0 +1,295 @@
+"""
+Contains the OfflinePipeline class, which decouples solving from executing circuits. Instead of
+running circuits, the solver writes them as batch files to a directory. A separate executor
+process runs the batch files and writes their counts next to them, after which the solver is
+resumed and picks up the counts.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from qiskit import qasm3, qpy
+
+from simonalg.utils.logging import log
+from simonalg.utils.circuit import add_measurements_to_circuit, get_counts_of_job
+from simonalg.utils.circuit import get_execution_backend, transpile_circuits
+from simonalg.utils.circuit import replace_ancilla_reset_markers
+from simonalg.utils.circuit import split_counts_into_registers, submit_transpiled_circuits
+from simonalg.utils.sampler_pool import DEFAULT_BACKEND_NAME, get_default_sampler_pool
+from simonalg.utils.transpilation import circuit_fingerprint
+
+
+CIRCUIT_FORMATS = ('qpy', 'qasm3')
+
+# 'measure' is a keyword in OpenQASM 3 and would get renamed on export.
+OFFLINE_CLASSICAL_REGISTER_NAME = 'result'
+
+METADATA_SUFFIX = '.json'
+COUNTS_SUFFIX = '.counts.json'
+
+
+class PendingBatchException(Exception):
+    """
+    Raised by OfflinePipeline if the counts of a batch are not available yet. batch_path is the
+    path of the batch file waiting to be executed.
+    """
+    def __init__(self, batch_path):
+        super().__init__(f'Batch {batch_path} is waiting to be executed.')
+        self.batch_path = batch_path
+
+
+def _write_atomically(path, write_fn, binary=False):
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or '.', suffix='.tmp'
+    )
+    mode = 'wb' if binary else 'w'
+    encoding = None if binary else 'utf-8'
+    # Without newline translation, character offsets stay valid on every platform
+    newline = None if binary else ''
+    with os.fdopen(file_descriptor, mode, encoding=encoding, newline=newline) as file:
+        write_fn(file)
+    os.replace(temporary_path, path)
+
+
+def _get_metadata_path(batch_path):
+    return os.path.splitext(batch_path)[0] + METADATA_SUFFIX
+
+
+def _get_counts_path(batch_path):
+    return os.path.splitext(batch_path)[0] + COUNTS_SUFFIX
+
+
+def describe_circuit(circuit, register_boundaries):
+    """
+    Parameters:
+        - circuit is a circuit with measurements as returned by add_measurements_to_circuit.
+        - register_boundaries are the register boundaries returned along with circuit.
+    Returns a JSON serializable dict holding the fingerprint of circuit, its register boundaries
+    and its measurement layout, i.e. the pairs of measured qubit and classical bit indices.
+    """
+    measurement_layout = [
+        [circuit.find_bit(instruction.qubits[0]).index,
+         circuit.find_bit(instruction.clbits[0]).index]
+        for instruction in circuit.data if instruction.operation.name == 'measure'
+    ]
+    return {
+        'fingerprint': circuit_fingerprint(circuit),
+        'register_boundaries': [list(boundary) for boundary in register_boundaries],
+        'measurement_layout': measurement_layout
+    }
+
+
+def write_batch(circuits, batch_path, circuit_format='qpy', metadata=None):
+    """
+    Parameters:
+        - circuits is a list of circuits with measurements into the classical register
+          OFFLINE_CLASSICAL_REGISTER_NAME.
+        - batch_path is the path of the batch file.
+        - circuit_format is 'qpy' or 'qasm3'.
+        - metadata is an optional dict that gets stored next to the batch file.
+    Writes circuits and their metadata. The metadata file is written last, so that a batch is
+    only visible to executors once it is complete. OpenQASM 3 programs are written one after
+    another and their character offsets are stored in the metadata.
+    """
+    if circuit_format not in CIRCUIT_FORMATS:
+        raise ValueError(f'Unknown circuit format {circuit_format}.')
+    circuits = [replace_ancilla_reset_markers(c) for c in circuits]
+    metadata = dict(metadata or {})
+    if circuit_format == 'qpy':
+        _write_atomically(batch_path, lambda file: qpy.dump(circuits, file), binary=True)
+    else:
+        programs = [qasm3.dumps(c) + '\n' for c in circuits]
+        program_offsets = []
+        offset = 0
+        for program in programs:
+            program_offsets.append([offset, offset + len(program)])
+            offset += len(program)
+        _write_atomically(batch_path, lambda file: file.write(''.join(programs)))
+        metadata['program_offsets'] = program_offsets
+
+    metadata.update({
+        'circuit_format': circuit_format,
+        'circuit_count': len(circuits),
+        'classical_register': OFFLINE_CLASSICAL_REGISTER_NAME
+    })
+    _write_atomically(_get_metadata_path(batch_path), lambda file: json.dump(metadata, file))
+
+
+def read_batch(batch_path):
+    """
+    Returns a tuple (circuits, metadata) of the batch written by write_batch. Reading OpenQASM 3
+    batches requires the package qiskit_qasm3_import.
+    """
+    with open(_get_metadata_path(batch_path), encoding='utf-8') as file:
+        metadata = json.load(file)
+    if metadata['circuit_format'] == 'qpy':
+        with open(batch_path, 'rb') as file:
+            circuits = qpy.load(file)
+    else:
+        with open(batch_path, encoding='utf-8', newline='') as file:
+            text = file.read()
+        circuits = [qasm3.loads(text[start:end]) for start, end in metadata['program_offsets']]
+    return circuits, metadata
+
+
+def execute_batch(batch_path, sampler=None, backend=None, transpiler=None):
+    """
+    Parameters:
+        - batch_path is the path of a batch file written by write_batch.
+        - sampler, backend are as in run_circuit_and_measure_registers.
+        - transpiler is as in SimonSolver.
+    Transpiles and runs the circuits of the batch as a single job and writes their counts
+    atomically next to the batch file. Returns the path of the counts file.
+    """
+    circuits, metadata = read_batch(batch_path)
+    execution_backend = get_execution_backend(sampler=sampler, backend=backend)
+    transpiled_circuits = transpile_circuits(circuits, execution_backend, transpiler=transpiler)
+    log.info('Executing batch %s with %d circuit(s)', batch_path, len(circuits))
+    job = submit_transpiled_circuits(
+        transpiled_circuits, sampler=sampler, backend=backend, shots=metadata.get('shots')
+    )
+    counts = [
+        c[0] for c in get_counts_of_job(
+            job, len(circuits), [metadata['classical_register']], sampler=sampler, backend=backend
+        )
+    ]
+    counts_path = _get_counts_path(batch_path)
+    _write_atomically(counts_path, lambda file: json.dump(counts, file))
+    return counts_path
+
+
+def get_pending_batches(directory):
+    """
+    Returns the sorted paths of the complete batches in directory that have no counts yet.
+    """
+    pending_batches = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        is_batch = (
+            os.path.splitext(name)[1] in ('.qpy', '.qasm')
+            and os.path.exists(_get_metadata_path(path))
+        )
+        if is_batch and not os.path.exists(_get_counts_path(path)):
+            pending_batches.append(path)
+    return pending_batches
+
+
+def execute_pending_batches(directory, sampler=None, backend=None, transpiler=None):
+    """
+    Executes all pending batches in directory as in execute_batch. Returns the paths of the
+    executed batches.
+    """
+    pending_batches = get_pending_batches(directory)
+    for batch_path in pending_batches:
+        execute_batch(batch_path, sampler=sampler, backend=backend, transpiler=transpiler)
+    return pending_batches
+
+
+class OfflinePipeline:
+    """
+    Stands in for the execution of circuits. The k-th batch of circuits a solve requests is
+    looked up in directory. If its counts are present, they are returned. Otherwise the batch is
+    written to directory and a PendingBatchException is raised. Since the circuits of a solve
+    only depend on the counts of previous batches, re-running the solve after the batch was
+    executed replays the previous steps from their counts and continues with the next batch.
+    Use an instance as offline_pipeline in the SimonSolver constructor.
+    """
+    def __init__(self, directory, circuit_format='qpy'):
+        """
+        Parameters:
+            - directory is the directory holding the batches. It gets created if needed.
+            - circuit_format is as in write_batch.
+        """
+        if circuit_format not in CIRCUIT_FORMATS:
+            raise ValueError(f'Unknown circuit format {circuit_format}.')
+        self._directory = directory
+        self._circuit_format = circuit_format
+        self._next_batch_index = 0
+        os.makedirs(directory, exist_ok=True)
+
+
+    def reset(self):
+        """
+        Starts replaying from the first batch, e.g. when a solve gets restarted.
+        """
+        self._next_batch_index = 0
+
+
+    def _get_batch_path(self, batch_index):
+        extension = 'qpy' if self._circuit_format == 'qpy' else 'qasm'
+        return os.path.join(self._directory, f'batch-{batch_index:04d}.{extension}')
+
+
+    def run_circuits_and_measure_registers(self, circuits, registers, shots=None):
+        """
+        Parameters:
+            - circuits, registers are as in run_circuits_and_measure_registers.
+            - shots is optional. If present, it is stored with the batch and overrides the
+              default shots of the executor.
+        Returns a list of counts dicts in the order of circuits if the batch has been executed.
+        Raises a PendingBatchException otherwise. Raises a ValueError if the batch in directory
+        was written for other circuits, according to the descriptions of describe_circuit
+        stored in its metadata.
+        """
+        batch_path = self._get_batch_path(self._next_batch_index)
+        self._next_batch_index += 1
+        circuits_and_boundaries = [
+            add_measurements_to_circuit(
+                c, registers, classical_register_name=OFFLINE_CLASSICAL_REGISTER_NAME
+            ) for c in circuits
+        ]
+
+        circuit_descriptions = [describe_circuit(c, b) for c, b in circuits_and_boundaries]
+        metadata_path = _get_metadata_path(batch_path)
+        if os.path.exists(metadata_path):
+            with open(metadata_path, encoding='utf-8') as file:
+                recorded_descriptions = json.load(file).get('circuits')
+            if recorded_descriptions != circuit_descriptions:
+                raise ValueError(
+                    f'Batch {batch_path} holds other circuits than requested. It probably stems '
+                    'from another solve, use a fresh directory.'
+                )
+
+        counts_path = _get_counts_path(batch_path)
+        if os.path.exists(counts_path):
+            with open(counts_path, encoding='utf-8') as file:
+                counts_per_circuit = json.load(file)
+            if len(counts_per_circuit) != len(circuits):
+                raise ValueError(
+                    f'Batch {batch_path} holds counts of {len(counts_per_circuit)} circuit(s), '
+                    f'expected {len(circuits)}.'
+                )
+            log.info('Replaying the counts of batch %s', batch_path)
+            return [
+                split_counts_into_registers(counts, boundaries) for counts,
+                (_, boundaries) in zip(counts_per_circuit, circuits_and_boundaries)
+            ]
+
+        if not os.path.exists(metadata_path):
+            write_batch(
+                [c for c, _ in circuits_and_boundaries],
+                batch_path,
+                circuit_format=self._circuit_format,
+                metadata={'shots': shots, 'circuits': circuit_descriptions}
+            )
+            log.info('Wrote batch %s with %d circuit(s)', batch_path, len(circuits))
+        raise PendingBatchException(batch_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Executes the pending batches of an OfflinePipeline directory.'
+    )
+    parser.add_argument('directory')
+    parser.add_argument('--backend-name', default=DEFAULT_BACKEND_NAME)
+    arguments = parser.parse_args()
+
+    sampler = get_default_sampler_pool().get_sampler(arguments.backend_name)
+    for batch_path in execute_pending_batches(arguments.directory, sampler=sampler):
+        print(batch_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Contains the ResultCache class, an opt-in file-backed cache for the counts of circuits run on
+deterministic simulators, i.e. noiseless simulators with a fixed seed.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from simonalg.utils.logging import log
+from simonalg.utils.transpilation import circuit_fingerprint
+
+
+DEFAULT_DETERMINISTIC_BACKEND_NAMES = (
+    'aer_simulator',
+    'aer_simulator_stabilizer',
+    'aer_simulator_statevector',
+    'aer_simulator_matrix_product_state'
+)
+
+
+def _as_int_or_none(value):
+    return value if isinstance(value, int) else None
+
+
+def get_execution_settings(sampler=None, backend=None):
+    """
+    Parameters:
+        - sampler, backend are as in run_circuit_and_measure_registers.
+    Returns a tuple (execution_backend, shots, seed) describing how circuits get executed.
+    Options set on the sampler take precedence over options set on its backend. shots and seed
+    are None if they are not set.
+    """
+    use_primitives_v2_api = sampler and (not backend)
+    execution_backend = sampler.backend() if use_primitives_v2_api else backend
+    backend_options = execution_backend.options
+    shots = _as_int_or_none(getattr(backend_options, 'shots', None))
+    seed = _as_int_or_none(getattr(backend_options, 'seed_simulator', None))
+    if use_primitives_v2_api:
+        sampler_shots = _as_int_or_none(sampler.options.default_shots)
+        sampler_seed = _as_int_or_none(sampler.options.simulator.seed_simulator)
+        shots = sampler_shots if sampler_shots is not None else shots
+        seed = sampler_seed if sampler_seed is not None else seed
+    return execution_backend, shots, seed
+
+
+class ResultCache:
+    """
+    Stores the counts of executed circuits as JSON files in a directory. Entries are keyed by the
+    fingerprint of the transpiled circuit, the backend name and options, the number of shots and
+    the seed. Only backends that are declared deterministic, run with a fixed seed and without
+    noise model are cached. If the directory holds more than max_entries results, the least
+    recently used ones are evicted.
+    """
+    def __init__(
+        self,
+        directory,
+        max_entries=1024,
+        deterministic_backend_names=DEFAULT_DETERMINISTIC_BACKEND_NAMES
+    ):
+        """
+        Parameters:
+            - directory is the directory holding the cached results. It gets created if needed.
+            - max_entries is the maximum number of cached results.
+            - deterministic_backend_names are the names of the backends that are declared
+              deterministic.
+        """
+        self._directory = directory
+        self._max_entries = max_entries
+        self._deterministic_backend_names = set(deterministic_backend_names)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+
+    def is_cacheable(self, sampler=None, backend=None):
+        """
+        Parameters:
+            - sampler, backend are as in run_circuit_and_measure_registers.
+        Returns True iff results of the execution backend may be cached.
+        """
+        execution_backend, _, seed = get_execution_settings(sampler=sampler, backend=backend)
+        has_noise_model = getattr(execution_backend.options, 'noise_model', None) is not None
+        return (
+            execution_backend.name in self._deterministic_backend_names
+            and seed is not None
+            and not has_noise_model
+        )
+
+
+    def key(self, transpiled_circuit, sampler=None, backend=None):
+        """
+        Parameters:
+            - transpiled_circuit is a circuit with measurements, transpiled for the execution
+              backend.
+            - sampler, backend are as in run_circuit_and_measure_registers.
+        Returns the cache key for running transpiled_circuit.
+        """
+        execution_backend, shots, seed = get_execution_settings(sampler=sampler, backend=backend)
+        backend_options = sorted(
+            (name, repr(value)) for name, value in execution_backend.options.items()
+            if name != 'executor'
+        )
+        key_material = repr((
+            circuit_fingerprint(transpiled_circuit),
+            execution_backend.name,
+            backend_options,
+            shots,
+            seed
+        ))
+        return hashlib.sha256(key_material.encode()).hexdigest()
+
+
+    def _path(self, key):
+        return os.path.join(self._directory, f'{key}.json')
+
+
+    def get(self, key):
+        """
+        Returns the cached counts for key or None if there are none.
+        """
+        with self._lock:
+            path = self._path(key)
+            if not os.path.exists(path):
+                self.misses += 1
+                return None
+            with open(path, encoding='utf-8') as file:
+                counts = json.load(file)
+            os.utime(path)
+            self.hits += 1
+            log.debug('Result cache hit for circuit %s', key)
+            return counts
+
+
+    def put(self, key, counts):
+        """
+        Stores counts for key and evicts the least recently used results if the cache is full.
+        """
+        with self._lock:
+            file_descriptor, temporary_path = tempfile.mkstemp(
+                dir=self._directory, suffix='.tmp'
+            )
+            with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file:
+                json.dump(counts, file)
+            os.replace(temporary_path, self._path(key))
+            self._evict()
+
+
+    def _evict(self):
+        paths = [os.path.join(self._directory, name) for name in os.listdir(self._directory)
+                 if name.endswith('.json')]
+        if len(paths) <= self._max_entries:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self._max_entries]:
+            os.remove(path)
@@ -0,0 +1,130 @@
+"""
+Contains the SamplerPool class, a thread-safe registry of reusable samplers. Constructing a
+backend and its target is costly, especially for fake hardware backends such as FakeSherbrooke,
+so samplers are built once per configuration and shared across solves.
+"""
+
+import threading
+
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2
+
+from simonalg.utils.logging import log
+from simonalg.utils.simulation import get_simulator_options, apply_simulator_options
+
+
+DEFAULT_BACKEND_NAME = 'aer_simulator'
+
+
+def _create_fake_sherbrooke():
+    # Importing the fake provider loads all fake backends, so only do it on demand
+    # pylint: disable-next=import-outside-toplevel
+    from qiskit_ibm_runtime.fake_provider import FakeSherbrooke
+    return FakeSherbrooke()
+
+
+DEFAULT_BACKEND_FACTORIES = {
+    'aer_simulator': AerSimulator,
+    'fake_sherbrooke': _create_fake_sherbrooke,
+    'aer_simulator_from_fake_sherbrooke': lambda: AerSimulator.from_backend(
+        _create_fake_sherbrooke()
+    )
+}
+
+
+def _configuration_key(backend_name, simulator_options):
+    return (backend_name, repr(sorted(simulator_options.items())))
+
+
+class SamplerPool:
+    """
+    Hands out one SamplerV2 per configuration, i.e. per backend name and simulator options.
+    Each configuration gets its own backend instance, so options set for one configuration
+    never leak into another. Samplers are built lazily on first use or up front via warm_up.
+    Solvers never set options on a pooled backend, e.g. with select_simulation_method, but on
+    a copy of it, so all solvers may share a configuration.
+    """
+    def __init__(self, backend_factories=None):
+        """
+        Parameters:
+            - backend_factories is a dict mapping backend names to functions without parameters
+              that construct the backend. Defaults to DEFAULT_BACKEND_FACTORIES.
+        """
+        self._backend_factories = dict(
+            backend_factories if backend_factories is not None else DEFAULT_BACKEND_FACTORIES
+        )
+        self._samplers = {}
+        self._configuration_locks = {}
+        self._lock = threading.Lock()
+
+
+    def register_backend_factory(self, backend_name, backend_factory):
+        """
+        Makes the backend constructed by backend_factory available under backend_name.
+        """
+        with self._lock:
+            self._backend_factories[backend_name] = backend_factory
+
+
+    def _get_configuration_lock(self, key):
+        with self._lock:
+            return self._configuration_locks.setdefault(key, threading.Lock())
+
+
+    def get_sampler(self, backend_name=DEFAULT_BACKEND_NAME, simulator_options=None):
+        """
+        Parameters:
+            - backend_name is the name of a registered backend factory.
+            - simulator_options is as in SimonSolver. It may only be given for Aer simulators.
+        Returns the sampler for this configuration, building it if there is none yet. Concurrent
+        calls for the same configuration build the sampler only once.
+        """
+        if backend_name not in self._backend_factories:
+            raise ValueError(
+                f'Unknown backend {backend_name}, expected one of '
+                f'{sorted(self._backend_factories)}.'
+            )
+        if isinstance(simulator_options, str):
+            simulator_options = get_simulator_options(preset=simulator_options)
+        simulator_options = simulator_options or {}
+        key = _configuration_key(backend_name, simulator_options)
+
+        with self._get_configuration_lock(key):
+            sampler = self._samplers.get(key)
+            if sampler is not None:
+                return sampler
+
+            log.info('Building sampler for backend %s', backend_name)
+            backend = self._backend_factories[backend_name]()
+            # The target is built lazily, so we build it here instead of in the first solve.
+            _ = backend.target
+            sampler = SamplerV2(backend)
+            if len(simulator_options) > 0:
+                sampler, _ = apply_simulator_options(simulator_options, sampler=sampler)
+            with self._lock:
+                self._samplers[key] = sampler
+            return sampler
+
+
+    def warm_up(self, configurations):
+        """
+        Parameters:
+            - configurations is a list of backend names or of tuples
+              (backend_name, simulator_options).
+        Builds the samplers for all configurations, e.g. at service startup.
+        """
+        for configuration in configurations:
+            if isinstance(configuration, str):
+                self.get_sampler(configuration)
+            else:
+                self.get_sampler(*configuration)
+
+
+_default_sampler_pool = SamplerPool()
+
+
+def get_default_sampler_pool():
+    """
+    Returns the process-wide SamplerPool used by SimonSolver.from_sampler_pool by default.
+    """
+    return _default_sampler_pool
@@ -0,0 +1,88 @@
+"""
+Contains the AdaptiveShotPolicy class, which decides how many shots a circuit gets. Circuits are
+run with a small number of shots first and only get more shots while their most frequent
+outcome is ambiguous, as decided by a sequential probability ratio test.
+"""
+
+import math
+
+from simonalg.utils.circuit import is_ideal_simulator
+
+
+class AdaptiveShotPolicy:
+    """
+    Implements Wald's sequential probability ratio test on the shots that yielded the leading or
+    the runner-up outcome. The null hypothesis is that both outcomes are equally likely, the
+    alternative is that a shot among them yields the leading outcome with probability
+    alternative_probability. The leading outcome is accepted as the mode once the log-likelihood
+    ratio exceeds the upper threshold of the test. Otherwise the number of shots grows
+    geometrically up to max_shots.
+    """
+    def __init__(
+        self,
+        initial_shots=16,
+        max_shots=1024,
+        growth_factor=2,
+        alternative_probability=0.75,
+        error_probability=0.01,
+        ideal_simulator_shots=1
+    ):
+        """
+        Parameters:
+            - initial_shots is the number of shots of the first run of a circuit.
+            - max_shots is the maximum total number of shots of a circuit.
+            - growth_factor is the factor by which the total number of shots of an ambiguous
+              circuit grows with each additional run.
+            - alternative_probability is the probability of the leading outcome among the
+              leading and runner-up outcome under the alternative hypothesis.
+            - error_probability is the probability of accepting a leading outcome that is not
+              more likely than the runner-up.
+            - ideal_simulator_shots is the number of shots on ideal simulators. Every outcome
+              of an ideal simulator is a valid result, so a single shot suffices.
+        """
+        if not 0.5 < alternative_probability < 1:
+            raise ValueError('alternative_probability has to be in the open interval (0.5, 1).')
+        self.initial_shots = initial_shots
+        self.max_shots = max_shots
+        self.growth_factor = growth_factor
+        self.ideal_simulator_shots = ideal_simulator_shots
+        self._leading_weight = math.log(2 * alternative_probability)
+        self._runner_up_weight = math.log(2 * (1 - alternative_probability))
+        self._threshold = math.log((1 - error_probability) / error_probability)
+
+
+    def get_initial_shots(self, execution_backend):
+        """
+        Returns the number of shots of the first run of a circuit on execution_backend.
+        """
+        if is_ideal_simulator(execution_backend):
+            return self.ideal_simulator_shots
+        return min(self.initial_shots, self.max_shots)
+
+
+    def get_additional_shots(self, total_shots):
+        """
+        Returns the number of shots of the next run of an ambiguous circuit which already got
+        total_shots shots. Returns 0 once max_shots is reached.
+        """
+        return max(0, min(total_shots * (self.growth_factor - 1), self.max_shots - total_shots))
+
+
+    def log_likelihood_ratio(self, counts):
+        """
+        Parameters:
+            - counts is a counts dict or an IntegerCounts object.
+        Returns the log-likelihood ratio of the alternative to the null hypothesis.
+        """
+        top_counts = sorted((int(c) for c in counts.values()), reverse=True)[:2] + [0, 0]
+        return top_counts[0] * self._leading_weight + top_counts[1] * self._runner_up_weight
+
+
+    def is_conclusive(self, counts, execution_backend):
+        """
+        Returns True iff the most frequent outcome of counts is settled, i.e. if counts stem from
+        an ideal simulator or if the test accepts the leading outcome as the mode.
+        """
+        if is_ideal_simulator(execution_backend):
+            return True
+        return self.log_likelihood_ratio(counts) >= self._threshold
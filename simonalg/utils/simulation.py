@@ -0,0 +1,327 @@
+"""
+Contains functionality for choosing the simulation method of the Aer simulator from an analysis
+of the circuits we want to run. Clifford circuits, such as the standard Simon circuit with a
+CosetRepresentativeOracle, are simulated with the stabilizer method. Circuits whose statevector
+does not fit into memory, e.g. wide remove-zero circuits with many ancillas, are simulated as
+matrix product states, provided a structural bound on their entanglement shows that the matrix
+product state fits. Furthermore, there are presets for the parallelization and fusion
+options of the Aer simulator. Options are never set on a given simulator, which may be shared
+with concurrent solves, e.g. via the SamplerPool, but on a copy of it.
+"""
+
+import copy
+import threading
+import weakref
+
+import psutil
+from qiskit.circuit.library import get_standard_gate_name_mapping
+from qiskit_ibm_runtime import SamplerV2
+
+from simonalg.utils.logging import log
+
+
+STABILIZER_METHOD = 'stabilizer'
+STATEVECTOR_METHOD = 'statevector'
+MATRIX_PRODUCT_STATE_METHOD = 'matrix_product_state'
+
+# Ordered from the least to the most general method, see select_simulation_method_for_circuits.
+SIMULATION_METHODS = (STABILIZER_METHOD, STATEVECTOR_METHOD, MATRIX_PRODUCT_STATE_METHOD)
+
+CLIFFORD_OPERATION_NAMES = frozenset([
+    'id', 'x', 'y', 'z', 'h', 's', 'sdg', 'sx', 'sxdg', 'cx', 'cy', 'cz', 'swap', 'ecr',
+    'measure', 'reset', 'barrier', 'delay'
+])
+
+# A complex amplitude in double precision.
+BYTES_PER_AMPLITUDE = 16
+
+# The name of the ancilla register of CircuitWrapper.
+ANCILLA_REGISTER_NAME = 'anc'
+
+# Aer itself caps the memory of a simulation at half of the system memory by default.
+STATEVECTOR_MEMORY_FRACTION = 0.5
+
+_STANDARD_GATE_NAMES = frozenset(get_standard_gate_name_mapping().keys())
+
+_configured_simulators = weakref.WeakKeyDictionary()
+_configured_simulators_lock = threading.Lock()
+
+
+def is_aer_simulator(backend):
+    """
+    Parameters:
+        - backend is a Qiskit backend.
+    Returns True iff backend is an Aer simulator, i.e. supports the method option.
+    """
+    return backend.name.startswith('aer_simulator')
+
+
+def is_clifford_circuit(circuit):
+    """
+    Parameters:
+        - circuit is a quantum circuit.
+    Returns True iff circuit only consists of Clifford gates, measurements and resets.
+    Definitions of non-standard operations, e.g. composed sub-circuits, are inspected
+    recursively.
+    """
+    for instruction in circuit.data:
+        operation = instruction.operation
+        if operation.name in CLIFFORD_OPERATION_NAMES:
+            continue
+        definition = getattr(operation, 'definition', None)
+        if operation.name in _STANDARD_GATE_NAMES or definition is None:
+            return False
+        if not is_clifford_circuit(definition):
+            return False
+    return True
+
+
+def estimate_statevector_memory(qubit_count):
+    """
+    Returns the number of bytes needed to hold the statevector of qubit_count qubits.
+    """
+    return BYTES_PER_AMPLITUDE * 2 ** qubit_count
+
+
+def _add_cut_crossings(circuit, qubit_indices, crossings):
+    for instruction in circuit.data:
+        operation = instruction.operation
+        if operation.name == 'barrier' or len(instruction.qubits) < 2:
+            continue
+        indices = sorted(qubit_indices[circuit.find_bit(q).index] for q in instruction.qubits)
+        # A gate acting on a qubits left and b qubits right of a cut raises the Schmidt rank
+        # across the cut by a factor of at most 4^min(a, b)
+        for position in range(len(indices) - 1):
+            for cut in range(indices[position], indices[position + 1]):
+                crossings[cut] += 2 * min(position + 1, len(indices) - position - 1)
+
+
+def get_bond_qubit_counts(circuit):
+    """
+    Parameters:
+        - circuit is a quantum circuit.
+    Returns a list holding, for each of the num_qubits - 1 cuts between neighbouring qubits of
+    circuit, an upper bound on the logarithm of the bond dimension a matrix product state
+    simulation of circuit needs at this cut. The bound is the minimum of
+        - the number of qubits on either side of the cut, not counting the qubits of the ancilla
+          register. Every multi-controlled gate returns its ancillas to |0>, so they are
+          assumed to not carry entanglement from one gate to the next.
+        - the entanglement the multi-qubit gates crossing the cut can create at most.
+    """
+    qubit_count = circuit.num_qubits
+    ancilla_qubits = set(
+        circuit.find_bit(q).index
+        for register in circuit.qregs if register.name == ANCILLA_REGISTER_NAME
+        for q in register
+    )
+    crossings = [0] * max(qubit_count - 1, 0)
+    _add_cut_crossings(circuit, list(range(qubit_count)), crossings)
+
+    is_data_qubit = [0 if index in ancilla_qubits else 1 for index in range(qubit_count)]
+    data_qubit_count = sum(is_data_qubit)
+    bond_qubit_counts = []
+    left_data_qubit_count = 0
+    for cut in range(qubit_count - 1):
+        left_data_qubit_count += is_data_qubit[cut]
+        bond_qubit_counts.append(min(
+            left_data_qubit_count, data_qubit_count - left_data_qubit_count, crossings[cut]
+        ))
+    return bond_qubit_counts
+
+
+def estimate_matrix_product_state_memory(circuit):
+    """
+    Returns the number of bytes needed to hold a matrix product state of circuit with the bond
+    dimensions bounded by get_bond_qubit_counts.
+    """
+    bond_dimensions = [1] + [2 ** b for b in get_bond_qubit_counts(circuit)] + [1]
+    return sum(
+        BYTES_PER_AMPLITUDE * 2 * bond_dimensions[k] * bond_dimensions[k + 1]
+        for k in range(circuit.num_qubits)
+    )
+
+
+def get_statevector_memory_limit():
+    """
+    Returns the number of bytes a statevector simulation may use on this machine.
+    """
+    return int(STATEVECTOR_MEMORY_FRACTION * psutil.virtual_memory().available)
+
+
+def select_simulation_method(circuit, max_memory=None):
+    """
+    Parameters:
+        - circuit is the quantum circuit we want to simulate.
+        - max_memory is the number of bytes a statevector simulation may use. Defaults to
+          get_statevector_memory_limit().
+    Returns 'stabilizer' if circuit is a Clifford circuit, 'statevector' if the statevector of
+    circuit fits into max_memory and 'matrix_product_state' if the matrix product state of
+    circuit fits into max_memory according to estimate_matrix_product_state_memory. Since the
+    ancillas of the wide circuits are uncomputed right away, their entanglement stays low, which
+    is where matrix product states are efficient. Raises a ValueError if neither fits, since a
+    highly entangled circuit would take very long as a matrix product state.
+    """
+    if is_clifford_circuit(circuit):
+        return STABILIZER_METHOD
+
+    if max_memory is None:
+        max_memory = get_statevector_memory_limit()
+    required_memory = estimate_statevector_memory(circuit.num_qubits)
+    if required_memory <= max_memory:
+        return STATEVECTOR_METHOD
+
+    log.info(
+        'Statevector of %d qubits needs %d bytes but only %d bytes are available',
+        circuit.num_qubits, required_memory, max_memory
+    )
+    required_memory = estimate_matrix_product_state_memory(circuit)
+    if required_memory <= max_memory:
+        return MATRIX_PRODUCT_STATE_METHOD
+    raise ValueError(
+        f'Circuit {circuit.name} of {circuit.num_qubits} qubits is too entangled for a matrix '
+        f'product state, which may need up to {required_memory} bytes.'
+    )
+
+
+def select_simulation_method_for_circuits(circuits, max_memory=None):
+    """
+    Parameters:
+        - circuits is a list of quantum circuits we want to simulate in a single job.
+        - max_memory is as in select_simulation_method.
+    Returns the most general method any of circuits needs, see SIMULATION_METHODS.
+    """
+    methods = [select_simulation_method(c, max_memory=max_memory) for c in circuits]
+    return max(methods, key=SIMULATION_METHODS.index)
+
+
+def get_configured_simulator(simulator, **options):
+    """
+    Parameters:
+        - simulator is an Aer simulator.
+        - options are Aer simulator options.
+    Returns simulator itself if it already has options and a copy of simulator with options
+    set otherwise. simulator is left unchanged. The copies are memoized per simulator and
+    options, so repeated calls do not copy the simulator again.
+    """
+    if all(getattr(simulator.options, name, None) == value for name, value in options.items()):
+        return simulator
+
+    key = repr(sorted(options.items()))
+    with _configured_simulators_lock:
+        configured_simulator = _configured_simulators.setdefault(simulator, {}).get(key)
+    if configured_simulator is None:
+        log.info('Copying %s with options %s', simulator.name, options)
+        configured_simulator = copy.deepcopy(simulator)
+        configured_simulator.set_options(**options)
+        with _configured_simulators_lock:
+            configured_simulator = _configured_simulators[simulator].setdefault(
+                key, configured_simulator
+            )
+    return configured_simulator
+
+
+def _with_configured_simulator(options, sampler=None, backend=None, default_shots=None):
+    use_primitives_v2_api = sampler and (not backend)
+    if not use_primitives_v2_api:
+        return sampler, get_configured_simulator(backend, **options)
+
+    configured_simulator = get_configured_simulator(sampler.backend(), **options)
+    if configured_simulator is sampler.backend() and default_shots is None:
+        return sampler, backend
+    configured_sampler = SamplerV2(mode=configured_simulator, options=sampler.options)
+    if default_shots is not None:
+        configured_sampler.options.default_shots = default_shots
+    return configured_sampler, backend
+
+
+def configure_simulation_method(circuits, sampler=None, backend=None, max_memory=None):
+    """
+    Parameters:
+        - circuits is a list of quantum circuits.
+        - sampler, backend are as in run_circuit_and_measure_registers.
+        - max_memory is as in select_simulation_method.
+    Returns a tuple (sampler, backend) to run circuits with, whose Aer simulator uses the
+    simulation method selected for circuits. The method has to be set before transpiling, since
+    the target of the simulator depends on it. The given sampler and backend are returned
+    unchanged if the execution backend is no Aer simulator.
+    """
+    use_primitives_v2_api = sampler and (not backend)
+    execution_backend = sampler.backend() if use_primitives_v2_api else backend
+    if not is_aer_simulator(execution_backend):
+        return sampler, backend
+
+    method = select_simulation_method_for_circuits(circuits, max_memory=max_memory)
+    if execution_backend.options.method != method:
+        log.info('Running on %s with simulation method %s', execution_backend.name, method)
+    return _with_configured_simulator({'method': method}, sampler=sampler, backend=backend)
+
+
+# Runs the experiments of a job in parallel, each on a single thread. Suited for jobs holding
+# many small circuits, e.g. the circuits of all working indices in batch mode.
+MANY_SMALL_CIRCUITS_PRESET = {
+    'max_parallel_threads': 0,
+    'max_parallel_experiments': 0,
+    'max_parallel_shots': 1,
+    'fusion_enable': True
+}
+
+# Runs the experiments of a job one after another and parallelizes the statevector updates of
+# each. Suited for jobs holding a single wide circuit, e.g. side by side runs.
+ONE_BIG_CIRCUIT_PRESET = {
+    'max_parallel_threads': 0,
+    'max_parallel_experiments': 1,
+    'max_parallel_shots': 1,
+    'statevector_parallel_threshold': 12,
+    'fusion_enable': True,
+    'fusion_threshold': 20
+}
+
+SIMULATOR_OPTION_PRESETS = {
+    'many_small_circuits': MANY_SMALL_CIRCUITS_PRESET,
+    'one_big_circuit': ONE_BIG_CIRCUIT_PRESET
+}
+
+
+def get_simulator_options(preset=None, **options):
+    """
+    Parameters:
+        - preset is optional. If present, it is the name of one of SIMULATOR_OPTION_PRESETS.
+        - options are Aer simulator options, e.g. max_parallel_threads, fusion_threshold or
+          shots, which take precedence over those of preset.
+    Returns a dict of simulator options as accepted by apply_simulator_options.
+    """
+    if preset is not None and preset not in SIMULATOR_OPTION_PRESETS:
+        raise ValueError(
+            f'Unknown preset {preset}, expected one of {sorted(SIMULATOR_OPTION_PRESETS)}.'
+        )
+    simulator_options = dict(SIMULATOR_OPTION_PRESETS[preset]) if preset is not None else {}
+    simulator_options.update(options)
+    return simulator_options
+
+
+def apply_simulator_options(simulator_options, sampler=None, backend=None):
+    """
+    Parameters:
+        - simulator_options is a dict as returned by get_simulator_options or the name of one
+          of SIMULATOR_OPTION_PRESETS.
+        - sampler, backend are as in run_circuit_and_measure_registers.
+    Returns a tuple (sampler, backend) to run circuits with, whose Aer simulator has
+    simulator_options set (see get_configured_simulator). If sampler is present, the shots 
+    option becomes the default shots of the returned sampler instead, which take precedence 
+    over the shots of its backend. The given sampler and backend are left unchanged. Raises a
+    ValueError if the execution backend is no Aer simulator.
+    """
+    if isinstance(simulator_options, str):
+        simulator_options = get_simulator_options(preset=simulator_options)
+    simulator_options = dict(simulator_options)
+
+    use_primitives_v2_api = sampler and (not backend)
+    execution_backend = sampler.backend() if use_primitives_v2_api else backend
+    if not is_aer_simulator(execution_backend):
+        raise ValueError(f'Simulator options cannot be set on {execution_backend.name}.')
+
+    default_shots = simulator_options.pop('shots', None) if use_primitives_v2_api else None
+    log.info('Using simulator options %s on %s', simulator_options, execution_backend.name)
+    return _with_configured_simulator(
+        simulator_options, sampler=sampler, backend=backend, default_shots=default_shots
+    )
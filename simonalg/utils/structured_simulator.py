@@ -0,0 +1,160 @@
+"""
+Contains the StructuredSampler class, which simulates the circuits generated by SimonCircuit
+exactly, but only on the registers that matter. The oracle and the blocking clauses are applied
+as classical permutations of a state vector over the input, output and blocking clause
+registers, so the ancilla registers never enter the simulation.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from simonalg.simon_circuit import STANDARD_CIRCUIT_KIND, REMOVE_ZERO_CIRCUIT_KIND
+from simonalg.utils.analytic_sampler import AnalyticSampler, bitstrings_to_matrix
+from simonalg.utils.analytic_sampler import get_simon_metadata, row_reduce_mod_2
+from simonalg.utils.circuit import EXACT_PROBABILITY_TOLERANCE
+
+
+def _apply_hadamard(state, qubit):
+    pairs = state.reshape(-1, 2, 2 ** qubit)
+    zeros, ones = pairs[:, 0].copy(), pairs[:, 1]
+    pairs[:, 0] += ones
+    pairs[:, 1] = zeros - ones
+    state *= np.sqrt(0.5)
+
+
+def get_coset_labels(hidden_subgroup, n):
+    """
+    Parameters:
+        - hidden_subgroup is the list of bitstrings of the hidden subgroup H.
+        - n is the length of the bitstrings.
+    Returns a tuple (labels, m), where labels[x] is the number of the coset x + H for every input
+    x in the integer convention of the input register and m is the number of bits needed to hold
+    a label. Any oracle of H maps x to its label up to a bijection, which leaves the measured
+    input register unchanged.
+    """
+    reduced, pivot_columns = row_reduce_mod_2(bitstrings_to_matrix(hidden_subgroup, n), n)
+    representatives = np.arange(2 ** n, dtype=np.int64)
+    for row, pivot_column in zip(reduced, pivot_columns):
+        row_mask = int(''.join(str(b) for b in row), 2)
+        has_pivot = (representatives >> (n - 1 - pivot_column)) & 1
+        representatives ^= has_pivot * row_mask
+    _, labels = np.unique(representatives, return_inverse=True)
+    return labels.astype(np.int64), n - len(pivot_columns)
+
+
+class StructuredDistribution:
+    """
+    The exact distribution of the input register of a circuit, given as a NumPy array of 2^n
+    probabilities indexed in the integer convention of the input register.
+    """
+    def __init__(self, n, probabilities):
+        self.n = n
+        self._probabilities = probabilities / probabilities.sum()
+
+
+    def sample(self, shots, rng):
+        """
+        Returns a NumPy array of shape (shots, n) holding one sampled bitstring per row.
+        """
+        outcomes = rng.choice(len(self._probabilities), size=shots, p=self._probabilities)
+        shifts = np.arange(self.n - 1, -1, -1, dtype=np.int64)
+        return ((outcomes[:, None] >> shifts) & 1).astype(np.uint8)
+
+
+    def probabilities(self):
+        """
+        Returns a dict mapping each bitstring with nonzero probability to its probability.
+        """
+        return dict(
+            (format(x, f'0{self.n}b'), float(p)) for x, p in enumerate(self._probabilities)
+            if p > EXACT_PROBABILITY_TOLERANCE
+        )
+
+
+class StructuredSampler(AnalyticSampler):
+    """
+    Samples the outcomes of circuits generated by SimonCircuit from their exact distribution,
+    which is computed by a state vector simulation restricted to the input, output and blocking
+    clause registers instead of by the closed form of the AnalyticSampler. It takes 2^(n+m+b)
+    amplitudes of memory, where m = n - dim H and b is the number of blocking clauses, and is
+    meant as an independent exact reference for n up to about 10.
+
+    The forward stage A (standard Simon circuit followed by the blocking clauses) is simulated
+    once per hidden subgroup and set of blocking clauses and cached in state psi = A|0>. The
+    backward stage and the final forward stage around S_0 never get simulated, since
+    A S_0(phi) A^(-1) = I + (e^(i phi) - 1) |psi><psi|. A remove-zero circuit for any indices
+    thus only costs a phase shift of psi and an inner product.
+    """
+    def __init__(self, default_shots=1024, seed=None, backend=None, forward_state_cache_size=2):
+        """
+        Parameters:
+            - default_shots, seed, backend are as in AnalyticSampler.
+            - forward_state_cache_size is the number of forward states kept in memory.
+        """
+        super().__init__(default_shots=default_shots, seed=seed, backend=backend)
+        self._forward_state_cache_size = forward_state_cache_size
+        self._forward_states = OrderedDict()
+        self.forward_state_count = 0
+
+
+    def _simulate_forward_stage(self, hidden_subgroup, blocking_clauses):
+        n = len(hidden_subgroup[0])
+        labels, m = get_coset_labels(hidden_subgroup, n)
+        b = len(blocking_clauses)
+
+        # Hadamards on the input register followed by the oracle x -> (x, label(x))
+        state = np.zeros(2 ** (n + m + b), dtype=np.complex128)
+        inputs = np.arange(2 ** n, dtype=np.int64)
+        state[inputs | (labels << n)] = 2 ** (-n / 2)
+        for qubit in range(n):
+            _apply_hadamard(state, qubit)
+
+        indices = np.arange(len(state), dtype=np.int64)
+        for clause_index, (bitstring, j) in enumerate(blocking_clauses):
+            blocking_qubit = n + m + clause_index
+            # Both permutations are involutions, so gathering with them applies them
+            state = state[indices ^ (((indices >> j) & 1) << blocking_qubit)]
+            state = state[indices ^ (((indices >> blocking_qubit) & 1) * int(bitstring, 2))]
+            _apply_hadamard(state, blocking_qubit)
+        return state
+
+
+    def get_forward_state(self, hidden_subgroup, blocking_clauses):
+        """
+        Returns the state vector psi = A|0> of the forward stage over the input, output and
+        blocking clause registers, where the input register holds the lowest n bits.
+        """
+        key = (tuple(hidden_subgroup), tuple((b, j) for b, j in blocking_clauses))
+        if key in self._forward_states:
+            self._forward_states.move_to_end(key)
+            return self._forward_states[key]
+
+        state = self._simulate_forward_stage(hidden_subgroup, blocking_clauses)
+        self.forward_state_count += 1
+        self._forward_states[key] = state
+        while len(self._forward_states) > self._forward_state_cache_size:
+            self._forward_states.popitem(last=False)
+        return state
+
+
+    def get_distribution(self, circuit):
+        """
+        Returns the StructuredDistribution of circuit. Raises a ValueError if circuit was not
+        generated by SimonCircuit.
+        """
+        metadata = get_simon_metadata(circuit)
+        n = len(metadata['hidden_subgroup'][0])
+        state = self.get_forward_state(metadata['hidden_subgroup'], metadata['blocking_clauses'])
+
+        if metadata['kind'] == REMOVE_ZERO_CIRCUIT_KIND:
+            phase = np.exp(1j * metadata['angle'])
+            good_state_mask = sum(1 << i for i in metadata['good_state_indices'])
+            is_good_state = (np.arange(len(state), dtype=np.int64) & good_state_mask) != 0
+            shifted_state = np.where(is_good_state, phase * state, state)
+            state = shifted_state + (phase - 1) * np.vdot(state, shifted_state) * state
+        elif metadata['kind'] != STANDARD_CIRCUIT_KIND:
+            raise ValueError(f'Unknown kind of Simon circuit {metadata["kind"]}.')
+
+        probabilities = (np.abs(state) ** 2).reshape(-1, 2 ** n).sum(axis=0)
+        return StructuredDistribution(n, probabilities)
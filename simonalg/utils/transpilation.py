@@ -0,0 +1,320 @@
+"""
+Contains functionality for transpiling circuits more efficiently than calling qiskit's transpile
+over and over again. The TranspileCache reuses transpiled circuits across executions, keyed by a
+structural fingerprint of the circuit, a fingerprint of the backend target and the transpile
+options. The SimonTranspiler computes a layout once and pins it for all later circuits with the
+same register structure.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+from qiskit import transpile, qpy
+from qiskit.circuit.library import get_standard_gate_name_mapping
+from qiskit.transpiler import generate_preset_pass_manager
+
+from simonalg.utils.logging import log
+
+
+_STANDARD_GATE_NAMES = frozenset(get_standard_gate_name_mapping().keys())
+
+_backend_fingerprints = weakref.WeakKeyDictionary()
+_backend_fingerprints_lock = threading.Lock()
+
+
+def _update_with_circuit(digest, circuit, include_metadata=False):
+    if include_metadata:
+        digest.update(json.dumps(circuit.metadata, sort_keys=True, default=str).encode())
+    digest.update(repr((
+        circuit.num_qubits,
+        circuit.num_clbits,
+        [(r.name, r.size) for r in circuit.qregs],
+        [(r.name, r.size) for r in circuit.cregs],
+        str(circuit.global_phase)
+    )).encode())
+    for instruction in circuit.data:
+        operation = instruction.operation
+        digest.update(repr((
+            operation.name,
+            operation.num_qubits,
+            [str(param) for param in operation.params],
+            getattr(operation, 'label', None),
+            tuple(circuit.find_bit(q).index for q in instruction.qubits),
+            tuple(circuit.find_bit(c).index for c in instruction.clbits)
+        )).encode())
+        definition = getattr(operation, 'definition', None)
+        if operation.name not in _STANDARD_GATE_NAMES and definition is not None:
+            _update_with_circuit(digest, definition)
+
+
+def circuit_fingerprint(circuit):
+    """
+    Parameters:
+        - circuit is a quantum circuit.
+    Returns a hash over the structure of circuit, i.e. its registers, global phase and
+    instructions including parameters and the qubits they act on, and over its metadata. Unlike
+    the circuit name or object identity, the fingerprint is the same for two circuits built the
+    same way. Definitions of non-standard operations are included recursively. The metadata
+    matters for circuits like those of an AnalyticSimonCircuit, which carry no gates.
+    """
+    digest = hashlib.sha256()
+    _update_with_circuit(digest, circuit, include_metadata=True)
+    return digest.hexdigest()
+
+
+def backend_fingerprint(backend):
+    """
+    Parameters:
+        - backend is a Qiskit backend.
+    Returns a hash over the backend name and version, its number of qubits, the instructions its
+    target supports on which qubits and their error rates as well as its coupling map. A
+    recalibrated device therefore gets a new fingerprint. The fingerprint is computed once per
+    backend object, so fetch a fresh backend object to pick up a recalibration.
+    """
+    try:
+        with _backend_fingerprints_lock:
+            fingerprint = _backend_fingerprints.get(backend)
+    except TypeError:
+        # Backends which cannot be weakly referenced get fingerprinted on every call
+        return _compute_backend_fingerprint(backend)
+    if fingerprint is None:
+        fingerprint = _compute_backend_fingerprint(backend)
+        with _backend_fingerprints_lock:
+            _backend_fingerprints[backend] = fingerprint
+    return fingerprint
+
+
+def _compute_backend_fingerprint(backend):
+    digest = hashlib.sha256()
+    digest.update(repr((
+        backend.name, getattr(backend, 'backend_version', None), backend.num_qubits
+    )).encode())
+
+    target = backend.target
+    for name in sorted(target.operation_names):
+        properties = target[name]
+        entries = sorted(
+            (tuple(qargs) if qargs else (), getattr(props, 'error', None) if props else None)
+            for qargs, props in properties.items()
+        ) if properties else []
+        digest.update(repr((name, entries)).encode())
+
+    coupling_map = target.build_coupling_map()
+    if coupling_map is not None:
+        digest.update(repr(sorted(coupling_map.get_edges())).encode())
+    return digest.hexdigest()
+
+
+class TranspileCache:
+    """
+    Caches transpiled circuits in an in-memory LRU and, optionally, as QPY files on disk. Use
+    an instance wherever a transpiler is accepted, e.g. in the SimonSolver constructor, and
+    share it across solves.
+    """
+    def __init__(self, max_size=256, directory=None, transpile_options=None):
+        """
+        Parameters:
+            - max_size is the maximum number of transpiled circuits held in memory.
+            - directory is optional. If present, transpiled circuits are additionally stored as
+              QPY files in this directory, so they survive the process.
+            - transpile_options is a dict of keyword arguments passed on to qiskit's transpile.
+              Set seed_transpiler here if cached and freshly transpiled circuits should agree.
+        """
+        self._max_size = max_size
+        self._directory = directory
+        self._transpile_options = transpile_options or {}
+        self._circuits = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+
+    def __getstate__(self):
+        # Locks cannot be pickled, e.g. when the cache is sent to a worker process
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+    def _key(self, circuit, backend):
+        options = repr(sorted(self._transpile_options.items()))
+        key_material = ':'.join([
+            circuit_fingerprint(circuit), backend_fingerprint(backend), options
+        ])
+        return hashlib.sha256(key_material.encode()).hexdigest()
+
+
+    def _path(self, key):
+        return os.path.join(self._directory, f'{key}.qpy')
+
+
+    def _remember(self, key, transpiled_circuit):
+        self._circuits[key] = transpiled_circuit
+        self._circuits.move_to_end(key)
+        while len(self._circuits) > self._max_size:
+            self._circuits.popitem(last=False)
+
+
+    def _load_from_disk(self, key):
+        if self._directory is None or not os.path.exists(self._path(key)):
+            return None
+        with open(self._path(key), 'rb') as file:
+            return qpy.load(file)[0]
+
+
+    def _store_on_disk(self, key, transpiled_circuit):
+        if self._directory is None:
+            return
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'wb') as file:
+            qpy.dump(transpiled_circuit, file)
+        os.replace(temporary_path, self._path(key))
+
+
+    def transpile(self, circuit, backend):
+        """
+        Parameters:
+            - circuit is the quantum circuit we want to transpile.
+            - backend is the backend we want to transpile circuit for.
+        Returns a copy of the cached transpiled circuit if there is one and transpiles circuit
+        otherwise.
+        """
+        key = self._key(circuit, backend)
+        with self._lock:
+            transpiled_circuit = self._circuits.get(key)
+            if transpiled_circuit is None:
+                transpiled_circuit = self._load_from_disk(key)
+            if transpiled_circuit is not None:
+                self.hits += 1
+                self._remember(key, transpiled_circuit)
+                log.debug('Transpile cache hit for circuit %s', key)
+                return transpiled_circuit.copy()
+            self.misses += 1
+
+        transpiled_circuit = transpile(circuit, backend, **self._transpile_options)
+        with self._lock:
+            self._remember(key, transpiled_circuit)
+            self._store_on_disk(key, transpiled_circuit)
+        return transpiled_circuit.copy()
+
+
+def register_structure(circuit):
+    """
+    Parameters:
+        - circuit is a quantum circuit.
+    Returns the names and sizes of the quantum and classical registers of circuit. All circuits 
+    generated by a SimonCircuit instance share the same register structure.
+    """
+    return (
+        tuple((r.name, r.size) for r in circuit.qregs),
+        tuple((r.name, r.size) for r in circuit.cregs)
+    )
+
+
+def get_initial_layout(transpiled_circuit, virtual_qubit_count):
+    """
+    Parameters:
+        - transpiled_circuit is a circuit returned by a pass manager.
+        - virtual_qubit_count is the number of qubits of the circuit before transpilation.
+    Returns a list holding the physical qubit for each virtual qubit of the original circuit or 
+    None if the pass manager did not lay out the circuit (e.g. for simulators without coupling 
+    map).
+    """
+    layout = transpiled_circuit.layout
+    if layout is None or layout.initial_layout is None:
+        return None
+    physical_qubit_by_index = dict(
+        (layout.input_qubit_mapping[virtual_qubit], physical_qubit)
+        for virtual_qubit, physical_qubit in layout.initial_layout.get_virtual_bits().items()
+        if virtual_qubit in layout.input_qubit_mapping
+    )
+    return [physical_qubit_by_index[index] for index in range(virtual_qubit_count)]
+
+
+class SimonTranspiler:
+    """
+    A transpiler tailored to the circuits of one solve. The solver's circuits all share the same
+    register structure and only differ in the index phase shift and the blocking clauses. Hence,
+    the first circuit for a backend goes through the full layout search and its layout gets 
+    pinned via a fixed initial layout for all later circuits, which only get routed. The 
+    scheduling stage is skipped, since the circuits contain no delays. Use an instance wherever 
+    a transpiler is accepted, e.g. in the SimonSolver constructor.
+    """
+    def __init__(self, optimization_level=1, seed_transpiler=None):
+        """
+        Parameters:
+            - optimization_level is the optimization level of the preset pass managers.
+            - seed_transpiler is passed on to the preset pass managers.
+        """
+        self._optimization_level = optimization_level
+        self._seed_transpiler = seed_transpiler
+        self._pass_managers = {}
+        self._lock = threading.Lock()
+
+
+    def __getstate__(self):
+        # Pass managers cannot be pickled, so a copy sent to a worker process keeps the 
+        # pinned layouts and rebuilds its pass managers from them
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_pass_managers'] = dict(
+            (key, (backend, initial_layout))
+            for key, (backend, initial_layout, _) in self._pass_managers.items()
+        )
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._pass_managers = dict(
+            (key, (backend, initial_layout, self._generate_pass_manager(backend, initial_layout)))
+            for key, (backend, initial_layout) in state['_pass_managers'].items()
+        )
+
+
+    def _generate_pass_manager(self, backend, initial_layout=None):
+        pass_manager = generate_preset_pass_manager(
+            self._optimization_level,
+            backend=backend,
+            initial_layout=initial_layout,
+            seed_transpiler=self._seed_transpiler
+        )
+        pass_manager.scheduling = None
+        return pass_manager
+
+
+    def transpile(self, circuit, backend):
+        """
+        Parameters:
+            - circuit is the quantum circuit we want to transpile.
+            - backend is the backend we want to transpile circuit for.
+        Transpiles circuit with the pinned layout for its register structure and backend. If
+        there is no pinned layout yet, the layout of this circuit gets pinned.
+        """
+        key = (backend_fingerprint(backend), register_structure(circuit))
+        with self._lock:
+            pinned = self._pass_managers.get(key)
+        if pinned is not None:
+            return pinned[2].run(circuit)
+
+        transpiled_circuit = self._generate_pass_manager(backend).run(circuit)
+        initial_layout = get_initial_layout(transpiled_circuit, circuit.num_qubits)
+        log.info('Pinning layout %s for backend %s', initial_layout, backend.name)
+        with self._lock:
+            self._pass_managers[key] = (backend, initial_layout, self._generate_pass_manager(
+                backend, initial_layout=initial_layout
+            ))
+        return transpiled_circuit
@@ -0,0 +1,88 @@
+import unittest
+
+from qiskit import QuantumRegister, QuantumCircuit
+from qiskit_aer import AerSimulator
+from qiskit_aer.noise import NoiseModel, depolarizing_error
+
+from utils import create_simulator_sampler
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.circuit import run_circuit_and_measure_registers
+from simonalg.utils.grouptheory import expand_group
+from simonalg.utils.shots import AdaptiveShotPolicy
+
+
+def create_noisy_simulator(error_probability=0.001):
+    noise_model = NoiseModel()
+    noise_model.add_all_qubit_quantum_error(depolarizing_error(error_probability, 1), ['h', 'x'])
+    return AerSimulator(noise_model=noise_model, seed_simulator=7)
+
+
+class AdaptiveShotsTest(unittest.TestCase):
+    def run_single_qubit_circuit(self, apply_gate, shot_policy, backend):
+        register = QuantumRegister(1, 'q')
+        circuit = QuantumCircuit(register)
+        apply_gate(circuit, register[0])
+        return run_circuit_and_measure_registers(
+            circuit, [register], backend=backend, shot_policy=shot_policy
+        )
+
+
+    def test_sequential_test_accepts_clear_modes_only(self):
+        shot_policy = AdaptiveShotPolicy()
+        backend = create_noisy_simulator()
+        self.assertTrue(shot_policy.is_conclusive({'01': 16}, backend))
+        self.assertTrue(shot_policy.is_conclusive({'01': 30, '10': 2}, backend))
+        self.assertFalse(shot_policy.is_conclusive({'01': 8, '10': 8}, backend))
+        self.assertFalse(shot_policy.is_conclusive({'01': 4}, backend))
+        self.assertTrue(shot_policy.is_conclusive({'01': 1}, AerSimulator()))
+
+
+    def test_shots_grow_geometrically_up_to_the_cap(self):
+        shot_policy = AdaptiveShotPolicy(initial_shots=16, max_shots=100)
+        self.assertEqual(shot_policy.get_additional_shots(16), 16)
+        self.assertEqual(shot_policy.get_additional_shots(64), 36)
+        self.assertEqual(shot_policy.get_additional_shots(100), 0)
+        with self.assertRaises(ValueError):
+            AdaptiveShotPolicy(alternative_probability=0.5)
+
+
+    def test_nearly_deterministic_circuit_stops_early(self):
+        shot_policy = AdaptiveShotPolicy(initial_shots=16, max_shots=256)
+        counts = self.run_single_qubit_circuit(
+            lambda c, q: c.x(q), shot_policy, create_noisy_simulator()
+        )
+        self.assertEqual(sum(counts.values()), 16)
+
+
+    def test_ambiguous_circuit_runs_up_to_the_cap(self):
+        shot_policy = AdaptiveShotPolicy(initial_shots=16, max_shots=256)
+        counts = self.run_single_qubit_circuit(
+            lambda c, q: c.h(q), shot_policy, create_noisy_simulator()
+        )
+        self.assertEqual(sum(counts.values()), 256)
+
+
+    def test_ideal_simulator_runs_single_shot(self):
+        counts = self.run_single_qubit_circuit(
+            lambda c, q: c.h(q), AdaptiveShotPolicy(), AerSimulator()
+        )
+        self.assertEqual(sum(counts.values()), 1)
+
+
+    def test_solver_with_adaptive_shots(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        samplers_and_backends = [
+            (create_simulator_sampler(), None), (None, create_noisy_simulator())
+        ]
+        for sampler, backend in samplers_and_backends:
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                sampler=sampler,
+                backend=backend,
+                shot_policy=AdaptiveShotPolicy(),
+                integer_counts=True
+            )
+            recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+            self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
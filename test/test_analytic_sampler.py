@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit_aer import AerSimulator
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.analytic_sampler import AnalyticSampler, AnalyticSimonCircuit
+from simonalg.utils.analytic_sampler import PassThroughTranspiler, get_nullspace_mod_2
+from simonalg.utils.circuit import run_circuit_and_measure_registers
+from simonalg.utils.circuit import run_circuits_with_exact_probabilities
+from simonalg.utils.grouptheory import expand_group
+
+
+class AnalyticSamplerTest(unittest.TestCase):
+    def assert_distribution_matches_simulation(self, simon_circuit, circuit):
+        input_register = simon_circuit.circuit_wrapper.input_register
+        expected_probabilities = run_circuits_with_exact_probabilities(
+            [circuit.copy()], [input_register], backend=AerSimulator()
+        )[0]
+        probabilities = AnalyticSampler().get_distribution(circuit).probabilities()
+        self.assertSetEqual(set(expected_probabilities), set(probabilities))
+        for element, probability in expected_probabilities.items():
+            self.assertAlmostEqual(probabilities[element], probability)
+
+
+    def test_distributions_match_simulation(self):
+        simon_circuit = SimonCircuit(DefaultOracle(['0000', '0011', '1100', '1111']))
+        circuits = [
+            simon_circuit.generate_standard_simon_circuit(),
+            simon_circuit.generate_remove_zero_circuit([], 0),
+            simon_circuit.generate_remove_zero_circuit([('0011', 0)], 1),
+            simon_circuit.generate_remove_zero_circuit([('0011', 0)], 2),
+            simon_circuit.generate_multi_index_remove_zero_circuit([], {0, 1, 2, 3}),
+            simon_circuit.generate_multi_index_remove_zero_circuit(
+                [('0011', 0)], {2, 3}, good_state_probability=0.75
+            )
+        ]
+        for circuit in circuits:
+            self.assert_distribution_matches_simulation(simon_circuit, circuit)
+
+
+    def test_samples_stay_in_support(self):
+        simon_circuit = SimonCircuit(DefaultOracle(['000', '011']))
+        circuit = simon_circuit.generate_remove_zero_circuit([('100', 2)], 1)
+        counts = run_circuit_and_measure_registers(
+            circuit, [simon_circuit.circuit_wrapper.input_register], sampler=AnalyticSampler(seed=1)
+        )
+        self.assertDictEqual(counts, {'011': 1024})
+
+
+    def test_solve_simulated_circuits(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        solver = SimonSolver(SimonCircuit(DefaultOracle(hidden_subgroup)), AnalyticSampler(seed=2))
+        self.assertListEqual(hidden_subgroup, expand_group(solver.solve(), 3))
+
+
+    def test_solve_at_scale(self):
+        n = 64
+        basis_of_hidden_subgroup = ['1' * n, '0' * (n - 2) + '11']
+        hidden_subgroup = expand_group(basis_of_hidden_subgroup, n)
+        solver = SimonSolver(
+            AnalyticSimonCircuit(DefaultOracle(hidden_subgroup)),
+            AnalyticSampler(default_shots=64, seed=3),
+            transpiler=PassThroughTranspiler(),
+            integer_counts=True
+        )
+        self.assertListEqual(sorted(hidden_subgroup), sorted(expand_group(solver.solve(), n)))
+
+
+    def test_unknown_circuits_are_rejected(self):
+        circuit = QuantumCircuit(1, 1)
+        circuit.measure(0, 0)
+        with self.assertRaises(ValueError):
+            AnalyticSampler().run([circuit]).result()
+
+
+    def test_nullspace_mod_2(self):
+        matrix = np.array([[1, 1, 0, 0], [0, 1, 1, 0]], dtype=np.uint8)
+        nullspace = get_nullspace_mod_2(matrix, 4)
+        self.assertEqual(len(nullspace), 2)
+        self.assertFalse((matrix.astype(np.int64) @ nullspace.T % 2).any())
@@ -0,0 +1,72 @@
+import unittest
+
+from qiskit import QuantumRegister, AncillaRegister, QuantumCircuit
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2
+
+from utils import run_circuit_on_simulator
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.circuit import optimized_mcx, replace_ancilla_reset_markers
+from simonalg.utils.grouptheory import generate_group_by_order, expand_group
+
+
+class AncillaPoolTest(unittest.TestCase):
+    def test_pooled_mcx_with_five_inputs(self):
+        for bitstring in generate_group_by_order(5):
+            input_register = QuantumRegister(5, 'in')
+            ancilla_register = AncillaRegister(2, 'anc')
+            output_register = QuantumRegister(2, 'out')
+            circuit = QuantumCircuit(input_register, ancilla_register, output_register)
+            circuit.initialize(bitstring, input_register)
+
+            optimized_mcx(circuit, input_register, ancilla_register, output_register)
+
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register, output_register]
+            )
+            self.assertIs(len(result), 1)
+            state_in, state_an, state_out = list(result.keys())[0].split(' ')
+            self.assertEqual(state_in, bitstring)
+            self.assertEqual(state_an, '00')
+            self.assertEqual(state_out, '11' if bitstring == '11111' else '00')
+
+
+    def test_pool_reduces_circuit_width(self):
+        hidden_subgroup = ['000', '001']
+        full_circuit = SimonCircuit(DefaultOracle(hidden_subgroup))
+        pooled_circuit = SimonCircuit(DefaultOracle(hidden_subgroup), ancilla_pool_size=2)
+
+        full_width = full_circuit.generate_remove_zero_circuit([], 0).num_qubits
+        pooled = pooled_circuit.generate_remove_zero_circuit([], 0)
+        self.assertLess(pooled.num_qubits, full_width)
+
+        operation_names = replace_ancilla_reset_markers(pooled).count_ops()
+        self.assertIn('reset', operation_names)
+
+
+    def test_pool_must_hold_two_qubits(self):
+        with self.assertRaises(ValueError):
+            SimonCircuit(DefaultOracle(['000', '001']), ancilla_pool_size=1)
+
+
+    def test_pool_must_hold_custom_ancillas(self):
+        with self.assertRaises(ValueError):
+            SimonCircuit(
+                DefaultOracle(['000', '001']), custom_ancilla_register_size=4, ancilla_pool_size=3
+            )
+        simon_circuit = SimonCircuit(
+            DefaultOracle(['000', '001']), custom_ancilla_register_size=3, ancilla_pool_size=3
+        )
+        self.assertEqual(len(simon_circuit.circuit_wrapper.ancilla_register), 3)
+
+
+    def test_solver_with_ancilla_pool(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        solver = SimonSolver(
+            SimonCircuit(DefaultOracle(hidden_subgroup), ancilla_pool_size=2),
+            SamplerV2(AerSimulator())
+        )
+        recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+        self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import unittest
+
+from qiskit import transpile
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2
+
+from simonalg.async_solver import AsyncSimonSolver
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import RetryPolicy
+from simonalg.utils.grouptheory import expand_group
+
+
+class PreparationRecordingTranspiler:
+    """
+    Transpiles like qiskit and records how many circuits were prepared.
+    """
+    def __init__(self):
+        self.transpiled_count = 0
+        self.second_circuit_prepared = threading.Event()
+
+
+    def transpile(self, circuit, backend):
+        transpiled_circuit = transpile(circuit, backend)
+        self.transpiled_count += 1
+        if self.transpiled_count == 2:
+            self.second_circuit_prepared.set()
+        return transpiled_circuit
+
+
+class GatedJob:
+    """
+    Wraps a job, which only reports to be done once gate is set. To keep a broken test from
+    hanging, it gives up on gate after max_polls status checks and records that.
+    """
+    def __init__(self, job, gate, max_polls=1000):
+        self._job = job
+        self._gate = gate
+        self._remaining_polls = max_polls
+        self.gate_set_while_running = False
+
+
+    def done(self):
+        if self._gate.is_set():
+            self.gate_set_while_running = True
+            return self._job.done()
+        self._remaining_polls -= 1
+        return self._remaining_polls <= 0 and self._job.done()
+
+
+    def __getattr__(self, name):
+        return getattr(self._job, name)
+
+
+class GatedSampler:
+    """
+    Wraps a sampler, whose first job only reports to be done once gate is set.
+    """
+    def __init__(self, sampler, gate):
+        self._sampler = sampler
+        self._gate = gate
+        self.first_job = None
+
+
+    def run(self, pubs, shots=None):
+        job = self._sampler.run(pubs, shots=shots)
+        if self.first_job is None:
+            self.first_job = GatedJob(job, self._gate)
+            return self.first_job
+        return job
+
+
+    def __getattr__(self, name):
+        return getattr(self._sampler, name)
+
+
+class AsyncSimonSolverTest(unittest.TestCase):
+    def run_async_solver_and_assert_success(self, hidden_subgroup, **solver_options):
+        if 'backend' not in solver_options and 'sampler' not in solver_options:
+            solver_options['sampler'] = SamplerV2(AerSimulator())
+        solver = AsyncSimonSolver(
+            SimonCircuit(DefaultOracle(hidden_subgroup)), poll_interval=0.01, **solver_options
+        )
+        recovered_hidden_subgroup = expand_group(
+            asyncio.run(solver.solve()), len(hidden_subgroup[0])
+        )
+        self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
+
+
+    def test_async_solver_with_sampler_1(self):
+        self.run_async_solver_and_assert_success(['000', '001', '110', '111'])
+
+
+    def test_async_solver_with_sampler_2(self):
+        self.run_async_solver_and_assert_success(['000', '010', '100', '110'])
+
+
+    def test_async_solver_with_backend(self):
+        self.run_async_solver_and_assert_success(['000', '001'], backend=AerSimulator())
+
+
+    def test_async_solvers_run_concurrently(self):
+        hidden_subgroups = [['00', '01'], ['000', '011']]
+        solvers = [
+            AsyncSimonSolver(
+                SimonCircuit(DefaultOracle(h)), sampler=SamplerV2(AerSimulator()),
+                poll_interval=0.01
+            ) for h in hidden_subgroups
+        ]
+
+        async def solve_all():
+            return await asyncio.gather(*[solver.solve() for solver in solvers])
+
+        for basis, hidden_subgroup in zip(asyncio.run(solve_all()), hidden_subgroups):
+            self.assertListEqual(hidden_subgroup, expand_group(basis, len(hidden_subgroup[0])))
+
+
+    def test_next_circuit_is_prepared_while_job_runs(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        transpiler = PreparationRecordingTranspiler()
+        # The first job only finishes once the circuit of the next working index is prepared, 
+        # so the solve would never finish without overlap
+        sampler = GatedSampler(SamplerV2(AerSimulator()), transpiler.second_circuit_prepared)
+        self.run_async_solver_and_assert_success(
+            hidden_subgroup, sampler=sampler, transpiler=transpiler
+        )
+        self.assertTrue(sampler.first_job.gate_set_while_running)
+
+
+    def test_unsupported_solver_options_are_rejected(self):
+        simon_circuit = SimonCircuit(DefaultOracle(['00', '01']))
+        with self.assertRaises(ValueError):
+            AsyncSimonSolver(
+                simon_circuit, sampler=SamplerV2(AerSimulator()), retry_policy=RetryPolicy()
+            )
+        with self.assertRaises(TypeError):
+            AsyncSimonSolver(simon_circuit, sampler=SamplerV2(AerSimulator()), retries=2)
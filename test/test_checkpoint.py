@@ -0,0 +1,176 @@
+import os
+import tempfile
+import unittest
+
+from utils import create_simulator_sampler
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.checkpoint import SolverState, load_solver_state, save_solver_state
+from simonalg.utils.grouptheory import expand_group
+
+
+HIDDEN_SUBGROUP = ['000', '001']
+
+# A fixed seed makes every solve take the same path, so that job counts can be compared.
+SEEDED_SIMULATOR_OPTIONS = {'seed_simulator': 7}
+
+
+class Preempted(Exception):
+    pass
+
+
+class PreemptedJob:
+    def __init__(self, job):
+        self._job = job
+
+
+    def job_id(self):
+        return self._job.job_id()
+
+
+    def result(self):
+        raise Preempted()
+
+
+class PreemptibleSampler:
+    """
+    Wraps a sampler. The job with index preempted_job_index is submitted, but waiting for its
+    result fails as if the worker got preempted.
+    """
+    def __init__(self, sampler, preempted_job_index=None):
+        self._sampler = sampler
+        self._preempted_job_index = preempted_job_index
+        self.jobs = {}
+
+
+    def backend(self):
+        return self._sampler.backend()
+
+
+    @property
+    def options(self):
+        return self._sampler.options
+
+
+    def run(self, pubs, shots=None):
+        job = self._sampler.run(pubs, shots=shots)
+        self.jobs[job.job_id()] = job
+        if len(self.jobs) - 1 == self._preempted_job_index:
+            return PreemptedJob(job)
+        return job
+
+
+class CheckpointTest(unittest.TestCase):
+    def create_solver(self, sampler, checkpoint_path=None, job_retriever=None):
+        return SimonSolver(
+            SimonCircuit(DefaultOracle(HIDDEN_SUBGROUP)),
+            sampler,
+            checkpoint_path=checkpoint_path,
+            job_retriever=job_retriever
+        )
+
+
+    def assert_solves_hidden_subgroup(self, basis):
+        self.assertListEqual(HIDDEN_SUBGROUP, expand_group(basis, len(HIDDEN_SUBGROUP[0])))
+
+
+    def preempt_solve(self, path):
+        sampler = PreemptibleSampler(
+            create_simulator_sampler(SEEDED_SIMULATOR_OPTIONS), preempted_job_index=1
+        )
+        with self.assertRaises(Preempted):
+            self.create_solver(sampler, checkpoint_path=path).solve()
+        return sampler
+
+
+    def count_jobs_of_uninterrupted_solve(self):
+        sampler = PreemptibleSampler(create_simulator_sampler(SEEDED_SIMULATOR_OPTIONS))
+        self.create_solver(sampler).solve()
+        return len(sampler.jobs)
+
+
+    def test_state_round_trip(self):
+        state = SolverState(3, y=[('110', 2)], blocked_indices={0, 2}, iteration=2,
+                            pending_job_ids=['job-1'],
+                            pending_circuits=[{'fingerprint': 'abc', 'working_indices': [1]}])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'state.json')
+            save_solver_state(state, path)
+            loaded_state = load_solver_state(path)
+            self.assertListEqual(os.listdir(directory), ['state.json'])
+        self.assertEqual(loaded_state.n, 3)
+        self.assertListEqual(loaded_state.y, [('110', 2)])
+        self.assertSetEqual(loaded_state.blocked_indices, {0, 2})
+        self.assertEqual(loaded_state.iteration, 2)
+        self.assertListEqual(loaded_state.pending_job_ids, ['job-1'])
+        self.assertListEqual(
+            loaded_state.pending_circuits, [{'fingerprint': 'abc', 'working_indices': [1]}]
+        )
+
+
+    def test_checkpoint_after_completed_solve(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'state.json')
+            basis = self.create_solver(create_simulator_sampler(), checkpoint_path=path).solve()
+            state = load_solver_state(path)
+        self.assert_solves_hidden_subgroup(basis)
+        self.assertEqual(len(state.y), 2)
+        self.assertSetEqual(state.blocked_indices, {0, 1, 2})
+        self.assertListEqual(state.pending_job_ids, [])
+
+
+    def test_resume_after_preemption(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'state.json')
+            sampler = self.preempt_solve(path)
+            state = load_solver_state(path)
+            self.assertListEqual(state.pending_job_ids, list(sampler.jobs)[1:])
+
+            resumed_sampler = PreemptibleSampler(create_simulator_sampler(SEEDED_SIMULATOR_OPTIONS))
+            basis = self.create_solver(resumed_sampler).resume(path)
+        self.assert_solves_hidden_subgroup(basis)
+        # Only the first job is not run again
+        self.assertEqual(len(resumed_sampler.jobs), self.count_jobs_of_uninterrupted_solve() - 1)
+
+
+    def test_resume_reuses_pending_job(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'state.json')
+            sampler = self.preempt_solve(path)
+            resumed_sampler = PreemptibleSampler(create_simulator_sampler(SEEDED_SIMULATOR_OPTIONS))
+            solver = self.create_solver(
+                resumed_sampler, checkpoint_path=path, job_retriever=sampler.jobs.get
+            )
+            basis = solver.resume()
+        self.assert_solves_hidden_subgroup(basis)
+        self.assertEqual(len(resumed_sampler.jobs), self.count_jobs_of_uninterrupted_solve() - 2)
+
+
+    def test_resume_does_not_reuse_job_of_other_circuits(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'state.json')
+            sampler = self.preempt_solve(path)
+            # As if the pending job ran the circuit of another working index
+            state = load_solver_state(path)
+            self.assertEqual(len(state.pending_circuits), 1)
+            state.pending_circuits[0]['working_indices'] = [
+                (state.pending_circuits[0]['working_indices'][0] + 1) % 3
+            ]
+            save_solver_state(state, path)
+
+            resumed_sampler = PreemptibleSampler(create_simulator_sampler(SEEDED_SIMULATOR_OPTIONS))
+            solver = self.create_solver(
+                resumed_sampler, checkpoint_path=path, job_retriever=sampler.jobs.get
+            )
+            basis = solver.resume()
+        self.assert_solves_hidden_subgroup(basis)
+        self.assertEqual(len(resumed_sampler.jobs), self.count_jobs_of_uninterrupted_solve() - 1)
+
+
+    def test_resume_rejects_other_instance(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'state.json')
+            save_solver_state(SolverState(4), path)
+            with self.assertRaises(ValueError):
+                self.create_solver(create_simulator_sampler()).resume(path)
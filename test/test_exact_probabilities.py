@@ -0,0 +1,86 @@
+import unittest
+
+from qiskit import QuantumRegister, QuantumCircuit
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2
+from qiskit_ibm_runtime.fake_provider import FakeSherbrooke
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.circuit import run_circuits_with_exact_probabilities, is_ideal_simulator
+from simonalg.utils.grouptheory import expand_group, is_in_orthogonal_group
+
+
+class ExactProbabilitiesTest(unittest.TestCase):
+    def run_solver_and_assert_success(self, hidden_subgroup, **solver_options):
+        solver = SimonSolver(
+            SimonCircuit(DefaultOracle(hidden_subgroup)),
+            SamplerV2(AerSimulator()),
+            exact_ideal_simulation=True,
+            **solver_options
+        )
+        recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+        self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
+
+
+    def test_probabilities_are_formatted_like_counts(self):
+        first_register = QuantumRegister(2, 'first')
+        second_register = QuantumRegister(1, 'second')
+        circuit = QuantumCircuit(first_register, second_register)
+        circuit.x(first_register[0])
+        circuit.h(second_register[0])
+
+        probabilities = run_circuits_with_exact_probabilities(
+            [circuit], [first_register, second_register], backend=AerSimulator()
+        )[0]
+        self.assertListEqual(list(probabilities.keys()), ['01 0', '01 1'])
+        for probability in probabilities.values():
+            self.assertAlmostEqual(probability, 0.5)
+
+
+    def test_remove_zero_circuit_yields_exact_distribution(self):
+        hidden_subgroup = ['000', '001']
+        simon_circuit = SimonCircuit(DefaultOracle(hidden_subgroup))
+        input_register = simon_circuit.circuit_wrapper.input_register
+        circuit = simon_circuit.generate_remove_zero_circuit([], 1)
+
+        probabilities = run_circuits_with_exact_probabilities(
+            [circuit], [input_register], backend=AerSimulator()
+        )[0]
+        self.assertListEqual(list(probabilities.keys()), ['010', '110'])
+        self.assertAlmostEqual(sum(probabilities.values()), 1)
+        self.assertTrue(all(is_in_orthogonal_group(e, hidden_subgroup) for e in probabilities))
+
+
+    def test_noisy_simulator_is_not_ideal(self):
+        self.assertTrue(is_ideal_simulator(AerSimulator()))
+        self.assertFalse(is_ideal_simulator(AerSimulator.from_backend(FakeSherbrooke())))
+        with self.assertRaises(ValueError):
+            run_circuits_with_exact_probabilities(
+                [QuantumCircuit(1)], [], backend=AerSimulator.from_backend(FakeSherbrooke())
+            )
+
+
+    def test_solver_with_exact_probabilities_1(self):
+        self.run_solver_and_assert_success(['000', '001', '110', '111'])
+
+
+    def test_solver_with_exact_probabilities_2(self):
+        self.run_solver_and_assert_success(['000'])
+
+
+    def test_solver_with_exact_probabilities_and_multi_index_good_states(self):
+        self.run_solver_and_assert_success(['000', '001'], multi_index_good_states=True)
+
+
+    def test_solver_with_exact_probabilities_and_ancilla_pool(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        solver = SimonSolver(
+            SimonCircuit(DefaultOracle(hidden_subgroup), ancilla_pool_size=2),
+            backend=AerSimulator(),
+            exact_ideal_simulation=True,
+            batch_working_indices=True
+        )
+        recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+        self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
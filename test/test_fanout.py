@@ -0,0 +1,182 @@
+import threading
+import unittest
+
+from qiskit import QuantumRegister, QuantumCircuit
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.fanout import FanOutExecutor
+from simonalg.utils.grouptheory import expand_group
+
+
+class CancelRecordingJob:
+    """
+    Wraps a job and records whether it got cancelled.
+    """
+    def __init__(self, job):
+        self._job = job
+        self.cancel_called = threading.Event()
+
+
+    def cancel(self):
+        self.cancel_called.set()
+        return self._job.cancel()
+
+
+    def __getattr__(self, name):
+        return getattr(self._job, name)
+
+
+class GatedSimulator(AerSimulator):
+    """
+    An AerSimulator, whose run only submits the job once gate is set.
+    """
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.gate = threading.Event()
+        self.submitted_job = None
+        self.job_submitted = threading.Event()
+
+
+    def run(self, run_input, **options):
+        self.gate.wait()
+        self.submitted_job = CancelRecordingJob(super().run(run_input, **options))
+        self.job_submitted.set()
+        return self.submitted_job
+
+
+class NeverDoneJob(CancelRecordingJob):
+    """
+    Wraps a job, which reports to be running until release is set, like a local Aer job that
+    ignores cancel.
+    """
+    def __init__(self, job, release):
+        super().__init__(job)
+        self._release = release
+
+
+    def done(self):
+        return self._release.is_set() and self._job.done()
+
+
+class SlowSimulator(AerSimulator):
+    """
+    An AerSimulator, whose jobs only finish once release is set.
+    """
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.release = threading.Event()
+
+
+    def run(self, run_input, **options):
+        return NeverDoneJob(super().run(run_input, **options), self.release)
+
+
+def create_x_circuit():
+    register = QuantumRegister(2, 'q')
+    circuit = QuantumCircuit(register)
+    circuit.x(register[1])
+    return circuit, register
+
+
+class FanOutTest(unittest.TestCase):
+    def test_fastest_target_wins(self):
+        # The job on the gated simulator is only submitted once the batch is decided
+        gated_simulator = GatedSimulator()
+        # Never leave a worker thread blocked, even if an assertion fails
+        self.addCleanup(gated_simulator.gate.set)
+        fan_out_executor = FanOutExecutor([
+            {'backend': gated_simulator},
+            {'sampler': SamplerV2(AerSimulator())}
+        ])
+        circuit, register = create_x_circuit()
+        counts = fan_out_executor.run_circuits_and_measure_registers([circuit], [register])[0]
+        self.assertEqual(fan_out_executor.last_winner, 1)
+        self.assertDictEqual(counts, {'10': 1024})
+
+        # A job submitted after the batch was decided gets cancelled as well
+        gated_simulator.gate.set()
+        self.assertTrue(gated_simulator.job_submitted.wait(timeout=60))
+        self.assertTrue(gated_simulator.submitted_job.cancel_called.wait(timeout=60))
+        fan_out_executor.close()
+
+
+    def test_losing_jobs_do_not_block_later_calls(self):
+        slow_simulator = SlowSimulator()
+        self.addCleanup(slow_simulator.release.set)
+        fan_out_executor = FanOutExecutor(
+            [{'backend': slow_simulator}, {'backend': AerSimulator()}], poll_interval=0.01
+        )
+        self.addCleanup(fan_out_executor.close)
+        circuit, register = create_x_circuit()
+        results = []
+
+        def run_calls():
+            # Every call runs on both targets, so every call leaves a losing job behind, which
+            # would occupy a worker thread if it was waited for
+            for _ in range(3):
+                results.append(fan_out_executor.run_circuits_and_measure_registers(
+                    [circuit.copy()], [register]
+                )[0])
+
+        thread = threading.Thread(target=run_calls, daemon=True)
+        thread.start()
+        thread.join(timeout=60)
+        self.assertFalse(thread.is_alive())
+        self.assertListEqual(results, [{'10': 1024}] * 3)
+        self.assertEqual(fan_out_executor.last_winner, 1)
+
+
+    def test_invalid_and_failing_targets_are_skipped(self):
+        broken_backend = AerSimulator(method='stabilizer')
+        circuit, register = create_x_circuit()
+        circuit.t(register[0])
+        fan_out_executor = FanOutExecutor(
+            [{'backend': broken_backend}, {'backend': AerSimulator()}]
+        )
+        fan_out_executor.run_circuits_and_measure_registers([circuit.copy()], [register])
+        self.assertEqual(fan_out_executor.last_winner, 1)
+
+        rejecting_executor = FanOutExecutor(
+            [{'backend': AerSimulator()}], validator=lambda counts_per_circuit: False
+        )
+        with self.assertRaises(RuntimeError):
+            rejecting_executor.run_circuits_and_measure_registers([circuit.copy()], [register])
+        fan_out_executor.close()
+        rejecting_executor.close()
+
+
+    def test_quorum_and_subsets(self):
+        with self.assertRaises(ValueError):
+            FanOutExecutor([{'backend': AerSimulator()}], quorum=2)
+
+        fan_out_executor = FanOutExecutor(
+            [{'backend': AerSimulator()} for _ in range(3)], fan_out=2, quorum=2
+        )
+        circuit, register = create_x_circuit()
+        counts = fan_out_executor.run_circuits_and_measure_registers([circuit], [register])[0]
+        self.assertDictEqual(counts, {'10': 1024})
+        self.assertListEqual(fan_out_executor._select_targets(), [1, 2])
+        self.assertListEqual(fan_out_executor._select_targets(), [2, 0])
+        fan_out_executor.close()
+
+
+    def test_solver_with_fan_out(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        fan_out_executor = FanOutExecutor([
+            {'sampler': SamplerV2(AerSimulator())},
+            {'backend': AerSimulator(method='matrix_product_state')}
+        ])
+        for batch_working_indices in [False, True]:
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                fan_out_executor=fan_out_executor,
+                batch_working_indices=batch_working_indices,
+                exact_ideal_simulation=True
+            )
+            recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+            self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
+        fan_out_executor.close()
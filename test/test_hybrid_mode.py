@@ -0,0 +1,101 @@
+import unittest
+
+from qiskit_aer import AerSimulator
+from qiskit_aer.noise import NoiseModel, ReadoutError
+from qiskit_ibm_runtime import SamplerV2
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.analytic_sampler import AnalyticSampler, AnalyticSimonCircuit
+from simonalg.utils.analytic_sampler import PassThroughTranspiler
+from simonalg.utils.grouptheory import expand_group
+
+from utils import CircuitKindCountingSampler
+
+
+class HybridModeTest(unittest.TestCase):
+    def solve_analytically(self, hidden_subgroup, **solver_options):
+        sampler = CircuitKindCountingSampler(seed=5)
+        solver = SimonSolver(
+            AnalyticSimonCircuit(DefaultOracle(hidden_subgroup)),
+            sampler,
+            transpiler=PassThroughTranspiler(),
+            **solver_options
+        )
+        return solver.solve(), sampler.circuit_kinds
+
+
+    def test_hybrid_mode_replaces_remove_zero_circuits(self):
+        hidden_subgroup = expand_group(['11000000', '00110000'], 8)
+        basis, circuit_kinds = self.solve_analytically(hidden_subgroup)
+        hybrid_basis, hybrid_circuit_kinds = self.solve_analytically(
+            hidden_subgroup, standard_simon_shots=2048
+        )
+
+        self.assertListEqual(sorted(hidden_subgroup), sorted(expand_group(basis, 8)))
+        self.assertListEqual(sorted(hidden_subgroup), sorted(expand_group(hybrid_basis, 8)))
+        self.assertEqual(hybrid_circuit_kinds[0], 'standard')
+        self.assertEqual(hybrid_circuit_kinds.count('standard'), 1)
+        # The samples span H^perp, so the remaining circuits only confirm that nothing is missing
+        self.assertLess(len(hybrid_circuit_kinds), len(circuit_kinds))
+
+
+    def test_remove_zero_circuits_find_missing_dimensions(self):
+        hidden_subgroup = expand_group(['1000000', '0100000', '0011000'], 7)
+        hybrid_basis, circuit_kinds = self.solve_analytically(
+            hidden_subgroup, standard_simon_shots=2
+        )
+        self.assertListEqual(sorted(hidden_subgroup), sorted(expand_group(hybrid_basis, 7)))
+        self.assertIn('remove_zero', circuit_kinds)
+
+
+    def test_samples_become_blocking_clauses(self):
+        hidden_subgroup = expand_group(['1111', '0011'], 4)
+        solver = SimonSolver(
+            SimonCircuit(DefaultOracle(hidden_subgroup)),
+            AnalyticSampler(seed=6),
+            standard_simon_shots=64
+        )
+        y = []
+        blocked_indices = set()
+        solver.sample_with_standard_circuit(y, blocked_indices)
+
+        self.assertEqual(len(y), 2)
+        self.assertSetEqual(blocked_indices, set(j for _, j in y))
+        for k, (element, blocking_index) in enumerate(y):
+            self.assertEqual(element[3 - blocking_index], '1')
+            for _, earlier_blocking_index in y[:k]:
+                self.assertEqual(element[3 - earlier_blocking_index], '0')
+
+
+    def test_exact_probabilities_need_a_single_circuit(self):
+        hidden_subgroup = ['000', '011']
+        solver = SimonSolver(
+            SimonCircuit(DefaultOracle(hidden_subgroup)),
+            SamplerV2(AerSimulator()),
+            exact_ideal_simulation=True,
+            standard_simon_shots=1
+        )
+        self.assertListEqual(hidden_subgroup, expand_group(solver.solve(), 3))
+
+
+    def test_noisy_samples_do_not_enter_the_basis(self):
+        hidden_subgroup = ['000', '011']
+        noise_model = NoiseModel()
+        noise_model.add_all_qubit_readout_error(ReadoutError([[0.99, 0.01], [0.01, 0.99]]))
+        for seed in range(5):
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                SamplerV2(AerSimulator(noise_model=noise_model, seed_simulator=seed)),
+                standard_simon_shots=1000
+            )
+            y = []
+            blocked_indices = set()
+            solver.sample_with_standard_circuit(y, blocked_indices)
+            self.assertEqual(len(y), 2)
+            self.assertListEqual(hidden_subgroup, expand_group(solver.solve(), 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+
+from qiskit_aer import AerSimulator
+from qiskit_aer.noise import NoiseModel, ReadoutError
+from qiskit_ibm_runtime import SamplerV2
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.analytic_sampler import AnalyticSimonCircuit, PassThroughTranspiler
+from simonalg.utils.counts import IntegerCounts
+from simonalg.utils.grouptheory import expand_group
+from simonalg.utils.index_ordering import SampledOnesOrdering, StandardSimonHistogramOrdering
+from simonalg.utils.index_ordering import count_ones_per_index
+
+from utils import CircuitKindCountingSampler
+
+
+# H^perp is zero at the register indices 4 to 7
+HIDDEN_SUBGROUP = expand_group(['10000000', '01000000', '00100000', '00010000'], 8)
+
+
+class IndexOrderingTest(unittest.TestCase):
+    def solve_analytically(self, **solver_options):
+        sampler = CircuitKindCountingSampler(seed=8)
+        solver = SimonSolver(
+            AnalyticSimonCircuit(DefaultOracle(HIDDEN_SUBGROUP)),
+            sampler,
+            transpiler=PassThroughTranspiler(),
+            **solver_options
+        )
+        basis = solver.solve()
+        self.assertListEqual(sorted(HIDDEN_SUBGROUP), sorted(expand_group(basis, 8)))
+        return sampler.circuit_kinds
+
+
+    def test_histogram_ordering_skips_zero_indices(self):
+        circuit_kinds = self.solve_analytically()
+        ordered_circuit_kinds = self.solve_analytically(
+            # The AnalyticSampler is noiseless, but no ideal simulator, so skipping is opted in
+            index_ordering_policy=StandardSimonHistogramOrdering(shots=64, readout_error=0)
+        )
+        # One remove-zero circuit per basis element of H^perp and none yielding the zero vector
+        self.assertEqual(ordered_circuit_kinds.count('remove_zero'), 4)
+        self.assertEqual(ordered_circuit_kinds.count('standard'), 1)
+        self.assertGreater(circuit_kinds.count('remove_zero'), 4)
+
+
+    def test_histogram_ordering_needs_enough_shots(self):
+        policy = StandardSimonHistogramOrdering(shots=4, max_skip_error=1e-6)
+        policy.reset(3)
+        policy.observe_standard_simon_samples({'001': 3, '000': 1}, ideal=True)
+        self.assertListEqual(policy.order({0, 1, 2}), [0, 1, 2])
+
+        policy = StandardSimonHistogramOrdering(shots=32, max_skip_error=1e-6)
+        policy.reset(3)
+        policy.observe_standard_simon_samples({'001': 16, '000': 16}, ideal=True)
+        self.assertListEqual(policy.order({0, 1, 2}), [0])
+
+        # Samples of backends that are not known to be ideal are never used for skipping
+        policy.reset(3)
+        policy.observe_standard_simon_samples({'001': 16, '000': 16})
+        self.assertListEqual(policy.order({0, 1, 2}), [0, 1, 2])
+
+        policy = StandardSimonHistogramOrdering(shots=32, max_skip_error=1e-6, readout_error=0.5)
+        policy.reset(3)
+        policy.observe_standard_simon_samples({'001': 16, '000': 16})
+        self.assertListEqual(policy.order({0, 1, 2}), [0, 1, 2])
+
+        policy.reset(3)
+        policy.observe_standard_simon_samples({'001': 0.5, '000': 0.5}, exact=True)
+        self.assertListEqual(policy.order({0, 1, 2}), [0])
+
+
+    def test_noisy_sampler_does_not_skip_by_default(self):
+        # H^perp is zero at register index 2
+        hidden_subgroup = ['000', '100']
+        noise_model = NoiseModel()
+        noise_model.add_all_qubit_readout_error(ReadoutError([[0.99, 0.01], [0.05, 0.95]]))
+        samplers = [
+            SamplerV2(AerSimulator(noise_model=noise_model, seed_simulator=3)),
+            SamplerV2(AerSimulator(seed_simulator=3))
+        ]
+        skipped_index_counts = []
+        for sampler in samplers:
+            policy = StandardSimonHistogramOrdering(shots=64)
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                sampler,
+                index_ordering_policy=policy
+            )
+            solver.solve()
+            skipped_index_counts.append(3 - len(policy.order({0, 1, 2})))
+        self.assertListEqual(skipped_index_counts, [0, 1])
+
+
+    def test_sampled_ones_ordering(self):
+        policy = SampledOnesOrdering()
+        policy.reset(4)
+        self.assertListEqual(policy.order({0, 1, 2, 3}), [0, 1, 2, 3])
+        policy.observe_samples({'1100': 3, '0100': 2})
+        self.assertListEqual(policy.order({0, 1, 2, 3}), [2, 3, 0, 1])
+        self.solve_analytically(index_ordering_policy=SampledOnesOrdering())
+
+
+    def test_count_ones_per_index(self):
+        counts = {'110': 3, '011': 2}
+        expected_ones = [2, 5, 3]
+        self.assertListEqual(list(count_ones_per_index(counts, 3)), expected_ones)
+        self.assertListEqual(
+            list(count_ones_per_index(IntegerCounts.from_counts_dict(counts, 3), 3)),
+            expected_ones
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
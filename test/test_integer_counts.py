@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+from qiskit import QuantumRegister, QuantumCircuit
+from qiskit.primitives.containers import BitArray
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2
+
+from utils import create_simulator_sampler
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.circuit import run_circuit_and_measure_registers, split_counts_into_registers
+from simonalg.utils.counts import IntegerCounts
+from simonalg.utils.grouptheory import expand_group
+
+
+class IntegerCountsTest(unittest.TestCase):
+    def create_circuit(self):
+        first_register = QuantumRegister(2, 'first')
+        second_register = QuantumRegister(3, 'second')
+        circuit = QuantumCircuit(first_register, second_register)
+        circuit.x(first_register[1])
+        circuit.h(second_register[0])
+        circuit.h(second_register[2])
+        return circuit, [first_register, second_register]
+
+
+    def test_bit_array_decoding_matches_string_counts(self):
+        counts = {'0000000001': 3, '1000000011': 2, '0100000000': 5}
+        bit_array = BitArray.from_counts(counts, num_bits=10)
+        boundaries = [(0, 1), (1, 10)]
+
+        integer_counts = IntegerCounts.from_bit_array(bit_array, boundaries=boundaries)
+        self.assertDictEqual(
+            integer_counts.to_counts_dict(), split_counts_into_registers(counts, boundaries)
+        )
+        self.assertEqual(integer_counts.most_frequent_bitstring(), '0 100000000')
+        self.assertEqual(integer_counts.shots(), 10)
+
+        first_register_counts = integer_counts.register(0)
+        self.assertDictEqual(first_register_counts.to_counts_dict(), {'0': 8, '1': 2})
+        self.assertListEqual(integer_counts.with_any_bit_set([1]).outcomes, [0b1000000011])
+
+
+    def test_ties_are_broken_by_smallest_outcome(self):
+        integer_counts = IntegerCounts([1, 2, 3], np.array([4, 7, 7]), 2)
+        self.assertEqual(integer_counts.most_frequent_bitstring(), '10')
+
+
+    def test_sampler_and_backend_run_yield_same_registers(self):
+        circuit, registers = self.create_circuit()
+        sampler = SamplerV2(AerSimulator())
+        sampler.options.simulator.seed_simulator = 42
+        string_counts = run_circuit_and_measure_registers(
+            circuit.copy(), registers, sampler=sampler
+        )
+        integer_counts = run_circuit_and_measure_registers(
+            circuit.copy(), registers, sampler=sampler, as_integer_counts=True
+        )
+        self.assertDictEqual(integer_counts.to_counts_dict(), string_counts)
+
+        backend_counts = run_circuit_and_measure_registers(
+            circuit.copy(), registers, backend=AerSimulator(), as_integer_counts=True
+        )
+        self.assertSetEqual(
+            set(backend_counts.to_counts_dict()), {'10 000', '10 001', '10 100', '10 101'}
+        )
+
+
+    def test_solver_with_integer_counts(self):
+        for multi_index_good_states in [False, True]:
+            hidden_subgroup = ['000', '001', '110', '111']
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                create_simulator_sampler(),
+                integer_counts=True,
+                multi_index_good_states=multi_index_good_states
+            )
+            recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+            self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
@@ -0,0 +1,142 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from qiskit import QuantumRegister, QuantumCircuit
+from qiskit_aer import AerSimulator
+from qiskit_aer.noise import NoiseModel, ReadoutError
+from qiskit_ibm_runtime import SamplerV2
+
+from utils import create_simulator_sampler
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.batching import JobBatchingCoordinator, get_execution_key
+from simonalg.utils.batching import solve_concurrently
+from simonalg.utils.grouptheory import expand_group
+
+
+def create_basis_state_circuit(bitstring):
+    register = QuantumRegister(len(bitstring), 'q')
+    circuit = QuantumCircuit(register)
+    for index, bit in enumerate(reversed(bitstring)):
+        if bit == '1':
+            circuit.x(register[index])
+    return circuit, register
+
+
+class FailingSampler:
+    def __init__(self, backend):
+        self._backend = backend
+        self.run_count = 0
+
+
+    def backend(self):
+        return self._backend
+
+
+    def run(self, pubs, shots=None):
+        self.run_count += 1
+        raise RuntimeError('Device offline')
+
+
+class JobBatchingTest(unittest.TestCase):
+    def test_results_are_routed_back_to_their_callers(self):
+        coordinator = JobBatchingCoordinator(window=0.5)
+        backend = AerSimulator()
+        bitstrings = ['001', '010', '011', '100']
+
+        def run(bitstring):
+            circuit, register = create_basis_state_circuit(bitstring)
+            return coordinator.run_circuits_and_measure_registers(
+                [circuit], [register], backend=backend
+            )[0]
+
+        with ThreadPoolExecutor(max_workers=len(bitstrings)) as executor:
+            results = list(executor.map(run, bitstrings))
+        for bitstring, counts in zip(bitstrings, results):
+            self.assertDictEqual(counts, {bitstring: 1024})
+        self.assertEqual(coordinator.job_count, 1)
+        self.assertEqual(coordinator.circuit_count, 4)
+
+
+    def test_samplers_on_the_same_backend_share_jobs(self):
+        coordinator = JobBatchingCoordinator(window=60, max_batch_size=2)
+        backend = AerSimulator()
+        samplers = [SamplerV2(backend), SamplerV2(backend)]
+
+        def run(sampler):
+            circuit, register = create_basis_state_circuit('01')
+            return coordinator.run_circuits_and_measure_registers(
+                [circuit], [register], sampler=sampler
+            )[0]
+
+        with ThreadPoolExecutor(max_workers=len(samplers)) as executor:
+            results = list(executor.map(run, samplers))
+        self.assertListEqual(results, [{'01': 1024}, {'01': 1024}])
+        self.assertEqual(coordinator.job_count, 1)
+
+
+    def test_execution_key_distinguishes_options(self):
+        noise_models = [NoiseModel(), NoiseModel()]
+        for noise_model, error in zip(noise_models, [0.1, 0.2]):
+            noise_model.add_all_qubit_readout_error(
+                ReadoutError([[1 - error, error], [error, 1 - error]])
+            )
+        keys = [
+            get_execution_key(backend=AerSimulator()),
+            get_execution_key(backend=AerSimulator()),
+            get_execution_key(sampler=SamplerV2(AerSimulator())),
+            get_execution_key(backend=AerSimulator(), shots=100),
+            get_execution_key(backend=AerSimulator(noise_model=noise_models[0])),
+            get_execution_key(backend=AerSimulator(noise_model=noise_models[1]))
+        ]
+        self.assertEqual(keys[0], keys[1])
+        self.assertEqual(len(set(keys)), 5)
+
+
+    def test_full_batch_is_submitted_right_away(self):
+        coordinator = JobBatchingCoordinator(window=60, max_batch_size=2)
+        circuits_and_registers = [create_basis_state_circuit(b) for b in ['01', '10']]
+        counts = coordinator.run_circuits_and_measure_registers(
+            [c for c, _ in circuits_and_registers],
+            [circuits_and_registers[0][1]],
+            sampler=create_simulator_sampler()
+        )
+        self.assertListEqual([list(c.keys()) for c in counts], [['01'], ['10']])
+        self.assertEqual(coordinator.job_count, 1)
+
+
+    def test_errors_are_raised_for_every_caller(self):
+        coordinator = JobBatchingCoordinator(window=0.5)
+        sampler = FailingSampler(AerSimulator())
+
+        def run(bitstring):
+            circuit, register = create_basis_state_circuit(bitstring)
+            with self.assertRaisesRegex(RuntimeError, 'Device offline'):
+                coordinator.run_circuits_and_measure_registers(
+                    [circuit], [register], sampler=sampler
+                )
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(run, ['0', '1']))
+        self.assertEqual(sampler.run_count, 1)
+        self.assertEqual(coordinator.job_count, 0)
+
+
+    def test_concurrent_solves_share_jobs(self):
+        hidden_subgroups = [
+            ['000', '001'], ['000', '110'], ['000', '001', '110', '111'], ['000']
+        ]
+        coordinator = JobBatchingCoordinator(window=0.5)
+        sampler = create_simulator_sampler()
+        solvers = [
+            SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                sampler,
+                job_batching_coordinator=coordinator
+            ) for hidden_subgroup in hidden_subgroups
+        ]
+        bases = solve_concurrently(solvers)
+        for hidden_subgroup, basis in zip(hidden_subgroups, bases):
+            self.assertListEqual(hidden_subgroup, expand_group(basis, len(hidden_subgroup[0])))
+        self.assertLess(coordinator.job_count, coordinator.circuit_count)
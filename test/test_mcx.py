@@ -88,7 +88,9 @@ class CustomMCXTest(unittest.TestCase):
 
             mcx_halfchain(circuit, input_register, ancilla_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register], exact=False
+            )
             self.assert_correct_halfchain(result)
 
 
@@ -102,7 +104,9 @@ class CustomMCXTest(unittest.TestCase):
 
             mcx_halfchain(circuit, input_register, ancilla_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register], exact=False
+            )
             self.assert_correct_halfchain(result)
 
 
@@ -115,7 +119,9 @@ class CustomMCXTest(unittest.TestCase):
 
             mcx_halfchain(circuit, input_register, ancilla_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register], exact=False
+            )
             self.assert_correct_halfchain(result)
 
 
@@ -128,7 +134,9 @@ class CustomMCXTest(unittest.TestCase):
 
             mcx_halfchain(circuit, input_register, ancilla_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register], exact=False
+            )
             self.assert_correct_halfchain(result)
 
 
@@ -170,7 +178,9 @@ class CustomMCXTest(unittest.TestCase):
             mcx_halfchain(circuit, input_register, ancilla_register)
             reverse_mcx_halfchain(circuit, input_register, ancilla_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register], exact=False
+            )
             self.assert_correct_reverse_halfchain(result, bitstring)
 
 
@@ -184,7 +194,9 @@ class CustomMCXTest(unittest.TestCase):
             mcx_halfchain(circuit, input_register, ancilla_register)
             reverse_mcx_halfchain(circuit, input_register, ancilla_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register], exact=False
+            )
             self.assert_correct_reverse_halfchain(result, bitstring)
 
 
@@ -198,7 +210,9 @@ class CustomMCXTest(unittest.TestCase):
             mcx_halfchain(circuit, input_register, ancilla_register)
             reverse_mcx_halfchain(circuit, input_register, ancilla_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register], exact=False
+            )
             self.assert_correct_reverse_halfchain(result, bitstring)
 
 
@@ -212,7 +226,9 @@ class CustomMCXTest(unittest.TestCase):
             mcx_halfchain(circuit, input_register, ancilla_register)
             reverse_mcx_halfchain(circuit, input_register, ancilla_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register], exact=False
+            )
             self.assert_correct_reverse_halfchain(result, bitstring)
 
 
@@ -226,7 +242,9 @@ class CustomMCXTest(unittest.TestCase):
 
             optimized_mcx(circuit, input_register, ancilla_register, output_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register, output_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register, output_register], exact=False
+            )
 
             self.assert_correct_optimized_mcx(result, bitstring)
 
@@ -241,7 +259,9 @@ class CustomMCXTest(unittest.TestCase):
 
             optimized_mcx(circuit, input_register, ancilla_register, output_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register, output_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register, output_register], exact=False
+            )
 
             self.assert_correct_optimized_mcx(result, bitstring)
 
@@ -256,7 +276,9 @@ class CustomMCXTest(unittest.TestCase):
 
             optimized_mcx(circuit, input_register, ancilla_register, output_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register, output_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register, output_register], exact=False
+            )
 
             self.assert_correct_optimized_mcx(result, bitstring)
 
@@ -271,7 +293,9 @@ class CustomMCXTest(unittest.TestCase):
 
             optimized_mcx(circuit, input_register, ancilla_register, output_register)
 
-            result = run_circuit_on_simulator(circuit, [input_register, ancilla_register, output_register])
+            result = run_circuit_on_simulator(
+                circuit, [input_register, ancilla_register, output_register], exact=False
+            )
 
             self.assert_correct_optimized_mcx(result, bitstring)
             
\ No newline at end of file
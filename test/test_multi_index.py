@@ -0,0 +1,80 @@
+import math
+import unittest
+
+from qiskit_aer import AerSimulator
+from qiskit_aer.noise import NoiseModel, ReadoutError
+from qiskit_ibm_runtime import SamplerV2
+
+from utils import run_circuit_on_simulator
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit, exact_amplification_angle
+from simonalg.solver import SimonSolver
+from simonalg.utils.grouptheory import expand_group, is_in_orthogonal_group
+
+
+class MultiIndexTest(unittest.TestCase):
+    def run_multi_index_circuit(self, hidden_subgroup, indices, good_state_probability):
+        simon_circuit = SimonCircuit(DefaultOracle(hidden_subgroup))
+        input_register = simon_circuit.circuit_wrapper.input_register
+        circuit = simon_circuit.generate_multi_index_remove_zero_circuit(
+            [], indices, good_state_probability=good_state_probability
+        )
+        return list(run_circuit_on_simulator(circuit, [input_register]).keys())
+
+
+    def run_solver_and_assert_success(self, hidden_subgroup):
+        solver = SimonSolver(
+            SimonCircuit(DefaultOracle(hidden_subgroup)),
+            SamplerV2(AerSimulator()),
+            multi_index_good_states=True
+        )
+        recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+        self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
+
+
+    def test_exact_amplification_angle(self):
+        self.assertAlmostEqual(exact_amplification_angle(0.5), math.pi / 2)
+        self.assertAlmostEqual(exact_amplification_angle(1), math.pi / 3)
+        with self.assertRaises(ValueError):
+            exact_amplification_angle(0.2)
+
+
+    def test_single_good_index_is_exact(self):
+        # Only index 2 can be 1 in the orthogonal subgroup {000, 100}
+        hidden_subgroup = ['000', '001', '010', '011']
+        measurements = self.run_multi_index_circuit(hidden_subgroup, [0, 1, 2], 0.5)
+        self.assertListEqual(measurements, ['100'])
+
+
+    def test_two_dimensional_projection_is_exact_with_matching_angle(self):
+        # The orthogonal subgroup {000, 010, 100, 110} has a 1 at index 1 or 2 with probability 3/4
+        hidden_subgroup = ['000', '001']
+        measurements = self.run_multi_index_circuit(hidden_subgroup, [1, 2], 0.75)
+        self.assertNotIn('000', measurements)
+        self.assertTrue(all(is_in_orthogonal_group(m, hidden_subgroup) for m in measurements))
+
+
+    def test_solver_with_multi_index_good_states_1(self):
+        self.run_solver_and_assert_success(['000', '001'])
+
+
+    def test_solver_with_multi_index_good_states_2(self):
+        self.run_solver_and_assert_success(['000', '001', '110', '111'])
+
+
+    def test_solver_with_multi_index_good_states_3(self):
+        self.run_solver_and_assert_success(['000'])
+
+
+    def test_noisy_good_states_are_not_accepted(self):
+        # In the last iteration no good state exists, so all good states stem from readout errors
+        hidden_subgroup = ['000', '001', '110', '111']
+        noise_model = NoiseModel()
+        noise_model.add_all_qubit_readout_error(ReadoutError([[0.99, 0.01], [0.01, 0.99]]))
+        for seed in range(5):
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                SamplerV2(AerSimulator(noise_model=noise_model, seed_simulator=seed)),
+                multi_index_good_states=True
+            )
+            self.assertListEqual(hidden_subgroup, expand_group(solver.solve(), 3))
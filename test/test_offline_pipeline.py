@@ -0,0 +1,138 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from qiskit import QuantumRegister, QuantumCircuit
+
+from utils import create_simulator_sampler
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.circuit import add_measurements_to_circuit
+from simonalg.utils.grouptheory import expand_group
+from simonalg.utils.offline import OfflinePipeline, PendingBatchException
+from simonalg.utils.offline import OFFLINE_CLASSICAL_REGISTER_NAME
+from simonalg.utils.offline import execute_pending_batches, get_pending_batches, write_batch
+from simonalg.utils.offline import read_batch
+
+
+PACKAGE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def solve_offline(solver, directory, sampler):
+    executed_batches = []
+    while True:
+        try:
+            return solver.solve(), executed_batches
+        except PendingBatchException:
+            executed_batches += execute_pending_batches(directory, sampler=sampler)
+
+
+class OfflinePipelineTest(unittest.TestCase):
+    def assert_offline_solve_succeeds(self, hidden_subgroup, circuit_format='qpy',
+                                      **solver_options):
+        sampler = create_simulator_sampler()
+        with tempfile.TemporaryDirectory() as directory:
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                offline_pipeline=OfflinePipeline(directory, circuit_format=circuit_format),
+                **solver_options
+            )
+            basis, executed_batches = solve_offline(solver, directory, sampler)
+        self.assertListEqual(hidden_subgroup, expand_group(basis, len(hidden_subgroup[0])))
+        self.assertGreater(len(executed_batches), 0)
+        return executed_batches
+
+
+    def test_solve_with_one_circuit_per_batch(self):
+        self.assert_offline_solve_succeeds(['000', '011'])
+
+
+    def test_solve_with_batched_working_indices(self):
+        executed_batches = self.assert_offline_solve_succeeds(
+            ['000', '001', '110', '111'], batch_working_indices=True
+        )
+        self.assertLessEqual(len(executed_batches), 3)
+
+
+    def test_pending_batch_is_written_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(['000', '011'])),
+                offline_pipeline=OfflinePipeline(directory)
+            )
+            batch_paths = []
+            for _ in range(2):
+                with self.assertRaises(PendingBatchException) as context:
+                    solver.solve()
+                batch_paths.append(context.exception.batch_path)
+            self.assertEqual(batch_paths[0], batch_paths[1])
+            self.assertListEqual(get_pending_batches(directory), batch_paths[:1])
+
+
+    def test_batches_are_executed_by_a_separate_process(self):
+        register = QuantumRegister(2, 'q')
+        circuit = QuantumCircuit(register)
+        circuit.x(register[0])
+        with tempfile.TemporaryDirectory() as directory:
+            pipeline = OfflinePipeline(directory)
+            with self.assertRaises(PendingBatchException):
+                pipeline.run_circuits_and_measure_registers([circuit.copy()], [register])
+
+            subprocess.run(
+                [sys.executable, '-m', 'simonalg.utils.offline', directory],
+                cwd=PACKAGE_DIRECTORY, check=True, capture_output=True
+            )
+            pipeline.reset()
+            counts = pipeline.run_circuits_and_measure_registers([circuit.copy()], [register])
+        self.assertDictEqual(counts[0], {'01': 1024})
+
+
+    def test_qasm3_batch_is_written_as_text(self):
+        register = QuantumRegister(1, 'q')
+        circuits = []
+        for _ in range(2):
+            circuit = QuantumCircuit(register)
+            circuit.h(register[0])
+            circuits.append(add_measurements_to_circuit(
+                circuit, [register], classical_register_name=OFFLINE_CLASSICAL_REGISTER_NAME
+            )[0])
+        with tempfile.TemporaryDirectory() as directory:
+            batch_path = os.path.join(directory, 'batch-0000.qasm')
+            write_batch(circuits, batch_path, circuit_format='qasm3')
+            with open(batch_path, encoding='utf-8') as file:
+                program = file.read()
+            self.assertEqual(program.count('OPENQASM 3.0;'), 2)
+            self.assertIn(f'bit[1] {OFFLINE_CLASSICAL_REGISTER_NAME};', program)
+            self.assertListEqual(get_pending_batches(directory), [batch_path])
+
+            read_circuits, _ = read_batch(batch_path)
+            self.assertEqual(len(read_circuits), 2)
+            self.assertListEqual([c.num_clbits for c in read_circuits], [1, 1])
+
+
+    def test_qasm3_batch_is_executed(self):
+        self.assert_offline_solve_succeeds(['000', '011'], circuit_format='qasm3')
+
+
+    def test_batch_of_other_circuits_is_rejected(self):
+        register = QuantumRegister(2, 'q')
+        circuits = [QuantumCircuit(register) for _ in range(2)]
+        circuits[0].x(register[0])
+        circuits[1].x(register[1])
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(PendingBatchException):
+                OfflinePipeline(directory).run_circuits_and_measure_registers(
+                    [circuits[0].copy()], [register]
+                )
+            execute_pending_batches(directory, sampler=create_simulator_sampler())
+            with self.assertRaises(ValueError):
+                OfflinePipeline(directory).run_circuits_and_measure_registers(
+                    [circuits[1].copy()], [register]
+                )
+            counts = OfflinePipeline(directory).run_circuits_and_measure_registers(
+                [circuits[0].copy()], [register]
+            )
+        self.assertDictEqual(counts[0], {'01': 1024})
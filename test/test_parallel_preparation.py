@@ -0,0 +1,108 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.circuit import build_and_transpile_circuits, transpile_circuits
+from simonalg.utils.circuit import remove_barriers_and_transpile_for_backend
+from simonalg.utils.circuit import PreparationExecutor, build_circuits
+from simonalg.utils.grouptheory import expand_group
+from simonalg.utils.transpilation import circuit_fingerprint, TranspileCache, SimonTranspiler
+
+
+class ParallelPreparationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(max_workers=2)
+
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+
+    def test_parallel_build_matches_serial_build(self):
+        simon_circuit = SimonCircuit(DefaultOracle(['000', '001']))
+        backend = AerSimulator()
+        build_tasks = [(simon_circuit.generate_remove_zero_circuit, ([], i)) for i in range(3)]
+
+        parallel = build_and_transpile_circuits(build_tasks, backend, executor=self.executor)
+        serial = [remove_barriers_and_transpile_for_backend(build_fn(*args), backend)
+                  for build_fn, args in build_tasks]
+        self.assertListEqual(
+            [circuit_fingerprint(c) for c in parallel], [circuit_fingerprint(c) for c in serial]
+        )
+
+
+    def test_small_batches_are_transpiled_serially(self):
+        simon_circuit = SimonCircuit(DefaultOracle(['00', '01']))
+        circuits = [simon_circuit.generate_standard_simon_circuit()]
+        transpiled = transpile_circuits(circuits, AerSimulator(), executor=self.executor)
+        self.assertEqual(len(transpiled), 1)
+
+
+    def test_solver_with_executor(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        solver = SimonSolver(
+            SimonCircuit(DefaultOracle(hidden_subgroup)),
+            SamplerV2(AerSimulator()),
+            batch_working_indices=True,
+            executor=self.executor
+        )
+        recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+        self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
+
+
+    def test_solver_with_executor_and_transpiler(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        for transpiler in [TranspileCache(), SimonTranspiler(seed_transpiler=1)]:
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                SamplerV2(AerSimulator()),
+                batch_working_indices=True,
+                executor=self.executor,
+                transpiler=transpiler
+            )
+            self.assertListEqual(hidden_subgroup, expand_group(solver.solve(), 3))
+
+
+    def test_parallel_build_matches_serial_build_without_transpiling(self):
+        simon_circuit = SimonCircuit(DefaultOracle(['000', '001']))
+        build_tasks = [(simon_circuit.generate_remove_zero_circuit, ([], i)) for i in range(3)]
+        parallel = build_circuits(build_tasks, executor=self.executor)
+        serial = [build_fn(*args) for build_fn, args in build_tasks]
+        self.assertListEqual(
+            [circuit_fingerprint(c) for c in parallel], [circuit_fingerprint(c) for c in serial]
+        )
+        self.assertListEqual([c.metadata for c in parallel], [c.metadata for c in serial])
+
+
+    def test_preparation_executor(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        sampler = SamplerV2(AerSimulator())
+        transpiler = TranspileCache()
+        backend = sampler.backend()
+        with PreparationExecutor(backend, transpiler=transpiler, max_workers=2) as executor:
+            simon_circuit = SimonCircuit(DefaultOracle(hidden_subgroup))
+            circuits = [simon_circuit.generate_remove_zero_circuit([], i) for i in range(3)]
+            parallel = transpile_circuits(
+                circuits, backend, executor=executor, transpiler=transpiler
+            )
+            serial = [remove_barriers_and_transpile_for_backend(c, backend) for c in circuits]
+            self.assertListEqual(
+                [circuit_fingerprint(c) for c in parallel],
+                [circuit_fingerprint(c) for c in serial]
+            )
+
+            solver = SimonSolver(
+                simon_circuit,
+                sampler,
+                batch_working_indices=True,
+                executor=executor,
+                transpiler=transpiler
+            )
+            self.assertListEqual(hidden_subgroup, expand_group(solver.solve(), 3))
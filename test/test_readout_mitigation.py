@@ -0,0 +1,86 @@
+import unittest
+from functools import reduce
+
+import numpy as np
+from qiskit import QuantumRegister, QuantumCircuit
+from qiskit_aer import AerSimulator
+from qiskit_aer.noise import NoiseModel, ReadoutError
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.circuit import run_circuit_and_measure_registers
+from simonalg.utils.grouptheory import expand_group
+from simonalg.utils.mitigation import ReadoutMitigator, apply_inverse_assignment_matrices
+
+
+def create_simulator_with_readout_errors(probability_of_0_given_1):
+    noise_model = NoiseModel()
+    noise_model.add_all_qubit_readout_error(ReadoutError([
+        [0.99, 0.01], [probability_of_0_given_1, 1 - probability_of_0_given_1]
+    ]))
+    return AerSimulator(noise_model=noise_model, seed_simulator=11)
+
+
+class ReadoutMitigationTest(unittest.TestCase):
+    def run_all_ones_circuit(self, backend, readout_mitigator=None):
+        register = QuantumRegister(3, 'q')
+        circuit = QuantumCircuit(register)
+        circuit.x(register)
+        return run_circuit_and_measure_registers(
+            circuit, [register], backend=backend, readout_mitigator=readout_mitigator
+        )
+
+
+    def test_inverse_assignment_matrices_undo_tensored_errors(self):
+        assignment_matrices = [
+            np.array([[0.9, 0.2], [0.1, 0.8]]),
+            np.array([[0.95, 0.3], [0.05, 0.7]])
+        ]
+        true_probabilities = np.array([0.1, 0.2, 0.3, 0.4])
+        # The matrix of the most significant bit comes first in the Kronecker product
+        full_assignment_matrix = reduce(np.kron, reversed(assignment_matrices))
+        measured_probabilities = full_assignment_matrix @ true_probabilities
+
+        corrected_probabilities = apply_inverse_assignment_matrices(
+            measured_probabilities, assignment_matrices
+        )
+        np.testing.assert_allclose(corrected_probabilities, true_probabilities)
+
+
+    def test_mitigation_recovers_most_frequent_element(self):
+        backend = create_simulator_with_readout_errors(0.6)
+        raw_counts = self.run_all_ones_circuit(backend)
+        self.assertEqual(max(raw_counts, key=raw_counts.get), '000')
+
+        mitigated_counts = self.run_all_ones_circuit(backend, ReadoutMitigator())
+        self.assertEqual(max(mitigated_counts, key=mitigated_counts.get), '111')
+        self.assertAlmostEqual(sum(mitigated_counts.values()), sum(raw_counts.values()))
+
+
+    def test_calibrations_are_cached_until_ttl(self):
+        backend = create_simulator_with_readout_errors(0.1)
+        readout_mitigator = ReadoutMitigator()
+        self.run_all_ones_circuit(backend, readout_mitigator)
+        self.run_all_ones_circuit(backend, readout_mitigator)
+        self.assertEqual(readout_mitigator.calibration_count, 1)
+
+        expiring_readout_mitigator = ReadoutMitigator(ttl=0)
+        self.run_all_ones_circuit(backend, expiring_readout_mitigator)
+        self.run_all_ones_circuit(backend, expiring_readout_mitigator)
+        self.assertEqual(expiring_readout_mitigator.calibration_count, 2)
+
+
+    def test_solver_with_readout_mitigation(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        readout_mitigator = ReadoutMitigator()
+        for integer_counts in [False, True]:
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                backend=create_simulator_with_readout_errors(0.05),
+                readout_mitigator=readout_mitigator,
+                integer_counts=integer_counts
+            )
+            recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+            self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
+        self.assertEqual(readout_mitigator.calibration_count, 1)
@@ -0,0 +1,77 @@
+import tempfile
+import unittest
+
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.circuit import run_circuit_and_measure_registers
+from simonalg.utils.grouptheory import expand_group
+from simonalg.utils.result_cache import ResultCache
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def run_standard_circuit(self, hidden_subgroup, result_cache, **execution_options):
+        simon_circuit = SimonCircuit(DefaultOracle(hidden_subgroup))
+        return run_circuit_and_measure_registers(
+            simon_circuit.generate_standard_simon_circuit(),
+            [simon_circuit.circuit_wrapper.input_register],
+            result_cache=result_cache,
+            **execution_options
+        )
+
+
+    def test_seeded_simulator_results_are_cached(self):
+        cache = ResultCache(self.directory.name)
+        sampler = SamplerV2(AerSimulator(seed_simulator=42))
+        first = self.run_standard_circuit(['000', '001'], cache, sampler=sampler)
+        second = self.run_standard_circuit(['000', '001'], cache, sampler=sampler)
+        self.assertDictEqual(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+    def test_unseeded_simulator_results_are_not_cached(self):
+        cache = ResultCache(self.directory.name)
+        self.run_standard_circuit(['000', '001'], cache, backend=AerSimulator())
+        self.run_standard_circuit(['000', '001'], cache, backend=AerSimulator())
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+
+    def test_seed_is_part_of_the_key(self):
+        cache = ResultCache(self.directory.name)
+        self.run_standard_circuit(['000', '001'], cache, backend=AerSimulator(seed_simulator=1))
+        self.run_standard_circuit(['000', '001'], cache, backend=AerSimulator(seed_simulator=2))
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+
+    def test_least_recently_used_results_are_evicted(self):
+        cache = ResultCache(self.directory.name, max_entries=1)
+        backend = AerSimulator(seed_simulator=7)
+        self.run_standard_circuit(['000', '001'], cache, backend=backend)
+        self.run_standard_circuit(['000', '010'], cache, backend=backend)
+        self.run_standard_circuit(['000', '001'], cache, backend=backend)
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+
+    def test_repeated_solve_is_served_from_cache(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        cache = ResultCache(self.directory.name)
+        for _ in range(2):
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                SamplerV2(AerSimulator(seed_simulator=11)),
+                result_cache=cache
+            )
+            recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+            self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
+        self.assertEqual(cache.hits, cache.misses)
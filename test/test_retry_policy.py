@@ -0,0 +1,78 @@
+import unittest
+
+from utils import create_simulator_sampler
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver, RetryPolicy
+from simonalg.utils.grouptheory import expand_group
+
+
+class FlakySimonSolver(SimonSolver):
+    """
+    Simulates a noisy backend by replacing the results of the given runs by a single element
+    with a 1 at every index, which is inconsistent as soon as an index is blocked.
+    """
+    def __init__(self, simon_circuit, flaky_runs, **solver_options):
+        super().__init__(simon_circuit, create_simulator_sampler(), **solver_options)
+        self.flaky_runs = flaky_runs
+        self.runs = 0
+        self.shots = []
+
+
+    def _run_circuit(self, circuit, input_register, shots=None):
+        quantum_result = super()._run_circuit(circuit, input_register, shots=shots)
+        self.runs += 1
+        self.shots.append(shots)
+        if self.runs in self.flaky_runs:
+            return {'1' * self._n: 2 * sum(quantum_result.values())}
+        return quantum_result
+
+
+class RetryPolicyTest(unittest.TestCase):
+    hidden_subgroup = ['000', '001', '110', '111']
+
+
+    def solve(self, flaky_runs, **solver_options):
+        solver = FlakySimonSolver(
+            SimonCircuit(DefaultOracle(self.hidden_subgroup)), flaky_runs, **solver_options
+        )
+        basis = solver.solve()
+        if basis is None:
+            return solver, None
+        return solver, expand_group(basis, len(self.hidden_subgroup[0]))
+
+
+    def test_inconsistent_run_aborts_without_retry_policy(self):
+        _, recovered_hidden_subgroup = self.solve({2})
+        self.assertIsNone(recovered_hidden_subgroup)
+
+
+    def test_inconsistent_run_is_retried_once(self):
+        solver, recovered_hidden_subgroup = self.solve({2}, retry_policy=RetryPolicy())
+        self.assertListEqual(self.hidden_subgroup, recovered_hidden_subgroup)
+        self.assertEqual(solver.shots.count(2048), 1)
+
+
+    def test_inconsistent_samples_are_discarded(self):
+        solver = FlakySimonSolver(
+            SimonCircuit(DefaultOracle(self.hidden_subgroup)), set(), retry_policy=RetryPolicy()
+        )
+        consistent_result = solver._retry_until_consistent(
+            {'111': 900, '100': 100, '000': 24}, [], 1, {1}
+        )
+        self.assertDictEqual(consistent_result, {'100': 100, '000': 24})
+        self.assertEqual(solver.runs, 0)
+
+
+    def test_retries_are_bounded(self):
+        solver, recovered_hidden_subgroup = self.solve(
+            {2, 3, 4}, retry_policy=RetryPolicy(max_attempts=3, shot_growth_factor=1)
+        )
+        self.assertIsNone(recovered_hidden_subgroup)
+        self.assertEqual(solver.runs, 4)
+        self.assertListEqual(solver.shots, [None] * 4)
+
+
+    def test_shots_grow_with_attempts(self):
+        self.assertEqual(RetryPolicy().get_shots(2, 100), 400)
+        self.assertIsNone(RetryPolicy(shot_growth_factor=1).get_shots(2, 100))
@@ -0,0 +1,86 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from qiskit_aer import AerSimulator
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.batching import solve_concurrently
+from simonalg.utils.grouptheory import expand_group
+from simonalg.utils.sampler_pool import SamplerPool
+
+
+class CountingFactory:
+    def __init__(self):
+        self.calls = 0
+
+
+    def __call__(self):
+        self.calls += 1
+        return AerSimulator()
+
+
+class SamplerPoolTest(unittest.TestCase):
+    def test_sampler_is_reused_per_configuration(self):
+        factory = CountingFactory()
+        pool = SamplerPool({'aer_simulator': factory})
+
+        sampler = pool.get_sampler('aer_simulator')
+        self.assertIs(pool.get_sampler('aer_simulator'), sampler)
+        tuned_sampler = pool.get_sampler('aer_simulator', 'one_big_circuit')
+        self.assertIsNot(tuned_sampler, sampler)
+        self.assertIsNot(tuned_sampler.backend(), sampler.backend())
+        self.assertEqual(tuned_sampler.backend().options.max_parallel_experiments, 1)
+        self.assertEqual(factory.calls, 2)
+
+
+    def test_concurrent_requests_build_sampler_once(self):
+        factory = CountingFactory()
+        pool = SamplerPool({'aer_simulator': factory})
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            samplers = list(executor.map(lambda _: pool.get_sampler(), range(16)))
+        self.assertTrue(all(s is samplers[0] for s in samplers))
+        self.assertEqual(factory.calls, 1)
+
+
+    def test_warm_up_and_unknown_backend(self):
+        factory = CountingFactory()
+        pool = SamplerPool()
+        pool.register_backend_factory('counting', factory)
+        pool.warm_up(['counting', ('counting', {'shots': 8})])
+        self.assertEqual(factory.calls, 2)
+        self.assertEqual(pool.get_sampler('counting', {'shots': 8}).options.default_shots, 8)
+        with self.assertRaises(ValueError):
+            pool.get_sampler('unknown')
+
+
+    def test_solver_from_sampler_pool(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        pool = SamplerPool()
+        solver = SimonSolver.from_sampler_pool(
+            SimonCircuit(DefaultOracle(hidden_subgroup)),
+            sampler_pool=pool,
+            batch_working_indices=True
+        )
+        recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+        self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
+        self.assertIs(solver._sampler, pool.get_sampler())
+
+
+    def test_concurrent_solvers_leave_pooled_backend_unchanged(self):
+        hidden_subgroups = [['000', '001'], ['000', '110'], ['000', '001', '110', '111']]
+        pool = SamplerPool()
+        sampler = pool.get_sampler()
+        solvers = [
+            SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                sampler,
+                select_simulation_method=True,
+                simulator_options={'shots': 256}
+            ) for hidden_subgroup in hidden_subgroups
+        ]
+        for hidden_subgroup, basis in zip(hidden_subgroups, solve_concurrently(solvers)):
+            self.assertListEqual(hidden_subgroup, expand_group(basis, len(hidden_subgroup[0])))
+        self.assertEqual(sampler.backend().options.method, 'automatic')
+        self.assertIs(pool.get_sampler(), sampler)
@@ -0,0 +1,69 @@
+import unittest
+
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.utils.circuit import run_circuits_side_by_side, combine_circuits_side_by_side
+from simonalg.utils.grouptheory import is_in_orthogonal_group
+
+
+class SideBySideTest(unittest.TestCase):
+    def setUp(self):
+        self.hidden_subgroups = [['00', '01'], ['00', '10'], ['000', '011']]
+        self.simon_circuits = [SimonCircuit(DefaultOracle(h)) for h in self.hidden_subgroups]
+
+
+    def assert_results_are_in_orthogonal_groups(self, results):
+        self.assertEqual(len(results), len(self.hidden_subgroups))
+        for result, hidden_subgroup in zip(results, self.hidden_subgroups):
+            measurements = list(result.keys())
+            self.assertTrue(all(len(m) == len(hidden_subgroup[0]) for m in measurements))
+            self.assertTrue(all(is_in_orthogonal_group(m, hidden_subgroup) for m in measurements))
+
+
+    def test_combined_circuit_is_as_wide_as_all_circuits(self):
+        circuits_and_registers = [
+            (c.generate_standard_simon_circuit(), [c.circuit_wrapper.input_register])
+            for c in self.simon_circuits
+        ]
+        combined_circuit, names, _ = combine_circuits_side_by_side(circuits_and_registers)
+        self.assertEqual(
+            combined_circuit.num_qubits, sum(c.num_qubits for c, _ in circuits_and_registers)
+        )
+        self.assertListEqual(names, ['measure_0', 'measure_1', 'measure_2'])
+
+
+    def test_standard_circuits_side_by_side_with_sampler(self):
+        circuits_and_registers = [
+            (c.generate_standard_simon_circuit(), [c.circuit_wrapper.input_register])
+            for c in self.simon_circuits
+        ]
+        results = run_circuits_side_by_side(
+            circuits_and_registers, sampler=SamplerV2(AerSimulator())
+        )
+        self.assert_results_are_in_orthogonal_groups(results)
+
+
+    def test_standard_circuits_side_by_side_with_backend(self):
+        circuits_and_registers = [
+            (c.generate_standard_simon_circuit(), [c.circuit_wrapper.input_register])
+            for c in self.simon_circuits
+        ]
+        results = run_circuits_side_by_side(circuits_and_registers, backend=AerSimulator())
+        self.assert_results_are_in_orthogonal_groups(results)
+
+
+    def test_remove_zero_circuits_for_every_index_side_by_side(self):
+        simon_circuit = SimonCircuit(DefaultOracle(['00']))
+        input_register = simon_circuit.circuit_wrapper.input_register
+        circuits_and_registers = [
+            (simon_circuit.generate_remove_zero_circuit([], index), [input_register])
+            for index in range(2)
+        ]
+        results = run_circuits_side_by_side(
+            circuits_and_registers, sampler=SamplerV2(AerSimulator())
+        )
+        for index, result in enumerate(results):
+            self.assertTrue(all(m[1 - index] == '1' for m in result.keys()))
@@ -0,0 +1,131 @@
+import unittest
+
+from qiskit import QuantumCircuit, QuantumRegister
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2
+from qiskit_ibm_runtime.fake_provider import FakeSherbrooke
+
+from simonalg.oracle import DefaultOracle, CosetRepresentativeOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.circuit import run_circuit_and_measure_registers
+from simonalg.utils.grouptheory import expand_group, is_in_orthogonal_group
+from simonalg.utils.simulation import select_simulation_method, configure_simulation_method
+from simonalg.utils.simulation import estimate_statevector_memory, is_clifford_circuit
+from simonalg.utils.simulation import get_simulator_options, apply_simulator_options
+from simonalg.utils.simulation import get_configured_simulator, get_bond_qubit_counts
+from simonalg.utils.simulation import estimate_matrix_product_state_memory
+
+
+class SimulationMethodTest(unittest.TestCase):
+    def test_standard_simon_circuit_with_cnot_oracle_is_clifford(self):
+        hidden_subgroup = ['000', '101']
+        coset_circuit = SimonCircuit(
+            CosetRepresentativeOracle(hidden_subgroup), custom_output_register_size=3
+        ).generate_standard_simon_circuit()
+        default_circuit = SimonCircuit(
+            DefaultOracle(hidden_subgroup)
+        ).generate_standard_simon_circuit()
+
+        self.assertTrue(is_clifford_circuit(coset_circuit))
+        self.assertEqual(select_simulation_method(coset_circuit), 'stabilizer')
+        self.assertFalse(is_clifford_circuit(default_circuit))
+
+
+    def test_wide_circuit_falls_back_to_matrix_product_state(self):
+        circuit = SimonCircuit(DefaultOracle(['000', '001'])).generate_remove_zero_circuit([], 0)
+        required_memory = estimate_statevector_memory(circuit.num_qubits)
+        self.assertEqual(
+            select_simulation_method(circuit, max_memory=required_memory), 'statevector'
+        )
+        self.assertEqual(
+            select_simulation_method(circuit, max_memory=required_memory - 1),
+            'matrix_product_state'
+        )
+
+
+    def test_highly_entangled_circuit_is_rejected(self):
+        register = QuantumRegister(40, 'q')
+        circuit = QuantumCircuit(register)
+        for k in range(20):
+            circuit.h(register[k])
+            circuit.t(register[k])
+            circuit.cx(register[k], register[k + 20])
+        self.assertEqual(max(get_bond_qubit_counts(circuit)), 20)
+        with self.assertRaises(ValueError):
+            select_simulation_method(circuit, max_memory=2 ** 20)
+
+        # The ancillas of the remove-zero circuits do not count towards the bond dimension
+        circuit = SimonCircuit(DefaultOracle(['000', '001'])).generate_remove_zero_circuit([], 0)
+        self.assertEqual(max(get_bond_qubit_counts(circuit)), 3)
+
+
+    def test_matrix_product_state_yields_good_states(self):
+        hidden_subgroup = ['000', '001']
+        simon_circuit = SimonCircuit(DefaultOracle(hidden_subgroup))
+        input_register = simon_circuit.circuit_wrapper.input_register
+        circuit = simon_circuit.generate_remove_zero_circuit([], 1)
+        backend = AerSimulator()
+
+        _, configured_backend = configure_simulation_method(
+            [circuit], backend=backend, max_memory=estimate_matrix_product_state_memory(circuit)
+        )
+        self.assertEqual(configured_backend.options.method, 'matrix_product_state')
+        self.assertEqual(backend.options.method, 'automatic')
+
+        result = run_circuit_and_measure_registers(
+            circuit, [input_register], backend=configured_backend
+        )
+        for element in result:
+            self.assertEqual(element[1], '1')
+            self.assertTrue(is_in_orthogonal_group(element, hidden_subgroup))
+
+
+    def test_method_is_not_set_on_other_backends(self):
+        circuit = SimonCircuit(DefaultOracle(['000', '001'])).generate_standard_simon_circuit()
+        backend = FakeSherbrooke()
+        self.assertIs(configure_simulation_method([circuit], backend=backend)[1], backend)
+
+
+    def test_solver_with_simulation_method_selection(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        backend = AerSimulator()
+        solver = SimonSolver(
+            SimonCircuit(DefaultOracle(hidden_subgroup)),
+            SamplerV2(backend),
+            select_simulation_method=True
+        )
+        recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+        self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
+        # The shared simulator is left unchanged, the circuits run on a copy of it
+        self.assertEqual(backend.options.method, 'automatic')
+        configured_backend = get_configured_simulator(backend, method='statevector')
+        self.assertIsNot(configured_backend, backend)
+        self.assertIs(configured_backend, get_configured_simulator(backend, method='statevector'))
+
+
+    def test_simulator_option_presets(self):
+        simulator_options = get_simulator_options('one_big_circuit', fusion_threshold=16)
+        self.assertEqual(simulator_options['max_parallel_experiments'], 1)
+        self.assertEqual(simulator_options['fusion_threshold'], 16)
+        with self.assertRaises(ValueError):
+            get_simulator_options('many_big_circuits')
+        with self.assertRaises(ValueError):
+            apply_simulator_options({'shots': 10}, backend=FakeSherbrooke())
+
+
+    def test_solver_with_simulator_options(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        sampler = SamplerV2(AerSimulator())
+        solver = SimonSolver(
+            SimonCircuit(DefaultOracle(hidden_subgroup)),
+            sampler,
+            batch_working_indices=True,
+            simulator_options=get_simulator_options('many_small_circuits', shots=64)
+        )
+        self.assertEqual(solver._sampler.options.default_shots, 64)
+        self.assertEqual(solver._sampler.backend().options.max_parallel_experiments, 0)
+        self.assertIsNone(sampler.backend().options.max_parallel_experiments)
+
+        recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+        self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
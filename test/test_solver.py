@@ -1,8 +1,8 @@
 import unittest
 
 from qiskit_aer import AerSimulator
-from qiskit_ibm_runtime import SamplerV2
 
+from utils import create_simulator_sampler
 
 from simonalg.oracle import DefaultOracle, CosetRepresentativeOracle
 from simonalg.simon_circuit import SimonCircuit
@@ -14,13 +14,16 @@ class SimonSolverTest(unittest.TestCase):
             self,
             hidden_subgroup,
             oracle_constructor=DefaultOracle,
-            custom_output_register_size=None
+            custom_output_register_size=None,
+            **solver_options
         ):
         oracle = oracle_constructor(hidden_subgroup)
 
+        if 'backend' not in solver_options:
+            solver_options['sampler'] = create_simulator_sampler()
         solver = SimonSolver(
             SimonCircuit(oracle, custom_output_register_size=custom_output_register_size),
-            SamplerV2(AerSimulator())
+            **solver_options
         )
         recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
         recovered_hidden_subgroup.sort()
@@ -78,3 +81,21 @@ class SimonSolverTest(unittest.TestCase):
     def test_standard_oracle_hidden_subgroupt_order_8_2(self):
         hidden_subgroup = ['0000', '0010', '0101', '0111', '1001', '1011', '1100', '1110']
         self.run_solver_with_aer_simulator_and_assert_success(hidden_subgroup)
+
+
+    def test_batch_working_indices_with_sampler(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        self.run_solver_with_aer_simulator_and_assert_success(
+            hidden_subgroup, batch_working_indices=True
+        )
+
+
+    def test_batch_working_indices_with_backend(self):
+        hidden_subgroup = ['0000', '0011']
+        self.run_solver_with_aer_simulator_and_assert_success(
+            hidden_subgroup,
+            oracle_constructor=CosetRepresentativeOracle,
+            custom_output_register_size=4,
+            backend=AerSimulator(),
+            batch_working_indices=True
+        )
@@ -0,0 +1,82 @@
+import unittest
+
+from qiskit_aer import AerSimulator
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.analytic_sampler import AnalyticSampler, AnalyticSimonCircuit
+from simonalg.utils.analytic_sampler import PassThroughTranspiler
+from simonalg.utils.circuit import run_circuits_with_exact_probabilities
+from simonalg.utils.grouptheory import expand_group
+from simonalg.utils.structured_simulator import StructuredSampler, get_coset_labels
+
+
+class StructuredSimulatorTest(unittest.TestCase):
+    def assert_probabilities_equal(self, expected_probabilities, probabilities):
+        self.assertSetEqual(set(expected_probabilities), set(probabilities))
+        for element, probability in expected_probabilities.items():
+            self.assertAlmostEqual(probabilities[element], probability)
+
+
+    def test_distributions_match_simulation(self):
+        simon_circuit = SimonCircuit(DefaultOracle(['0000', '0011', '1100', '1111']))
+        circuits = [
+            simon_circuit.generate_standard_simon_circuit(),
+            simon_circuit.generate_remove_zero_circuit([], 0),
+            simon_circuit.generate_remove_zero_circuit([('0011', 0)], 2),
+            simon_circuit.generate_multi_index_remove_zero_circuit(
+                [('0011', 0)], {2, 3}, good_state_probability=0.75
+            )
+        ]
+        input_register = simon_circuit.circuit_wrapper.input_register
+        for circuit in circuits:
+            expected_probabilities = run_circuits_with_exact_probabilities(
+                [circuit.copy()], [input_register], backend=AerSimulator()
+            )[0]
+            probabilities = StructuredSampler().get_distribution(circuit).probabilities()
+            self.assert_probabilities_equal(expected_probabilities, probabilities)
+
+
+    def test_distributions_match_analytic_sampler(self):
+        hidden_subgroup = expand_group(['11000011', '00111100', '01010101'], 8)
+        simon_circuit = AnalyticSimonCircuit(DefaultOracle(hidden_subgroup))
+        blocking_clauses = [('10100101', 0), ('11110000', 4)]
+        circuits = [simon_circuit.generate_standard_simon_circuit()] + [
+            simon_circuit.generate_remove_zero_circuit(blocking_clauses, index)
+            for index in range(8)
+        ] + [
+            simon_circuit.generate_multi_index_remove_zero_circuit(
+                blocking_clauses, {1, 2, 6}, good_state_probability=0.75
+            )
+        ]
+        sampler = StructuredSampler()
+        for circuit in circuits:
+            self.assert_probabilities_equal(
+                AnalyticSampler().get_distribution(circuit).probabilities(),
+                sampler.get_distribution(circuit).probabilities()
+            )
+        # All circuits share the same blocking clauses except the standard circuit
+        self.assertEqual(sampler.forward_state_count, 2)
+
+
+    def test_coset_labels(self):
+        labels, m = get_coset_labels(['000', '011'], 3)
+        self.assertEqual(m, 2)
+        for x in range(8):
+            self.assertEqual(labels[x], labels[x ^ 0b011])
+        self.assertEqual(len(set(labels)), 4)
+
+
+    def test_solve(self):
+        hidden_subgroup = expand_group(['10000001', '01100110'], 8)
+        solver = SimonSolver(
+            AnalyticSimonCircuit(DefaultOracle(hidden_subgroup)),
+            StructuredSampler(seed=4),
+            transpiler=PassThroughTranspiler()
+        )
+        self.assertListEqual(sorted(hidden_subgroup), sorted(expand_group(solver.solve(), 8)))
+
+
+if __name__ == '__main__':
+    unittest.main()
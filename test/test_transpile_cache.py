@@ -0,0 +1,121 @@
+import tempfile
+import unittest
+
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2
+from qiskit_ibm_runtime.fake_provider import FakeSherbrooke
+
+from simonalg.oracle import DefaultOracle
+from simonalg.simon_circuit import SimonCircuit
+from simonalg.solver import SimonSolver
+from simonalg.utils.analytic_sampler import AnalyticSimonCircuit
+from simonalg.utils.grouptheory import expand_group
+from simonalg.utils.transpilation import TranspileCache, circuit_fingerprint, backend_fingerprint
+from simonalg.utils.transpilation import SimonTranspiler, get_initial_layout
+
+
+class TranspileCacheTest(unittest.TestCase):
+    def test_circuit_fingerprint_is_structural(self):
+        simon_circuit = SimonCircuit(DefaultOracle(['000', '001']))
+        circuit_a = simon_circuit.generate_remove_zero_circuit([], 0)
+        circuit_b = simon_circuit.generate_remove_zero_circuit([], 0)
+        circuit_c = simon_circuit.generate_remove_zero_circuit([], 1)
+        self.assertNotEqual(circuit_a.name, circuit_b.name)
+        self.assertEqual(circuit_fingerprint(circuit_a), circuit_fingerprint(circuit_b))
+        self.assertNotEqual(circuit_fingerprint(circuit_a), circuit_fingerprint(circuit_c))
+
+
+    def test_backend_fingerprint_distinguishes_backends(self):
+        sherbrooke_fingerprint = backend_fingerprint(FakeSherbrooke())
+        self.assertEqual(sherbrooke_fingerprint, backend_fingerprint(FakeSherbrooke()))
+        self.assertNotEqual(sherbrooke_fingerprint, backend_fingerprint(AerSimulator()))
+
+
+    def test_circuit_fingerprint_includes_metadata(self):
+        simon_circuit = AnalyticSimonCircuit(DefaultOracle(['000', '001']))
+        circuit_a = simon_circuit.generate_remove_zero_circuit([], 1)
+        circuit_b = simon_circuit.generate_remove_zero_circuit([], 2)
+        self.assertEqual(len(circuit_a.data), len(circuit_b.data))
+        self.assertNotEqual(circuit_fingerprint(circuit_a), circuit_fingerprint(circuit_b))
+
+
+    def test_backend_fingerprint_is_computed_once_per_backend(self):
+        class TargetCountingSimulator(AerSimulator):
+            target_count = 0
+
+            @property
+            def target(self):
+                self.target_count += 1
+                return super().target
+
+        backend = TargetCountingSimulator()
+        fingerprint = backend_fingerprint(backend)
+        target_count = backend.target_count
+        self.assertEqual(fingerprint, backend_fingerprint(backend))
+        self.assertEqual(backend.target_count, target_count)
+
+
+    def test_in_memory_cache_hit(self):
+        cache = TranspileCache(max_size=1)
+        simon_circuit = SimonCircuit(DefaultOracle(['00', '01']))
+        backend = FakeSherbrooke()
+
+        first = cache.transpile(simon_circuit.generate_standard_simon_circuit(), backend)
+        second = cache.transpile(simon_circuit.generate_standard_simon_circuit(), backend)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(circuit_fingerprint(first), circuit_fingerprint(second))
+
+        # max_size=1 evicts the first circuit
+        cache.transpile(simon_circuit.generate_remove_zero_circuit([], 0), backend)
+        cache.transpile(simon_circuit.generate_standard_simon_circuit(), backend)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+
+    def test_disk_cache_survives_instances(self):
+        simon_circuit = SimonCircuit(DefaultOracle(['00', '01']))
+        with tempfile.TemporaryDirectory() as directory:
+            TranspileCache(directory=directory).transpile(
+                simon_circuit.generate_standard_simon_circuit(), AerSimulator()
+            )
+            cache = TranspileCache(directory=directory)
+            cache.transpile(simon_circuit.generate_standard_simon_circuit(), AerSimulator())
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+
+    def test_repeated_solve_hits_cache(self):
+        hidden_subgroup = ['000', '001', '110', '111']
+        cache = TranspileCache()
+        for _ in range(2):
+            solver = SimonSolver(
+                SimonCircuit(DefaultOracle(hidden_subgroup)),
+                SamplerV2(AerSimulator()),
+                transpiler=cache
+            )
+            recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+            self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
+        self.assertGreater(cache.hits, 0)
+
+
+class SimonTranspilerTest(unittest.TestCase):
+    def test_layout_is_pinned_across_circuits(self):
+        simon_circuit = SimonCircuit(DefaultOracle(['000', '001']))
+        backend = FakeSherbrooke()
+        transpiler = SimonTranspiler(optimization_level=1, seed_transpiler=0)
+
+        layouts = []
+        for index in range(3):
+            circuit = simon_circuit.generate_remove_zero_circuit([], index)
+            transpiled_circuit = transpiler.transpile(circuit, backend)
+            layouts.append(get_initial_layout(transpiled_circuit, circuit.num_qubits))
+        self.assertTrue(all(layout == layouts[0] for layout in layouts))
+
+
+    def test_solver_with_simon_transpiler(self):
+        hidden_subgroup = ['000', '010', '100', '110']
+        solver = SimonSolver(
+            SimonCircuit(DefaultOracle(hidden_subgroup)),
+            SamplerV2(AerSimulator()),
+            transpiler=SimonTranspiler(optimization_level=2)
+        )
+        recovered_hidden_subgroup = expand_group(solver.solve(), len(hidden_subgroup[0]))
+        self.assertListEqual(hidden_subgroup, recovered_hidden_subgroup)
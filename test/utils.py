@@ -4,14 +4,16 @@ from functools import reduce
 import numpy as np
 from qiskit import transpile
 from qiskit_aer import AerSimulator
-from qiskit_ibm_runtime import SamplerV2
 
 from simonalg.oracle import DefaultOracle
-from simonalg.simon_circuit import SimonCircuit
+from simonalg.simon_circuit import SimonCircuit, SIMON_METADATA_KEY
 from simonalg.utils.grouptheory import generate_group_by_order, generate_orthogonal_group
 from simonalg.utils.grouptheory import is_in_orthogonal_group
 from simonalg.utils.logging import test_logger as log
+from simonalg.utils.analytic_sampler import AnalyticSampler
+from simonalg.utils.circuit import run_circuits_with_exact_probabilities
 from simonalg.utils.circuit import run_circuit_and_measure_registers
+from simonalg.utils.sampler_pool import get_default_sampler_pool
 
 
 def log_parameters(params):
@@ -47,9 +49,26 @@ def log_statevectors(result, input_register, output_register):
     log.info('Statevectors:\n%s', res)
 
 
-def run_circuit_on_simulator(circuit, measured_registers):
-    sampler = SamplerV2(AerSimulator())
-    return run_circuit_and_measure_registers(circuit, measured_registers, sampler=sampler)
+def create_simulator_sampler(simulator_options=None):
+    """
+    Returns the pooled sampler on an AerSimulator. simulator_options is as in SimonSolver, e.g. 
+    'many_small_circuits'.
+    """
+    return get_default_sampler_pool().get_sampler(simulator_options=simulator_options)
+
+
+def run_circuit_on_simulator(circuit, measured_registers, simulator_options=None, exact=True):
+    """
+    With exact=True, returns the exact probabilities of all outcomes with nonzero probability, so
+    that tests do not suffer from shot noise. With exact=False, the circuit takes the production
+    path instead, i.e. it is transpiled for the simulator and sampled, and the counts are returned.
+    Tests whose assertions only hold for every measured outcome should use the latter, so that
+    the sampled path stays covered.
+    """
+    sampler = create_simulator_sampler(simulator_options)
+    if not exact:
+        return run_circuit_and_measure_registers(circuit, measured_registers, sampler=sampler)
+    return run_circuits_with_exact_probabilities([circuit], measured_registers, sampler=sampler)[0]
 
 
 def run_circuit_without_measurement(circuit):
@@ -96,7 +115,7 @@ def construct_and_run_extended_simon_circuit(
         ('Blockingclauses are ', blockingclause_bitstrings)
     ] + ([('Generated Circuit\n', rmz_circuit)] if log_circuit else []))
 
-    result = run_circuit_on_simulator(rmz_circuit, [input_register])
+    result = run_circuit_on_simulator(rmz_circuit, [input_register], exact=False)
     log.info('Results: %s', result)
 
     return list(result.keys())
@@ -193,3 +212,14 @@ class BaseAssertions(unittest.TestCase):
         n = len(measurements[0])
         self.assertTrue(len(measurements) == 1)
         self.assertTrue(measurements[0] == n * '0')
+
+
+class CircuitKindCountingSampler(AnalyticSampler):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.circuit_kinds = []
+
+
+    def _run_pub(self, pub):
+        self.circuit_kinds.append(pub.circuit.metadata[SIMON_METADATA_KEY]['kind'])
+        return super()._run_pub(pub)